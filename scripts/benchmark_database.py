@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Benchmark de la base de datos: conexión por operación frente a pool WAL.
+
+Mide, para cada configuración, las inserciones por segundo de un único
+escritor y la latencia de lectura (p50/p99) de varios lectores que
+consultan como el dashboard (``get_episodes`` y ``get_stats``) mientras un
+escritor registra eventos y episodios como el pipeline.
+
+Uso:
+    python scripts/benchmark_database.py
+    python scripts/benchmark_database.py --seconds 10 --readers 4 --dir /home/pi/bench
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Añadir raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from src.database.db_manager import DatabaseManager
+
+# (nombre, conexiones persistentes, WAL)
+CONFIGS: List[Tuple[str, bool, bool]] = [
+    ("por operación", False, False),
+    ("pool + WAL", True, True),
+]
+
+
+def populate(db: DatabaseManager, episodes: int) -> None:
+    """Registra episodios previos para que las lecturas tengan datos."""
+    start = datetime(2024, 1, 1)
+    for i in range(episodes):
+        db.add_episode(f"ep_{i:06d}", f"/data/episodes/ep_{i:06d}", start + timedelta(minutes=i),
+                       motion_detected=True)
+
+
+def measure_inserts(db: DatabaseManager, count: int) -> float:
+    """Mide inserciones por segundo de eventos (una transacción cada una).
+
+    Returns:
+        Inserciones por segundo.
+    """
+    t0 = time.perf_counter()
+    for i in range(count):
+        db.add_event("motion", f"Evento {i}")
+    return count / (time.perf_counter() - t0)
+
+
+def measure_concurrent(db: DatabaseManager, args: argparse.Namespace) -> Dict[str, float]:
+    """Lectores concurrentes con un escritor activo durante ``args.seconds``.
+
+    Returns:
+        Latencias de lectura (ms), lecturas y escrituras por segundo.
+    """
+    stop = threading.Event()
+    latencies: List[List[float]] = [[] for _ in range(args.readers)]
+    writes = [0]
+    errors = [0]
+
+    def writer() -> None:
+        i = 0
+        while not stop.is_set():
+            episode_id = f"ep_bench_{i:06d}"
+            now = datetime.now()
+            try:
+                db.add_episode(episode_id, f"/data/episodes/{episode_id}", now, motion_detected=True)
+                db.add_event("episode_started", f"Episodio iniciado: {episode_id}")
+                db.update_episode(episode_id, now, 1.0)
+                writes[0] += 3
+            except Exception:
+                errors[0] += 1
+            i += 1
+
+    def reader(samples: List[float]) -> None:
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                db.get_episodes(limit=100)
+                db.get_stats()
+            except Exception:
+                errors[0] += 1
+                continue
+            samples.append(1000 * (time.perf_counter() - t0))
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(samples,)) for samples in latencies]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = np.array([s for reader_samples in latencies for s in reader_samples])
+    return {
+        "p50_ms": float(np.percentile(samples, 50)) if len(samples) else 0.0,
+        "p99_ms": float(np.percentile(samples, 99)) if len(samples) else 0.0,
+        "reads_s": len(samples) / args.seconds,
+        "writes_s": writes[0] / args.seconds,
+        "errors": errors[0]
+    }
+
+
+def main() -> None:
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark de la base de datos SQLite")
+    parser.add_argument("--inserts", type=int, default=2000, help="Inserciones secuenciales (default: 2000)")
+    parser.add_argument("--episodes", type=int, default=2000, help="Episodios previos (default: 2000)")
+    parser.add_argument("--readers", type=int, default=4, help="Threads lectores (default: 4)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duración de la prueba concurrente")
+    parser.add_argument("--dir", type=str, default=None,
+                        help="Directorio de pruebas (default: temporal; se borra al terminar)")
+    args = parser.parse_args()
+
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_db_", dir=args.dir))
+    print("=" * 78)
+    print(f"📊 BASE DE DATOS ({args.episodes} episodios previos, {args.readers} lectores + 1 escritor, "
+          f"{args.seconds:.0f}s)")
+    print("=" * 78)
+    print(f"{'Configuración':<15} {'insert/s':>9} {'lect. p50 ms':>13} {'lect. p99 ms':>13} "
+          f"{'lecturas/s':>11} {'escrit./s':>10} {'errores':>8}")
+    try:
+        for name, persistent, wal in CONFIGS:
+            db = DatabaseManager(db_path=str(base_dir / f"{name.replace(' ', '_')}.db"),
+                                 wal=wal, persistent=persistent)
+            populate(db, args.episodes)
+            inserts = measure_inserts(db, args.inserts)
+            m = measure_concurrent(db, args)
+            db.close()
+            print(f"{name:<15} {inserts:>9.0f} {m['p50_ms']:>13.2f} {m['p99_ms']:>13.2f} "
+                  f"{m['reads_s']:>11.0f} {m['writes_s']:>10.0f} {m['errors']:>8}")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
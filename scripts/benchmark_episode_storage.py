@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Benchmark de los formatos de almacenamiento de episodios.
+
+Graba los mismos episodios sintéticos como imágenes sueltas (un archivo
+por frame) y como contenedor de video (un archivo por episodio) y compara
+tiempo de escritura, espacio en disco y número de archivos. Para medir la
+tarjeta SD real, usar ``--dir`` con un directorio en ella.
+
+Uso:
+    python scripts/benchmark_episode_storage.py
+    python scripts/benchmark_episode_storage.py --episodes 20 --frames 60 --dir /home/pi/bench
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Añadir raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from src.camera.replay_sources import SyntheticSource
+from src.data.lerobot_dataset import EpisodeRecorder
+
+# (nombre, formato, códec de imagen, códec de video)
+LAYOUTS: List[Tuple[str, str, str, str]] = [
+    ("images/jpg", "images", "jpg", "mjpg"),
+    ("video/mjpg", "video", "jpg", "mjpg"),
+    ("video/mp4v", "video", "jpg", "mp4v"),
+]
+
+
+def capture_frames(args: argparse.Namespace) -> List[np.ndarray]:
+    """Genera los frames sintéticos que se grabarán en todos los formatos.
+
+    Args:
+        args: Argumentos parseados.
+
+    Returns:
+        Lista de frames RGB.
+    """
+    source = SyntheticSource(width=args.width, height=args.height, realtime=False,
+                             total_frames=args.frames)
+    frames: List[np.ndarray] = []
+    with source:
+        while len(frames) < args.frames:
+            frame, _ = source.capture_streams()
+            if frame is None:
+                break
+            frames.append(frame.copy())
+    return frames
+
+
+def disk_usage(path: Path) -> Tuple[int, int, int]:
+    """Mide un árbol de directorios.
+
+    Returns:
+        Tupla (archivos, bytes aparentes, bytes ocupados en bloques).
+    """
+    files = apparent = allocated = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            st = os.stat(os.path.join(root, name))
+            files += 1
+            apparent += st.st_size
+            allocated += st.st_blocks * 512
+    return files, apparent, allocated
+
+
+def run_layout(layout: Tuple[str, str, str, str], frames: List[np.ndarray],
+               args: argparse.Namespace, base_dir: Path) -> Dict[str, float]:
+    """Graba ``args.episodes`` episodios con un formato y mide el resultado.
+
+    Returns:
+        Métricas del formato.
+    """
+    name, storage_format, codec, video_codec = layout
+    episode_dir = base_dir / name.replace("/", "_")
+    recorder = EpisodeRecorder(episode_path=str(episode_dir), codec=codec, quality=args.quality,
+                               storage_format=storage_format, video_codec=video_codec, fps=args.fps)
+    add_time = save_time = 0.0
+    for episode in range(args.episodes):
+        recorder.start_episode(f"ep_{episode:04d}")
+        t0 = time.perf_counter()
+        for frame in frames:
+            recorder.add_frame(frame, {"motion": True})
+        t1 = time.perf_counter()
+        recorder.save_episode()
+        t2 = time.perf_counter()
+        add_time += t1 - t0
+        save_time += t2 - t1
+
+    t0 = time.perf_counter()
+    for _ in os.walk(episode_dir):
+        pass
+    list_time = time.perf_counter() - t0
+
+    files, apparent, allocated = disk_usage(episode_dir)
+    total_frames = args.episodes * len(frames)
+    return {
+        "add_ms": 1000 * add_time / total_frames,
+        "save_ms": 1000 * save_time / args.episodes,
+        "total_s": add_time + save_time,
+        "files": files,
+        "mb": apparent / (1024 * 1024),
+        "mb_allocated": allocated / (1024 * 1024),
+        "list_ms": 1000 * list_time
+    }
+
+
+def main() -> None:
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark de almacenamiento de episodios")
+    parser.add_argument("--episodes", type=int, default=10, help="Episodios por formato (default: 10)")
+    parser.add_argument("--frames", type=int, default=60, help="Frames por episodio (default: 60)")
+    parser.add_argument("--width", type=int, default=640, help="Ancho de los frames grabados")
+    parser.add_argument("--height", type=int, default=360, help="Alto de los frames grabados")
+    parser.add_argument("--fps", type=float, default=3.0, help="Framerate del contenedor (default: 3)")
+    parser.add_argument("--quality", type=int, default=85, help="Calidad de codificación")
+    parser.add_argument("--dir", type=str, default=None,
+                        help="Directorio de pruebas (default: temporal; se borra al terminar)")
+    args = parser.parse_args()
+
+    frames = capture_frames(args)
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_storage_", dir=args.dir))
+
+    print("=" * 78)
+    print(f"📊 ALMACENAMIENTO DE EPISODIOS ({args.episodes} episodios x {len(frames)} frames, "
+          f"{args.width}x{args.height})")
+    print("=" * 78)
+    print(f"{'Formato':<12} {'add ms/frame':>12} {'save ms/ep':>11} {'total s':>8} "
+          f"{'archivos':>9} {'MB':>8} {'MB bloques':>11} {'listar ms':>10}")
+    try:
+        for layout in LAYOUTS:
+            try:
+                m = run_layout(layout, frames, args, base_dir)
+            except (IOError, ValueError) as e:
+                print(f"{layout[0]:<12} no disponible: {e}")
+                continue
+            print(f"{layout[0]:<12} {m['add_ms']:>12.2f} {m['save_ms']:>11.1f} {m['total_s']:>8.2f} "
+                  f"{m['files']:>9} {m['mb']:>8.1f} {m['mb_allocated']:>11.1f} {m['list_ms']:>10.1f}")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
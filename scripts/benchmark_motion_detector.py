@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Microbenchmark del loop de detección de movimiento.
+
+Compara el detector actual (acumulador float32 en sitio, buffers
+preasignados y componentes conexas) con la implementación anterior
+(fondo uint8 recalculado en float64, findContours + contourArea),
+midiendo tiempo por frame y memoria temporal asignada por frame.
+
+Uso:
+    python scripts/benchmark_motion_detector.py --frames 300 --width 640 --height 360
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+import cv2
+
+# Añadir raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.detection.motion_detector import MotionDetector
+
+
+class LegacyMotionDetector:
+    """Réplica del loop anterior, usada solo como referencia de comparación."""
+
+    def __init__(self, threshold: int, min_area: int, blur_kernel: int, rate: float) -> None:
+        """Inicializa el detector de referencia."""
+        self.threshold = threshold
+        self.min_area = min_area
+        self.blur_kernel = blur_kernel
+        self.rate = rate
+        self.background = None
+
+    def _blur(self, frame: np.ndarray) -> np.ndarray:
+        """Convierte a gris (copiando) y suaviza, como antes."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY) if frame.ndim == 3 else frame.copy()
+        return cv2.GaussianBlur(gray, (self.blur_kernel, self.blur_kernel), 0)
+
+    def detect(self, frame: np.ndarray) -> bool:
+        """Detecta movimiento con el algoritmo anterior."""
+        gray_blurred = self._blur(frame)
+        if self.background is None:
+            self.background = gray_blurred
+            return False
+        frame_delta = cv2.absdiff(self.background, gray_blurred)
+        _, thresh = cv2.threshold(frame_delta, self.threshold, 255, cv2.THRESH_BINARY)
+        thresh = cv2.erode(thresh, None, iterations=2)
+        thresh = cv2.dilate(thresh, None, iterations=1)
+        contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        motion = False
+        for contour in contours:
+            if cv2.contourArea(contour) >= self.min_area:
+                motion = True
+                cv2.boundingRect(contour)
+        # update_background volvía a convertir y suavizar el frame
+        gray_blurred = self._blur(frame)
+        self.background = (
+            (1 - self.rate) * self.background + self.rate * gray_blurred
+        ).astype(np.uint8)
+        return motion
+
+
+def make_frames(count: int, width: int, height: int, gray: bool) -> List[np.ndarray]:
+    """Genera frames sintéticos con un objeto que cruza la escena.
+
+    Args:
+        count: Número de frames distintos.
+        width: Ancho.
+        height: Alto.
+        gray: Si True, frames de un canal (plano Y).
+
+    Returns:
+        Lista de frames.
+    """
+    rng = np.random.default_rng(0)
+    base = rng.integers(90, 110, (height, width, 3), dtype=np.uint8)
+    box = max(8, min(width, height) // 6)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        x = int((width - box) * i / max(1, count - 1))
+        frame[(height - box) // 2:(height + box) // 2, x:x + box] = 240
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY) if gray else frame)
+    return frames
+
+
+def measure(detect: Callable[[np.ndarray], object], frames: List[np.ndarray],
+            iterations: int) -> Tuple[float, float]:
+    """Mide tiempo medio y memoria temporal media por frame.
+
+    Args:
+        detect: Función de detección a medir.
+        frames: Frames de entrada (se reutilizan cíclicamente).
+        iterations: Número de frames a procesar.
+
+    Returns:
+        Tupla (ms_por_frame, kb_asignados_por_frame).
+    """
+    # Calentamiento (asignación de buffers, calibración)
+    for frame in frames[:5]:
+        detect(frame)
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        detect(frames[i % len(frames)])
+    elapsed_ms = 1000 * (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    peak_total = 0
+    for i in range(min(iterations, 100)):
+        tracemalloc.reset_peak()
+        current_before = tracemalloc.get_traced_memory()[0]
+        detect(frames[i % len(frames)])
+        peak_total += tracemalloc.get_traced_memory()[1] - current_before
+    tracemalloc.stop()
+    return elapsed_ms, peak_total / min(iterations, 100) / 1024
+
+
+def main() -> None:
+    """Punto de entrada del microbenchmark."""
+    parser = argparse.ArgumentParser(description="Microbenchmark de MotionDetector")
+    parser.add_argument("--frames", type=int, default=300, help="Frames a procesar")
+    parser.add_argument("--width", type=int, default=640, help="Ancho (default: 640)")
+    parser.add_argument("--height", type=int, default=360, help="Alto (default: 360)")
+    parser.add_argument("--rgb", action="store_true", help="Usar frames RGB en vez de luma")
+    args = parser.parse_args()
+
+    frames = make_frames(60, args.width, args.height, gray=not args.rgb)
+    params = dict(threshold=50, min_area=2000, blur_kernel=9)
+
+    legacy = LegacyMotionDetector(rate=0.05, **params)
+    current = MotionDetector(background_update_rate=0.05, calibration_frames=1, **params)
+
+    legacy_ms, legacy_kb = measure(legacy.detect, frames, args.frames)
+    current_ms, current_kb = measure(current.detect, frames, args.frames)
+
+    print("=" * 60)
+    print(f"📊 MICROBENCHMARK MotionDetector ({args.width}x{args.height}, "
+          f"{'RGB' if args.rgb else 'luma'})")
+    print("=" * 60)
+    print(f"{'':12}{'ms/frame':>12}{'KB asignados/frame':>22}")
+    print(f"{'Anterior':12}{legacy_ms:>12.2f}{legacy_kb:>22.1f}")
+    print(f"{'Actual':12}{current_ms:>12.2f}{current_kb:>22.1f}")
+    if current_ms > 0:
+        print(f"Aceleración: {legacy_ms / current_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Migra episodios en formato de imágenes a un formato compacto.
+
+Convierte ``data/episodes/<id>/images/*.jpg`` a un contenedor de video por
+episodio o a un dataset LeRobot v3, en paralelo y de forma reanudable
+(el progreso queda en ``migration_manifest.jsonl`` del destino).
+
+Uso:
+    python scripts/migrate_episodes.py data/episodes data/episodes_video
+    python scripts/migrate_episodes.py data/episodes data/dataset_v3 --target lerobot_v3 --workers 4
+    python scripts/migrate_episodes.py data/episodes data/episodes_video --delete-source
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Añadir raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.migration import EpisodeMigrator, MIGRATION_TARGETS
+
+
+def main() -> None:
+    """Punto de entrada de la migración."""
+    parser = argparse.ArgumentParser(description="Migración de episodios a formato compacto")
+    parser.add_argument("source", help="Directorio de episodios en formato de imágenes")
+    parser.add_argument("output", help="Directorio destino (raíz del dataset en lerobot_v3)")
+    parser.add_argument("--target", choices=MIGRATION_TARGETS, default="video",
+                        help="Formato destino (default: video)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos de conversión (default: núcleos disponibles)")
+    parser.add_argument("--fps", type=float, default=3.0,
+                        help="Framerate del video destino (default: 3 = 15 FPS / 5)")
+    parser.add_argument("--video-codec", default="mjpg", help="Códec en formato video (default: mjpg)")
+    parser.add_argument("--quality", type=int, default=85, help="Calidad de codificación")
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de episodios en esta ejecución")
+    parser.add_argument("--delete-source", action="store_true",
+                        help="Borrar cada episodio de origen tras migrarlo y verificarlo")
+    parser.add_argument("--manifest", default=None, help="Ruta del manifiesto (default: en el destino)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        migrator = EpisodeMigrator(
+            args.source,
+            args.output,
+            target=args.target,
+            workers=args.workers,
+            fps=args.fps,
+            video_codec=args.video_codec,
+            quality=args.quality,
+            delete_source=args.delete_source,
+            manifest_path=args.manifest
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    summary = migrator.run(limit=args.limit)
+
+    print("=" * 60)
+    print(f"📦 MIGRACIÓN A {args.target.upper()}")
+    print("=" * 60)
+    print(f"Episodios migrados:  {summary['migrated']}")
+    print(f"Episodios fallidos:  {summary['failed']}")
+    print(f"Frames:              {summary['frames']} en {summary['seconds']:.1f}s ({summary['fps']:.1f} FPS)")
+    for pid, stats in sorted(summary["workers"].items()):
+        print(f"  Proceso {pid}: {stats['episodes']} episodios, {stats['frames']} frames, "
+              f"{stats['fps']:.1f} FPS")
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
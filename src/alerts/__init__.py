@@ -1,5 +1,6 @@
 """Módulo de sistema de alertas y notificaciones."""
 
+from .event_writer import EventWriter
 from .notification import NotificationManager
 
-__all__ = ['NotificationManager']
+__all__ = ['EventWriter', 'NotificationManager']
@@ -0,0 +1,174 @@
+"""Escritor de eventos por lotes en segundo plano.
+
+Registrar cada evento con su propia transacción cuesta un commit (un fsync
+en la tarjeta SD) por evento, y se hacía desde el thread que lo emitía. Los
+eventos se encolan y un thread propio los inserta por lotes: se escribe al
+reunir ``batch_size`` eventos o al pasar ``flush_interval`` segundos desde
+el primero pendiente, con una sola transacción por lote. Al detener el
+escritor (o al salir del proceso) se vacía la cola.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.pipeline.bounded_queue import BoundedQueue
+
+
+logger = logging.getLogger(__name__)
+
+EventRow = Tuple[str, str, str, Optional[int], Optional[str]]
+
+
+class EventWriter:
+    """Cola de eventos con escritura por lotes en la base de datos.
+
+    Attributes:
+        batch_size: Eventos por lote como máximo.
+        flush_interval: Latencia máxima de un evento en cola (segundos).
+        written: Eventos escritos.
+        failed: Eventos perdidos por errores de la base de datos.
+        batches: Lotes (transacciones) escritos.
+    """
+
+    def __init__(
+        self,
+        db_manager: Any,
+        batch_size: int = 100,
+        flush_interval: float = 0.25,
+        max_pending: int = 10000
+    ) -> None:
+        """Inicializa el escritor.
+
+        Args:
+            db_manager: Base de datos con ``add_events``.
+            batch_size: Eventos que disparan la escritura de un lote.
+            flush_interval: Segundos que puede esperar un evento en cola.
+            max_pending: Eventos en cola como máximo; por encima se
+                descartan los nuevos (el productor nunca espera).
+        """
+        self.db_manager = db_manager
+        self.batch_size: int = max(1, batch_size)
+        self.flush_interval: float = flush_interval
+        self._queue = BoundedQueue(max_pending, policy='drop_newest')
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self.written: int = 0
+        self.failed: int = 0
+        self.batches: int = 0
+        self._max_flush: float = 0.0
+
+    def start(self) -> None:
+        """Arranca el thread de escritura."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+        # Los eventos encolados se escriben aunque no se llame a stop()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Detiene el thread tras escribir todos los eventos pendientes.
+
+        Args:
+            timeout: Segundos máximos de espera.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout=timeout)
+        self._thread = None
+        atexit.unregister(self.stop)
+        # Eventos encolados después de que el thread terminara
+        self.flush()
+
+    def submit(
+        self,
+        event_type: str,
+        message: str,
+        severity: str = "info",
+        episode_id: Optional[int] = None
+    ) -> bool:
+        """Encola un evento sin esperar a la base de datos.
+
+        Sin thread en marcha, el evento se escribe en el momento.
+
+        Args:
+            event_type: Tipo de evento.
+            message: Mensaje descriptivo.
+            severity: Nivel de severidad.
+            episode_id: ID del episodio relacionado (opcional).
+
+        Returns:
+            True si el evento se encoló o escribió; False si se descartó.
+        """
+        # Instante del evento (no el del lote), en el formato de CURRENT_TIMESTAMP
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        row: EventRow = (event_type, message, severity, episode_id, timestamp)
+        if self._thread is None:
+            self._write([row])
+            return True
+        if not self._queue.put(row):
+            logger.warning(f"Cola de eventos llena, evento descartado: [{event_type}] {message}")
+            return False
+        return True
+
+    def _run(self) -> None:
+        """Bucle del thread: agrupa eventos por tamaño o latencia."""
+        while True:
+            batch = self._queue.get_batch(self.batch_size, timeout=self.flush_interval)
+            if not batch:
+                if self._stopping.is_set():
+                    return
+                continue
+            # Esperar a completar el lote como mucho flush_interval
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopping.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                batch.extend(self._queue.get_batch(self.batch_size - len(batch), timeout=remaining))
+            self._write(batch)
+
+    def flush(self) -> None:
+        """Escribe en el momento todos los eventos en cola."""
+        while True:
+            batch = self._queue.get_batch(self.batch_size, timeout=0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[EventRow]) -> None:
+        """Escribe un lote en una transacción."""
+        started = time.perf_counter()
+        with self._flush_lock:
+            try:
+                self.db_manager.add_events(batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Error guardando {len(batch)} eventos en BD: {e}", exc_info=True)
+            self._max_flush = max(self._max_flush, time.perf_counter() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado del escritor.
+
+        Returns:
+            Diccionario con la cola, eventos y lotes escritos.
+        """
+        return {
+            "queue": self._queue.get_stats(),
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch": self.written / self.batches if self.batches else 0.0,
+            "max_flush_ms": 1000 * self._max_flush,
+            "running": self._thread is not None
+        }
@@ -1,13 +1,16 @@
 """Sistema de notificaciones y logging estructurado.
 
 Este módulo proporciona un sistema de logging estructurado para eventos
-del sistema de seguridad.
+del sistema de seguridad. Los eventos se guardan en BD por lotes desde un
+thread propio (``EventWriter``): registrar un evento nunca espera al disco.
 """
 
 import logging
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 from datetime import datetime
 
+from src.alerts.event_writer import EventWriter
+
 
 logger = logging.getLogger(__name__)
 
@@ -21,17 +24,48 @@ class NotificationManager:
     Attributes:
         db_manager: Referencia opcional al gestor de base de datos
             para guardar eventos en BD.
+        writer: Escritor por lotes de eventos (None sin base de datos).
     """
     
-    def __init__(self, db_manager: Optional[Any] = None) -> None:
+    def __init__(
+        self,
+        db_manager: Optional[Any] = None,
+        batch_size: int = 100,
+        flush_interval: float = 0.25
+    ) -> None:
         """Inicializa el gestor de notificaciones.
         
         Args:
             db_manager: Instancia de DatabaseManager para guardar eventos (opcional).
+            batch_size: Eventos por transacción como máximo.
+            flush_interval: Segundos que puede esperar un evento antes de
+                guardarse.
         """
         self.db_manager = db_manager
+        self.writer: Optional[EventWriter] = None
+        if db_manager is not None:
+            self.writer = EventWriter(db_manager, batch_size=batch_size, flush_interval=flush_interval)
+            self.writer.start()
         logger.info("NotificationManager inicializado")
     
+    def flush(self) -> None:
+        """Guarda en BD los eventos pendientes sin esperar al lote."""
+        if self.writer:
+            self.writer.flush()
+    
+    def close(self) -> None:
+        """Guarda los eventos pendientes y detiene el escritor."""
+        if self.writer:
+            self.writer.stop()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado del escritor de eventos.
+        
+        Returns:
+            Diccionario con cola, eventos y lotes escritos (vacío sin BD).
+        """
+        return self.writer.get_stats() if self.writer else {}
+    
     def log_event(
         self,
         event_type: str,
@@ -61,17 +95,9 @@ class NotificationManager:
         
         log_method(log_message)
         
-        # Guardar en base de datos si está disponible
-        if self.db_manager:
-            try:
-                self.db_manager.add_event(
-                    event_type=event_type,
-                    message=message,
-                    severity=severity,
-                    episode_id=episode_id
-                )
-            except Exception as e:
-                logger.error(f"Error guardando evento en BD: {e}", exc_info=True)
+        # Encolar para la base de datos si está disponible
+        if self.writer:
+            self.writer.submit(event_type, message, severity, episode_id)
     
     def motion_detected(self, area: float, episode_id: Optional[int] = None) -> None:
         """Registra detección de movimiento.
@@ -1,5 +1,16 @@
-"""Módulo de manejo de cámara IMX219."""
+"""Módulo de manejo de cámara IMX219 y fuentes de frames."""
 
+from .frame_source import FrameSource, PacedFrameSource, create_frame_source
+from .replay_sources import VideoFileSource, EpisodeImageSource, SyntheticSource, open_episode_source
 from .imx219_handler import IMX219Handler
 
-__all__ = ['IMX219Handler']
+__all__ = [
+    'FrameSource',
+    'PacedFrameSource',
+    'create_frame_source',
+    'VideoFileSource',
+    'EpisodeImageSource',
+    'SyntheticSource',
+    'open_episode_source',
+    'IMX219Handler',
+]
@@ -0,0 +1,304 @@
+"""Buffer circular de frames preasignado y sin copias para consumidores.
+
+El thread de captura copia cada frame una única vez en un slot
+preasignado; los consumidores (streaming, detección, grabación) obtienen
+vistas de solo lectura de una secuencia concreta mediante referencias
+contadas, de modo que un slot nunca se sobrescribe mientras está en uso.
+
+Los consumidores asíncronos esperan los frames nuevos con
+``wait_for_newer_async``: el escritor los despierta en su event loop con
+``call_soon_threadsafe`` y la espera no ocupa ningún thread del executor.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Set, Tuple
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRef:
+    """Referencia contada a un frame publicado en el buffer circular.
+
+    Mientras la referencia no se libere, el slot no se reutiliza. Se usa
+    preferentemente como context manager.
+
+    Attributes:
+        seq: Número de secuencia del frame.
+        frame: Vista numpy de solo lectura del frame.
+        meta: Metadatos asociados al frame (no deben modificarse).
+        timestamp: Instante de captura (time.time()).
+    """
+
+    __slots__ = ('_buffer', '_slot', '_released', 'seq', 'frame', 'meta', 'timestamp')
+
+    def __init__(
+        self,
+        buffer: 'FrameRingBuffer',
+        slot: int,
+        seq: int,
+        frame: np.ndarray,
+        meta: Dict[str, Any],
+        timestamp: float
+    ) -> None:
+        """Inicializa la referencia (uso interno de FrameRingBuffer)."""
+        self._buffer = buffer
+        self._slot = slot
+        self._released = False
+        self.seq = seq
+        self.frame = frame
+        self.meta = meta
+        self.timestamp = timestamp
+
+    def release(self) -> None:
+        """Libera la referencia. Llamadas repetidas no tienen efecto."""
+        if not self._released:
+            self._released = True
+            self._buffer._release(self._slot)
+
+    def __enter__(self) -> 'FrameRef':
+        """Context manager entry.
+
+        Returns:
+            Self.
+        """
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception],
+                 exc_tb: Optional[Any]) -> None:
+        """Context manager exit - libera la referencia."""
+        self.release()
+
+
+class FrameRingBuffer:
+    """Buffer circular de slots numpy preasignados con secuencias y refcount.
+
+    Los slots se asignan con el shape del primer frame escrito y se
+    reutilizan indefinidamente. El escritor elige siempre el slot libre
+    (refcount 0) más antiguo; si todos están retenidos por consumidores
+    el frame se descarta y se contabiliza en ``dropped_writes``.
+
+    Attributes:
+        capacity: Número de slots.
+        writes: Frames publicados.
+        dropped_writes: Frames descartados por falta de slot libre.
+    """
+
+    def __init__(self, capacity: int = 4) -> None:
+        """Inicializa el buffer.
+
+        Args:
+            capacity: Número de slots (mínimo 2).
+
+        Raises:
+            ValueError: Si capacity es menor que 2.
+        """
+        if capacity < 2:
+            raise ValueError(f"capacity inválido: {capacity} (mínimo 2)")
+
+        self.capacity: int = capacity
+        self.writes: int = 0
+        self.dropped_writes: int = 0
+        self._slots: List[np.ndarray] = []
+        self._views: List[np.ndarray] = []
+        self._seqs: List[int] = [-1] * capacity
+        self._refcounts: List[int] = [0] * capacity
+        self._metas: List[Dict[str, Any]] = [{} for _ in range(capacity)]
+        self._timestamps: List[float] = [0.0] * capacity
+        self._writing: List[bool] = [False] * capacity
+        self._latest_slot: Optional[int] = None
+        self._next_seq: int = 1
+        self._cond = threading.Condition()
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+        logger.info(f"FrameRingBuffer inicializado: {capacity} slots")
+
+    @property
+    def shape(self) -> Optional[Tuple[int, ...]]:
+        """Shape de los slots o None si aún no se asignaron."""
+        return self._slots[0].shape if self._slots else None
+
+    @property
+    def latest_seq(self) -> int:
+        """Secuencia del último frame publicado (0 si no hay ninguno)."""
+        with self._cond:
+            if self._latest_slot is None:
+                return 0
+            return self._seqs[self._latest_slot]
+
+    def _allocate(self, frame: np.ndarray) -> None:
+        """Preasigna los slots con el shape y dtype del frame."""
+        self._slots = [np.empty_like(frame) for _ in range(self.capacity)]
+        self._views = []
+        for slot in self._slots:
+            view = slot.view()
+            view.flags.writeable = False
+            self._views.append(view)
+        logger.info(
+            f"Slots preasignados: {self.capacity} x {frame.shape} "
+            f"({self.capacity * frame.nbytes / 1e6:.1f} MB)"
+        )
+
+    def write(
+        self,
+        frame: np.ndarray,
+        meta: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None
+    ) -> Optional[int]:
+        """Copia un frame en un slot libre y lo publica.
+
+        Args:
+            frame: Frame a publicar (se copia una única vez).
+            meta: Metadatos asociados (p.ej. resultado de detección).
+            timestamp: Instante de captura (None = ahora).
+
+        Returns:
+            Número de secuencia asignado o None si no había slot libre.
+
+        Raises:
+            ValueError: Si el frame no coincide con el shape de los slots.
+        """
+        with self._cond:
+            if not self._slots:
+                self._allocate(frame)
+            elif frame.shape != self._slots[0].shape or frame.dtype != self._slots[0].dtype:
+                raise ValueError(
+                    f"Frame {frame.shape}/{frame.dtype} incompatible con slots "
+                    f"{self._slots[0].shape}/{self._slots[0].dtype}"
+                )
+
+            slot = self._find_free_slot()
+            if slot is None:
+                self.dropped_writes += 1
+                return None
+            self._writing[slot] = True
+            self._seqs[slot] = -1
+
+        # Copia fuera del lock: los lectores de otros slots no se bloquean
+        np.copyto(self._slots[slot], frame)
+
+        with self._cond:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seqs[slot] = seq
+            self._metas[slot] = meta or {}
+            self._timestamps[slot] = timestamp if timestamp is not None else time.time()
+            self._writing[slot] = False
+            self._latest_slot = slot
+            self.writes += 1
+            self._cond.notify_all()
+            waiters = self._async_waiters
+            self._async_waiters = set()
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Event loop ya cerrado: su consumidor no espera nada
+                pass
+        return seq
+
+    def _find_free_slot(self) -> Optional[int]:
+        """Devuelve el slot libre más antiguo (requiere el lock)."""
+        best: Optional[int] = None
+        for i in range(self.capacity):
+            if self._refcounts[i] > 0 or self._writing[i]:
+                continue
+            if best is None or self._seqs[i] < self._seqs[best]:
+                best = i
+        return best
+
+    def acquire(self, seq: Optional[int] = None) -> Optional[FrameRef]:
+        """Obtiene una referencia de solo lectura a un frame.
+
+        Args:
+            seq: Secuencia deseada (None = el último publicado).
+
+        Returns:
+            FrameRef o None si la secuencia ya no está en el buffer.
+        """
+        with self._cond:
+            if seq is None:
+                slot = self._latest_slot
+            else:
+                slot = next((i for i in range(self.capacity) if self._seqs[i] == seq), None)
+            if slot is None or self._seqs[slot] <= 0:
+                return None
+            self._refcounts[slot] += 1
+            return FrameRef(
+                self,
+                slot,
+                self._seqs[slot],
+                self._views[slot],
+                self._metas[slot],
+                self._timestamps[slot]
+            )
+
+    def _release(self, slot: int) -> None:
+        """Decrementa el refcount de un slot (uso interno de FrameRef)."""
+        with self._cond:
+            self._refcounts[slot] -= 1
+
+    def wait_for_newer(self, seq: int, timeout: Optional[float] = None) -> int:
+        """Espera a que se publique un frame posterior a ``seq``.
+
+        Args:
+            seq: Última secuencia conocida por el consumidor.
+            timeout: Tiempo máximo de espera en segundos.
+
+        Returns:
+            Secuencia más reciente (igual a ``seq`` si expiró el timeout).
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._latest_slot is not None and self._seqs[self._latest_slot] > seq,
+                timeout=timeout
+            )
+            if self._latest_slot is None:
+                return 0
+            return max(seq, self._seqs[self._latest_slot])
+
+    async def wait_for_newer_async(self, seq: int, timeout: Optional[float] = None) -> int:
+        """Versión asíncrona de ``wait_for_newer``.
+
+        La espera se hace en el event loop (sin ocupar un thread del
+        executor); ``write`` la despierta con ``call_soon_threadsafe``.
+
+        Args:
+            seq: Última secuencia conocida por el consumidor.
+            timeout: Tiempo máximo de espera en segundos.
+
+        Returns:
+            Secuencia más reciente (igual a ``seq`` si expiró el timeout).
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            if self._latest_slot is not None and self._seqs[self._latest_slot] > seq:
+                return self._seqs[self._latest_slot]
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        return max(seq, self.latest_seq)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas del buffer.
+
+        Returns:
+            Diccionario con escrituras, descartes y slots retenidos.
+        """
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "writes": self.writes,
+                "dropped_writes": self.dropped_writes,
+                "pinned_slots": sum(1 for r in self._refcounts if r > 0)
+            }
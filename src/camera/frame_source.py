@@ -0,0 +1,317 @@
+"""Abstracción de fuentes de frames para el pipeline de captura.
+
+Este módulo define la interfaz común que deben implementar todas las
+fuentes de video (cámara IMX219, archivos de video, episodios grabados
+y generadores sintéticos), de modo que el pipeline captura→detección→
+grabación pueda ejecutarse y medirse fuera de la Raspberry Pi.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Any
+import yaml
+import numpy as np
+import cv2
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSource(ABC):
+    """Interfaz base para cualquier fuente de frames RGB.
+
+    Una fuente entrega un stream principal RGB (streaming y grabación) y,
+    opcionalmente, un stream de baja resolución ("lores") para detección
+    que contiene solo la luminancia (plano Y, un canal).
+
+    Attributes:
+        is_running: Indica si la fuente está activa.
+        lores_size: Tamaño (width, height) del stream lores o None.
+    """
+
+    is_running: bool = False
+    lores_size: Optional[Tuple[int, int]] = None
+
+    @abstractmethod
+    def start(self) -> None:
+        """Inicia la fuente de frames.
+
+        Raises:
+            RuntimeError: Si la fuente no puede iniciarse.
+        """
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Detiene la fuente de frames."""
+
+    @abstractmethod
+    def capture_frame(self) -> Optional[np.ndarray]:
+        """Obtiene el siguiente frame.
+
+        Returns:
+            Array numpy RGB con shape (height, width, 3) o None si no
+            hay frame disponible.
+        """
+
+    def capture_streams(self, lores: bool = True) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Obtiene el siguiente frame de los streams principal y lores.
+
+        La implementación por defecto genera el stream lores redimensionando
+        el principal y extrayendo su luminancia por software; las fuentes con
+        hardware capaz de producirlo (ISP) deben sobrescribir este método.
+
+        Args:
+            lores: Si False, no se genera el stream lores (p.ej. en los
+                frames que el detector no va a analizar). Las fuentes en las
+                que no tiene coste pueden entregarlo igualmente.
+
+        Returns:
+            Tupla (main, lores). ``main`` es RGB o None si no hay frame;
+            ``lores`` es un array 2D de luminancia o None si la fuente no
+            tiene stream lores configurado o no se pidió.
+        """
+        frame = self.capture_frame()
+        if frame is None or self.lores_size is None or not lores:
+            return frame, None
+        small = cv2.resize(frame, self.lores_size, interpolation=cv2.INTER_AREA)
+        return frame, cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+    @abstractmethod
+    def get_resolution(self) -> Tuple[int, int]:
+        """Obtiene la resolución de los frames entregados.
+
+        Returns:
+            Tupla (width, height).
+        """
+
+    @abstractmethod
+    def get_framerate(self) -> int:
+        """Obtiene el framerate nominal de la fuente.
+
+        Returns:
+            Framerate en FPS.
+        """
+
+    def __enter__(self) -> 'FrameSource':
+        """Context manager entry.
+
+        Returns:
+            Self.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception],
+                 exc_tb: Optional[Any]) -> None:
+        """Context manager exit.
+
+        Args:
+            exc_type: Tipo de excepción si la hay.
+            exc_val: Valor de excepción si la hay.
+            exc_tb: Traceback si la hay.
+        """
+        self.stop()
+
+
+class PacedFrameSource(FrameSource):
+    """Base para fuentes de reproducción con control de ritmo.
+
+    En modo tiempo real los frames se entregan al framerate nominal de la
+    fuente; en modo "lo más rápido posible" se entregan sin esperas, lo que
+    permite medir el throughput máximo del pipeline.
+
+    Attributes:
+        fps: Framerate nominal de la fuente.
+        realtime: Si True, respeta el framerate nominal.
+        loop: Si True, reinicia la reproducción al llegar al final.
+        exhausted: Indica si la fuente llegó al final (solo sin loop).
+        frames_delivered: Número de frames entregados desde start().
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        realtime: bool = True,
+        loop: bool = False,
+        lores_size: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Inicializa la fuente con control de ritmo.
+
+        Args:
+            fps: Framerate nominal (debe ser > 0).
+            realtime: Si True, respeta el framerate nominal.
+            loop: Si True, reinicia la reproducción al llegar al final.
+            lores_size: Tamaño (width, height) del stream lores (opcional).
+
+        Raises:
+            ValueError: Si fps no es positivo.
+        """
+        if fps <= 0:
+            raise ValueError(f"fps inválido: {fps} (debe ser > 0)")
+
+        self.fps: float = float(fps)
+        self.realtime: bool = realtime
+        self.loop: bool = loop
+        self.lores_size = tuple(lores_size) if lores_size else None
+        self.is_running: bool = False
+        self.exhausted: bool = False
+        self.frames_delivered: int = 0
+        self._next_deadline: Optional[float] = None
+
+    @abstractmethod
+    def _read_next(self) -> Optional[np.ndarray]:
+        """Lee el siguiente frame de la fuente subyacente.
+
+        Returns:
+            Frame RGB o None si se llegó al final.
+        """
+
+    @abstractmethod
+    def _rewind(self) -> None:
+        """Vuelve al primer frame de la fuente subyacente."""
+
+    def start(self) -> None:
+        """Inicia la reproducción desde el primer frame."""
+        if self.is_running:
+            logger.warning(f"{type(self).__name__} ya está corriendo")
+            return
+
+        self._rewind()
+        self.exhausted = False
+        self.frames_delivered = 0
+        self._next_deadline = None
+        self.is_running = True
+        logger.info(
+            f"{type(self).__name__} iniciada @ {self.fps:.1f}fps "
+            f"({'tiempo real' if self.realtime else 'máxima velocidad'})"
+        )
+
+    def stop(self) -> None:
+        """Detiene la reproducción."""
+        self.is_running = False
+
+    def capture_frame(self) -> Optional[np.ndarray]:
+        """Entrega el siguiente frame respetando el modo de ritmo.
+
+        Returns:
+            Frame RGB o None si la fuente no está corriendo o se agotó.
+        """
+        if not self.is_running or self.exhausted:
+            return None
+
+        try:
+            frame = self._read_next()
+            if frame is None and self.loop:
+                self._rewind()
+                frame = self._read_next()
+        except Exception as e:
+            logger.error(f"Error leyendo frame de {type(self).__name__}: {e}", exc_info=True)
+            return None
+
+        if frame is None:
+            self.exhausted = True
+            logger.info(f"{type(self).__name__} agotada tras {self.frames_delivered} frames")
+            return None
+
+        if self.realtime:
+            self._pace()
+
+        self.frames_delivered += 1
+        return frame
+
+    def _pace(self) -> None:
+        """Espera hasta el instante en que corresponde entregar el frame."""
+        now = time.monotonic()
+        if self._next_deadline is None:
+            self._next_deadline = now
+
+        delay = self._next_deadline - now
+        if delay > 0:
+            time.sleep(delay)
+            self._next_deadline += 1.0 / self.fps
+        else:
+            # Si vamos atrasados no acumulamos deuda: reanclar al instante actual
+            self._next_deadline = now + 1.0 / self.fps
+
+    def get_framerate(self) -> int:
+        """Obtiene el framerate nominal.
+
+        Returns:
+            Framerate en FPS (redondeado).
+        """
+        return int(round(self.fps))
+
+
+def create_frame_source(config_path: str = "config/camera_config.yaml") -> FrameSource:
+    """Crea la fuente de frames indicada en la configuración.
+
+    La sección opcional ``camera.source`` selecciona el backend::
+
+        camera:
+          lores: {width: 640, height: 360}  # stream de detección (opcional)
+          source:
+            type: synthetic   # imx219 | video | episode | synthetic
+            path: null        # archivo de video o directorio de episodio
+            realtime: true    # false = lo más rápido posible
+            loop: false
+
+    Sin sección ``source`` se usa la cámara IMX219.
+
+    Args:
+        config_path: Ruta al archivo de configuración YAML.
+
+    Returns:
+        Fuente de frames sin iniciar.
+
+    Raises:
+        FileNotFoundError: Si el archivo de configuración no existe.
+        ValueError: Si el tipo de fuente es desconocido o falta ``path``.
+    """
+    path = Path(config_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Archivo de configuración no encontrado: {config_path}")
+
+    with open(path, 'r') as f:
+        config: Dict[str, Any] = yaml.safe_load(f) or {}
+
+    cam_config = config.get('camera', {})
+    source_config = cam_config.get('source') or {}
+    source_type = source_config.get('type', 'imx219')
+
+    if source_type == 'imx219':
+        from src.camera.imx219_handler import IMX219Handler
+        return IMX219Handler(config_path)
+
+    from src.camera.replay_sources import VideoFileSource, SyntheticSource, open_episode_source
+
+    realtime = source_config.get('realtime', True)
+    loop = source_config.get('loop', False)
+    lores = cam_config.get('lores')
+    lores_size = (lores.get('width', 640), lores.get('height', 360)) if lores else None
+
+    if source_type == 'synthetic':
+        resolution = cam_config.get('resolution', {})
+        return SyntheticSource(
+            width=resolution.get('width', 1280),
+            height=resolution.get('height', 720),
+            fps=cam_config.get('framerate', 15),
+            realtime=realtime,
+            loop=loop,
+            lores_size=lores_size,
+            total_frames=source_config.get('total_frames')
+        )
+
+    source_path = source_config.get('path')
+    if not source_path:
+        raise ValueError(f"La fuente '{source_type}' requiere camera.source.path")
+
+    if source_type == 'video':
+        return VideoFileSource(source_path, fps=source_config.get('fps'),
+                               realtime=realtime, loop=loop, lores_size=lores_size)
+    if source_type == 'episode':
+        return open_episode_source(source_path, fps=source_config.get('fps'),
+                                   realtime=realtime, loop=loop, lores_size=lores_size)
+
+    raise ValueError(f"Tipo de fuente desconocido: {source_type}")
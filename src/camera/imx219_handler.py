@@ -10,6 +10,8 @@ from typing import Optional, Tuple, Dict, Any
 import yaml
 import numpy as np
 
+from src.camera.frame_source import FrameSource
+
 try:
     from picamera2 import Picamera2
 except ImportError:
@@ -19,12 +21,16 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# El ISP de la Pi 4 solo produce el stream lores en YUV420
+LORES_FORMAT = "YUV420"
+
 
-class IMX219Handler:
+class IMX219Handler(FrameSource):
     """Manejador de cámara IMX219 usando picamera2.
     
     Esta clase encapsula la configuración y operación de la cámara IMX219,
-    proporcionando una interfaz simple para capturar frames de video.
+    proporcionando una interfaz simple para capturar frames de video. Es la
+    implementación de ``FrameSource`` para hardware real.
     
     Attributes:
         camera: Instancia de Picamera2.
@@ -52,6 +58,11 @@ class IMX219Handler:
         self.camera: Optional[Picamera2] = None
         self.is_running: bool = False
         
+        lores = self.config.get('camera', {}).get('lores')
+        self.lores_size: Optional[Tuple[int, int]] = (
+            (lores.get('width', 640), lores.get('height', 360)) if lores else None
+        )
+        
         logger.info("IMX219Handler inicializado")
     
     def _load_config(self, path: str) -> Dict[str, Any]:
@@ -96,6 +107,16 @@ class IMX219Handler:
         framerate = cam_config.get('framerate', 30)
         format_str = cam_config.get('format', 'RGB888')
         
+        # Stream lores opcional generado por el ISP (sin coste de CPU)
+        lores_config: Optional[Dict[str, Any]] = None
+        if self.lores_size is not None:
+            lores_w, lores_h = self.lores_size
+            if lores_w > width or lores_h > height:
+                raise RuntimeError(
+                    f"Stream lores {lores_w}x{lores_h} mayor que el principal {width}x{height}"
+                )
+            lores_config = {"size": self.lores_size, "format": LORES_FORMAT}
+        
         try:
             self.camera.configure(
                 self.camera.create_preview_configuration(
@@ -103,11 +124,13 @@ class IMX219Handler:
                         "size": (width, height),
                         "format": format_str
                     },
+                    lores=lores_config,
                     controls={"FrameRate": framerate}
                 )
             )
             logger.info(
                 f"Cámara configurada: {width}x{height} @ {framerate}fps, formato: {format_str}"
+                + (f", lores: {self.lores_size[0]}x{self.lores_size[1]}" if lores_config else "")
             )
         except Exception as e:
             logger.error(f"Error configurando cámara: {e}")
@@ -156,6 +179,38 @@ class IMX219Handler:
             logger.error(f"Error capturando frame: {e}", exc_info=True)
             return None
     
+    def capture_streams(self, lores: bool = True) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Captura el mismo frame de los streams principal y lores del ISP.
+        
+        El stream lores se entrega en YUV420 planar; se devuelve únicamente
+        su plano Y (luminancia) como vista sin copia, que es lo que consume
+        el detector de movimiento.
+        
+        Args:
+            lores: Ignorado: el ISP genera el stream lores sin coste de CPU
+                y se entrega siempre.
+        
+        Returns:
+            Tupla (main, lores): ``main`` en RGB888 y ``lores`` como vista 2D
+            del plano Y, o (frame, None) si no hay stream lores configurado.
+        """
+        if self.lores_size is None:
+            return self.capture_frame(), None
+        
+        if not self.is_running or self.camera is None:
+            logger.warning("Cámara no está corriendo")
+            return None, None
+        
+        try:
+            (main, lores_yuv), _ = self.camera.capture_arrays(["main", "lores"])
+            # Las primeras `height` filas del buffer YUV420 son el plano Y; el
+            # array puede incluir padding de stride, así que se recorta al ancho real
+            lores_w, lores_h = self.lores_size
+            return main, lores_yuv[:lores_h, :lores_w]
+        except Exception as e:
+            logger.error(f"Error capturando streams: {e}", exc_info=True)
+            return None, None
+    
     def stop(self) -> None:
         """Detiene la captura de video."""
         if self.camera is not None and self.is_running:
@@ -189,26 +244,6 @@ class IMX219Handler:
         cam_config = self.config.get('camera', {})
         return cam_config.get('framerate', 30)
     
-    def __enter__(self) -> 'IMX219Handler':
-        """Context manager entry.
-        
-        Returns:
-            Self.
-        """
-        self.start()
-        return self
-    
-    def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception], 
-                 exc_tb: Optional[Any]) -> None:
-        """Context manager exit.
-        
-        Args:
-            exc_type: Tipo de excepción si la hay.
-            exc_val: Valor de excepción si la hay.
-            exc_tb: Traceback si la hay.
-        """
-        self.stop()
-    
     def __del__(self) -> None:
         """Destructor - asegura que la cámara se detenga."""
         self.stop()
@@ -0,0 +1,296 @@
+"""Fuentes de frames de reproducción para pruebas y benchmarks.
+
+Este módulo implementa fuentes que no requieren hardware Raspberry Pi:
+archivos de video, episodios grabados (``data/episodes/<id>``, como
+imágenes o como contenedor de video) y
+un generador sintético determinista. Todas soportan ritmo en tiempo real
+o modo "lo más rápido posible".
+"""
+
+import logging
+import json
+from pathlib import Path
+from typing import Optional, Tuple, List
+import numpy as np
+import cv2
+
+from src.camera.frame_source import PacedFrameSource
+
+
+logger = logging.getLogger(__name__)
+
+
+class VideoFileSource(PacedFrameSource):
+    """Fuente de frames que reproduce un archivo de video.
+
+    Attributes:
+        path: Ruta al archivo de video.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fps: Optional[float] = None,
+        realtime: bool = True,
+        loop: bool = False,
+        lores_size: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Inicializa la fuente de video.
+
+        Args:
+            path: Ruta al archivo de video.
+            fps: Framerate de reproducción (None = el del archivo).
+            realtime: Si True, respeta el framerate.
+            loop: Si True, reinicia al llegar al final.
+            lores_size: Tamaño (width, height) del stream lores (opcional).
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si OpenCV no puede abrir el archivo.
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Archivo de video no encontrado: {path}")
+
+        self._capture = cv2.VideoCapture(str(self.path))
+        if not self._capture.isOpened():
+            raise ValueError(f"No se pudo abrir el video: {path}")
+
+        file_fps = self._capture.get(cv2.CAP_PROP_FPS)
+        self._width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self._height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        super().__init__(fps=fps or file_fps or 30, realtime=realtime, loop=loop,
+                         lores_size=lores_size)
+        logger.info(f"VideoFileSource: {self.path} ({self._width}x{self._height})")
+
+    def _read_next(self) -> Optional[np.ndarray]:
+        """Lee y convierte a RGB el siguiente frame del video."""
+        ret, frame_bgr = self._capture.read()
+        if not ret:
+            return None
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+
+    def _rewind(self) -> None:
+        """Vuelve al inicio del video."""
+        self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def get_resolution(self) -> Tuple[int, int]:
+        """Obtiene la resolución del video.
+
+        Returns:
+            Tupla (width, height).
+        """
+        return (self._width, self._height)
+
+    def __del__(self) -> None:
+        """Destructor - libera el archivo de video."""
+        capture = getattr(self, '_capture', None)
+        if capture is not None:
+            capture.release()
+
+
+class EpisodeImageSource(PacedFrameSource):
+    """Fuente de frames que reproduce un episodio grabado.
+
+    Acepta tanto el directorio del episodio (``data/episodes/<id>``) como
+    su subdirectorio ``images``. El framerate se lee de ``info.json``
+    si no se indica explícitamente.
+
+    Attributes:
+        episode_dir: Directorio del episodio.
+        frame_paths: Rutas de las imágenes en orden de reproducción.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fps: Optional[float] = None,
+        realtime: bool = True,
+        loop: bool = False,
+        lores_size: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Inicializa la fuente de episodio.
+
+        Args:
+            path: Directorio del episodio o de sus imágenes.
+            fps: Framerate de reproducción (None = el de info.json).
+            realtime: Si True, respeta el framerate.
+            loop: Si True, reinicia al llegar al final.
+            lores_size: Tamaño (width, height) del stream lores (opcional).
+
+        Raises:
+            FileNotFoundError: Si el directorio no existe o no contiene imágenes.
+        """
+        base = Path(path)
+        if not base.is_dir():
+            raise FileNotFoundError(f"Directorio de episodio no encontrado: {path}")
+
+        if (base / "images").is_dir():
+            images_dir = base / "images"
+            self.episode_dir = base
+        else:
+            images_dir = base
+            self.episode_dir = base.parent if base.name == "images" else base
+        self.frame_paths: List[Path] = sorted(
+            p for p in images_dir.iterdir() if p.suffix in (".jpg", ".webp", ".png")
+        )
+        if not self.frame_paths:
+            raise FileNotFoundError(f"No hay imágenes en {images_dir}")
+
+        info_fps = None
+        info_path = self.episode_dir / "info.json"
+        if info_path.exists():
+            try:
+                with open(info_path, 'r') as f:
+                    info_fps = json.load(f).get("fps")
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"No se pudo leer {info_path}: {e}")
+
+        first = cv2.imread(str(self.frame_paths[0]))
+        if first is None:
+            raise FileNotFoundError(f"Imagen ilegible: {self.frame_paths[0]}")
+        self._height, self._width = first.shape[:2]
+        self._index = 0
+
+        super().__init__(fps=fps or info_fps or 30, realtime=realtime, loop=loop,
+                         lores_size=lores_size)
+        logger.info(f"EpisodeImageSource: {images_dir} ({len(self.frame_paths)} frames)")
+
+    def _read_next(self) -> Optional[np.ndarray]:
+        """Lee y convierte a RGB la siguiente imagen del episodio."""
+        while self._index < len(self.frame_paths):
+            frame_path = self.frame_paths[self._index]
+            self._index += 1
+            frame_bgr = cv2.imread(str(frame_path))
+            if frame_bgr is not None:
+                return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+            logger.warning(f"Imagen ilegible omitida: {frame_path}")
+        return None
+
+    def _rewind(self) -> None:
+        """Vuelve a la primera imagen."""
+        self._index = 0
+
+    def get_resolution(self) -> Tuple[int, int]:
+        """Obtiene la resolución de las imágenes.
+
+        Returns:
+            Tupla (width, height).
+        """
+        return (self._width, self._height)
+
+
+def open_episode_source(
+    path: str,
+    fps: Optional[float] = None,
+    realtime: bool = True,
+    loop: bool = False,
+    lores_size: Optional[Tuple[int, int]] = None
+) -> PacedFrameSource:
+    """Abre un episodio grabado en cualquiera de sus formatos de almacenamiento.
+
+    Los episodios en formato ``video`` (``video_path`` en ``info.json``) se
+    reproducen con ``VideoFileSource``; el resto, con ``EpisodeImageSource``.
+
+    Args:
+        path: Directorio del episodio (o de sus imágenes).
+        fps: Framerate de reproducción (None = el del episodio).
+        realtime: Si True, respeta el framerate.
+        loop: Si True, reinicia al llegar al final.
+        lores_size: Tamaño (width, height) del stream lores (opcional).
+
+    Returns:
+        Fuente de frames sin iniciar.
+    """
+    info_path = Path(path) / "info.json"
+    if info_path.exists():
+        try:
+            with open(info_path, 'r') as f:
+                info = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"No se pudo leer {info_path}: {e}")
+            info = {}
+        if info.get("video_path"):
+            return VideoFileSource(str(Path(path) / info["video_path"]), fps=fps or info.get("fps"),
+                                   realtime=realtime, loop=loop, lores_size=lores_size)
+    return EpisodeImageSource(path, fps=fps, realtime=realtime, loop=loop, lores_size=lores_size)
+
+
+class SyntheticSource(PacedFrameSource):
+    """Generador sintético y determinista de frames.
+
+    Produce un fondo con ruido fijo sobre el que un rectángulo se desplaza
+    durante ``motion_frames`` frames y desaparece durante ``idle_frames``,
+    de modo que el detector abre y cierra episodios de forma reproducible.
+    """
+
+    def __init__(
+        self,
+        width: int = 1280,
+        height: int = 720,
+        fps: float = 15,
+        realtime: bool = True,
+        loop: bool = False,
+        lores_size: Optional[Tuple[int, int]] = None,
+        total_frames: Optional[int] = None,
+        motion_frames: int = 60,
+        idle_frames: int = 120,
+        seed: int = 0
+    ) -> None:
+        """Inicializa el generador sintético.
+
+        Args:
+            width: Ancho de los frames.
+            height: Alto de los frames.
+            fps: Framerate nominal.
+            realtime: Si True, respeta el framerate.
+            loop: Si True, reinicia al llegar a ``total_frames``.
+            lores_size: Tamaño (width, height) del stream lores (opcional).
+            total_frames: Número de frames a generar (None = infinito).
+            motion_frames: Frames consecutivos con objeto en movimiento.
+            idle_frames: Frames consecutivos sin objeto.
+            seed: Semilla del ruido de fondo.
+        """
+        self._width = width
+        self._height = height
+        self.total_frames = total_frames
+        self.motion_frames = motion_frames
+        self.idle_frames = idle_frames
+
+        rng = np.random.default_rng(seed)
+        self._background = rng.integers(90, 110, (height, width, 3), dtype=np.uint8)
+        self._box_size = max(16, min(width, height) // 6)
+        self._index = 0
+
+        super().__init__(fps=fps, realtime=realtime, loop=loop,
+                         lores_size=lores_size)
+
+    def _read_next(self) -> Optional[np.ndarray]:
+        """Genera el siguiente frame sintético."""
+        if self.total_frames is not None and self._index >= self.total_frames:
+            return None
+
+        frame = self._background.copy()
+        cycle = self.motion_frames + self.idle_frames
+        phase = self._index % cycle if cycle > 0 else 0
+        if phase < self.motion_frames:
+            travel = max(1, self._width - self._box_size)
+            x = int(travel * phase / max(1, self.motion_frames - 1))
+            y = (self._height - self._box_size) // 2
+            frame[y:y + self._box_size, x:x + self._box_size] = (240, 240, 240)
+
+        self._index += 1
+        return frame
+
+    def _rewind(self) -> None:
+        """Vuelve al primer frame generado."""
+        self._index = 0
+
+    def get_resolution(self) -> Tuple[int, int]:
+        """Obtiene la resolución generada.
+
+        Returns:
+            Tupla (width, height).
+        """
+        return (self._width, self._height)
@@ -1,5 +1,17 @@
 """Módulo de integración con LeRobotDataset."""
 
-from .lerobot_dataset import EpisodeRecorder
+from .lerobot_dataset import EpisodeRecorder, EpisodeSnapshot, EpisodeWriteResult
+from .episode_writer import EpisodeWriter
+from .episode_video import EpisodeVideoWriter
+from .lerobot_v3 import LeRobotV3Dataset
+from .retention import RetentionManager
 
-__all__ = ['EpisodeRecorder']
+__all__ = [
+    'EpisodeRecorder',
+    'EpisodeSnapshot',
+    'EpisodeWriteResult',
+    'EpisodeWriter',
+    'EpisodeVideoWriter',
+    'LeRobotV3Dataset',
+    'RetentionManager',
+]
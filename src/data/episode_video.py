@@ -0,0 +1,122 @@
+"""Almacenamiento de episodios como un único contenedor de video.
+
+En lugar de un archivo de imagen por frame, el episodio se escribe en un
+solo archivo (MJPEG en AVI o MPEG-4 en MP4) a medida que se graba. Evita
+miles de creaciones de archivos pequeños por hora en la tarjeta SD. Los
+instantes y metadatos de cada frame se guardan aparte en
+``timestamps.json``, porque el contenedor solo conoce un framerate fijo.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+import cv2
+
+
+logger = logging.getLogger(__name__)
+
+# Códecs de video: FOURCC, extensión del contenedor y backend alternativo
+# de OpenCV si el backend por defecto (FFmpeg) no está disponible. El
+# escritor MJPEG integrado en OpenCV funciona siempre, pero genera
+# archivos mayores.
+VIDEO_CODECS: Dict[str, Tuple[str, str, Optional[int]]] = {
+    "mjpg": ("MJPG", ".avi", cv2.CAP_OPENCV_MJPEG),
+    "mp4v": ("mp4v", ".mp4", None),
+}
+
+VIDEO_BASENAME = "episode"
+TIMESTAMPS_FILE = "timestamps.json"
+
+
+class EpisodeVideoWriter:
+    """Escritor incremental de un episodio en un contenedor de video.
+
+    El archivo se abre con el primer frame (cuando se conoce la
+    resolución) y cada frame se codifica y escribe al añadirlo, de modo
+    que el episodio no retiene frames en memoria.
+
+    Attributes:
+        path: Ruta del archivo de video.
+        frame_count: Frames escritos.
+    """
+
+    def __init__(
+        self,
+        episode_dir: Path,
+        codec: str = "mjpg",
+        fps: float = 30.0,
+        quality: int = 85,
+        basename: str = VIDEO_BASENAME
+    ) -> None:
+        """Inicializa el escritor sin abrir el archivo.
+
+        Args:
+            episode_dir: Directorio del episodio.
+            codec: Clave de ``VIDEO_CODECS``.
+            fps: Framerate nominal del contenedor.
+            quality: Calidad (0-100), si el backend la admite.
+            basename: Nombre del archivo sin extensión.
+
+        Raises:
+            ValueError: Si el códec no existe.
+        """
+        if codec not in VIDEO_CODECS:
+            raise ValueError(f"Códec de video desconocido: {codec}")
+        fourcc, extension, _ = VIDEO_CODECS[codec]
+        self.codec: str = codec
+        self.fps: float = fps
+        self.quality: int = quality
+        self.path: Path = Path(episode_dir) / f"{basename}{extension}"
+        self.frame_count: int = 0
+        self._fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._size: Optional[Tuple[int, int]] = None
+
+    @property
+    def filename(self) -> str:
+        """Nombre del archivo relativo al directorio del episodio."""
+        return self.path.name
+
+    def _open(self, size: Tuple[int, int]) -> None:
+        """Abre el contenedor con la resolución del primer frame.
+
+        Raises:
+            IOError: Si OpenCV no puede abrir el archivo.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        writer = cv2.VideoWriter(str(self.path), self._fourcc, self.fps, size)
+        fallback = VIDEO_CODECS[self.codec][2]
+        if not writer.isOpened() and fallback is not None:
+            logger.warning(f"Backend de video por defecto no disponible para {self.codec}, usando el integrado")
+            writer = cv2.VideoWriter(str(self.path), fallback, self._fourcc, self.fps, size)
+        if not writer.isOpened():
+            raise IOError(f"No se pudo abrir el video {self.path} ({self.codec})")
+        # Solo algunos backends admiten calidad (p.ej. el MJPEG integrado)
+        writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.quality)
+        self._writer = writer
+        self._size = size
+        logger.debug(f"Video de episodio abierto: {self.path} {size[0]}x{size[1]} @ {self.fps:.1f} FPS")
+
+    def write(self, frame: np.ndarray) -> None:
+        """Codifica y escribe un frame RGB.
+
+        Los frames de distinto tamaño que el primero se redimensionan, ya
+        que el contenedor tiene resolución fija.
+
+        Args:
+            frame: Frame RGB.
+        """
+        size = (frame.shape[1], frame.shape[0])
+        if self._writer is None:
+            self._open(size)
+        elif size != self._size:
+            frame = cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA)
+        self._writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        self.frame_count += 1
+
+    def release(self) -> None:
+        """Cierra el contenedor (escribe el índice del AVI/MP4)."""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
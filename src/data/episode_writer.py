@@ -0,0 +1,160 @@
+"""Escritor de episodios en segundo plano.
+
+Los episodios cerrados (``EpisodeSnapshot``) se encolan en una cola
+acotada y un thread propio los escribe en disco. Al terminar cada
+escritura se llama al callback del episodio (actualizar la base de datos,
+notificar) desde el thread del escritor. Si la cola está llena, quien
+entrega el episodio espera: los episodios no se descartan, y el tiempo de
+espera se registra como métrica de contrapresión.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional, Dict, Any, Tuple
+
+from src.data.lerobot_dataset import EpisodeSnapshot, EpisodeWriteResult
+from src.pipeline.stage import PipelineStage
+
+
+logger = logging.getLogger(__name__)
+
+CompletionCallback = Callable[[EpisodeWriteResult], None]
+
+
+class EpisodeWriter:
+    """Escritor de episodios con cola acotada y thread propio.
+
+    Attributes:
+        written: Episodios escritos correctamente.
+        failed: Episodios cuya escritura falló.
+        frames_written: Frames escritos en total.
+    """
+
+    def __init__(self, max_pending: int = 2, submit_timeout: Optional[float] = None) -> None:
+        """Inicializa el escritor.
+
+        Args:
+            max_pending: Episodios en cola como máximo (cada uno retiene sus
+                frames en memoria hasta escribirse).
+            submit_timeout: Espera máxima al entregar un episodio con la cola
+                llena (None = esperar siempre).
+        """
+        self._stage = PipelineStage(
+            "episode_writer",
+            self._write,
+            maxsize=max_pending,
+            policy='block',
+            put_timeout=submit_timeout
+        )
+        self.written: int = 0
+        self.failed: int = 0
+        self.frames_written: int = 0
+        self._lock = threading.Lock()
+        self._pending_frames: int = 0
+        self._pending_bytes: int = 0
+        self._submit_wait: float = 0.0
+        self._blocked_submits: int = 0
+        self._rejected: int = 0
+        self._max_write: float = 0.0
+        self._total_write: float = 0.0
+
+    def start(self) -> None:
+        """Arranca el thread de escritura."""
+        self._stage.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Detiene el escritor tras escribir los episodios pendientes.
+
+        Args:
+            timeout: Espera máxima para vaciar la cola.
+        """
+        self._stage.stop(timeout=timeout)
+
+    def submit(self, snapshot: EpisodeSnapshot, on_complete: Optional[CompletionCallback] = None) -> bool:
+        """Entrega un episodio para escribirlo en segundo plano.
+
+        Args:
+            snapshot: Episodio cerrado.
+            on_complete: Función llamada con el resultado (desde el thread
+                del escritor).
+
+        Returns:
+            True si se encoló, False si se agotó ``submit_timeout``.
+        """
+        frames = snapshot.frame_count
+        nbytes = snapshot.nbytes
+        with self._lock:
+            self._pending_frames += frames
+            self._pending_bytes += nbytes
+
+        started = time.perf_counter()
+        full = len(self._stage.queue) >= self._stage.queue.maxsize
+        accepted = self._stage.submit((snapshot, on_complete))
+        waited = time.perf_counter() - started
+
+        with self._lock:
+            self._submit_wait += waited
+            if full:
+                self._blocked_submits += 1
+            if not accepted:
+                self._rejected += 1
+                self._pending_frames -= frames
+                self._pending_bytes -= nbytes
+
+        if full:
+            logger.warning(f"Cola del escritor llena: entrega de {snapshot.episode_id} esperó {waited:.2f}s")
+        if not accepted:
+            logger.error(f"Episodio {snapshot.episode_id} descartado: cola del escritor llena")
+        return accepted
+
+    def _write(self, job: Tuple[EpisodeSnapshot, Optional[CompletionCallback]]) -> None:
+        """Escribe un episodio y llama a su callback (thread del escritor)."""
+        snapshot, on_complete = job
+        result = snapshot.write_result()
+
+        with self._lock:
+            self._pending_frames -= result.frame_count
+            self._pending_bytes -= snapshot.nbytes
+            self._total_write += result.write_seconds
+            self._max_write = max(self._max_write, result.write_seconds)
+            if result.ok:
+                self.written += 1
+                self.frames_written += result.frame_count
+            else:
+                self.failed += 1
+
+        # Liberar los frames en cuanto están en disco
+        snapshot.frames = []
+
+        if on_complete is not None:
+            try:
+                on_complete(result)
+            except Exception as e:
+                logger.error(f"Error en callback del episodio {result.episode_id}: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene métricas de escritura y contrapresión.
+
+        Returns:
+            Diccionario con cola, frames y memoria pendientes, tiempos de
+            escritura y esperas de quien entrega episodios.
+        """
+        stage_stats = self._stage.get_stats()
+        with self._lock:
+            completed = self.written + self.failed
+            return {
+                "queue_depth": stage_stats["depth"],
+                "queue_capacity": stage_stats["capacity"],
+                "running": stage_stats["running"],
+                "pending_frames": self._pending_frames,
+                "pending_mb": self._pending_bytes / (1024 * 1024),
+                "written": self.written,
+                "failed": self.failed,
+                "frames_written": self.frames_written,
+                "avg_write_ms": 1000 * self._total_write / completed if completed else 0.0,
+                "max_write_ms": 1000 * self._max_write,
+                "blocked_submits": self._blocked_submits,
+                "submit_wait_ms": 1000 * self._submit_wait,
+                "rejected": self._rejected
+            }
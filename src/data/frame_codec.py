@@ -0,0 +1,57 @@
+"""Codificación de frames de episodio como imágenes comprimidas."""
+
+from typing import Any, Dict
+import numpy as np
+import cv2
+
+
+# Códecs de imagen para los frames de episodio: extensión y parámetro de calidad
+FRAME_CODECS: Dict[str, Any] = {
+    "jpg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", None),  # Sin pérdida, ignora la calidad
+}
+
+
+def encode_frame(frame: np.ndarray, codec: str = "jpg", quality: int = 85) -> bytes:
+    """Codifica un frame RGB con el códec indicado.
+    
+    Args:
+        frame: Frame RGB.
+        codec: Clave de ``FRAME_CODECS``.
+        quality: Calidad (0-100) para los códecs con pérdida.
+        
+    Returns:
+        Bytes de la imagen codificada.
+        
+    Raises:
+        ValueError: Si el códec no existe o la codificación falla.
+    """
+    if codec not in FRAME_CODECS:
+        raise ValueError(f"Códec de frame desconocido: {codec}")
+    extension, quality_flag = FRAME_CODECS[codec]
+    params = [quality_flag, quality] if quality_flag is not None else []
+    # Convertir RGB a BGR para OpenCV
+    frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    ok, buffer = cv2.imencode(extension, frame_bgr, params)
+    if not ok:
+        raise ValueError(f"No se pudo codificar el frame como {codec}")
+    return buffer.tobytes()
+
+
+def decode_frame(data: bytes) -> np.ndarray:
+    """Decodifica una imagen a un frame RGB.
+    
+    Args:
+        data: Bytes de la imagen codificada.
+        
+    Returns:
+        Frame RGB.
+        
+    Raises:
+        ValueError: Si los bytes no son una imagen válida.
+    """
+    frame_bgr = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame_bgr is None:
+        raise ValueError("No se pudo decodificar el frame")
+    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
@@ -1,20 +1,265 @@
 """Integración con LeRobotDataset para almacenamiento de episodios.
 
 Este módulo proporciona una interfaz para guardar episodios de video
-en formato compatible con LeRobotDataset v3.
+como imágenes por frame, como un contenedor de video por episodio o
+directamente en un dataset LeRobotDataset v3 (ver ``lerobot_v3``).
 """
 
 import logging
 import json
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple, TYPE_CHECKING
 import numpy as np
-import cv2
+
+from src.data.frame_codec import FRAME_CODECS, encode_frame, decode_frame
+from src.data.episode_video import EpisodeVideoWriter, VIDEO_CODECS, TIMESTAMPS_FILE
+from src.data.pre_roll import PreRollBuffer
+from src.data.lerobot_v3 import LeRobotV3Dataset
+from src.data.thumbnails import (
+    THUMBNAILS_DIR, FrameReader, image_frame_reader, video_frame_reader, write_thumbnails
+)
+
+if TYPE_CHECKING:
+    from src.data.episode_writer import EpisodeWriter
 
 
 logger = logging.getLogger(__name__)
 
+# Formatos de almacenamiento: una imagen por frame, un contenedor de video
+# por episodio o un dataset LeRobot v3 (Parquet + MP4 por chunks)
+STORAGE_FORMATS = ("images", "video", "lerobot_v3")
+
+
+class EpisodeWriteResult:
+    """Resultado de escribir un episodio en disco.
+    
+    Attributes:
+        episode_id: ID del episodio.
+        path: Directorio del episodio o None si falló.
+        frame_count: Número de frames del episodio.
+        duration_seconds: Duración del episodio según sus metadatos.
+        write_seconds: Tiempo empleado en la escritura.
+        error: Excepción si la escritura falló.
+        thumbnail_dir: Directorio de las miniaturas o None si no se generaron.
+        start_time: Captura del primer frame escrito (incluido el pre-roll).
+        end_time: Captura del último frame escrito.
+    """
+    
+    __slots__ = ('episode_id', 'path', 'frame_count', 'duration_seconds', 'write_seconds', 'error',
+                 'thumbnail_dir', 'start_time', 'end_time')
+    
+    def __init__(
+        self,
+        episode_id: str,
+        path: Optional[str],
+        frame_count: int,
+        duration_seconds: float,
+        write_seconds: float = 0.0,
+        error: Optional[Exception] = None,
+        thumbnail_dir: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> None:
+        """Inicializa el resultado."""
+        self.episode_id = episode_id
+        self.path = path
+        self.frame_count = frame_count
+        self.duration_seconds = duration_seconds
+        self.write_seconds = write_seconds
+        self.error = error
+        self.thumbnail_dir = thumbnail_dir
+        self.start_time = start_time
+        self.end_time = end_time
+    
+    @property
+    def ok(self) -> bool:
+        """Indica si la escritura terminó sin error."""
+        return self.error is None
+
+
+class EpisodeSnapshot:
+    """Episodio cerrado, separado del grabador y pendiente de escribir.
+    
+    Attributes:
+        episode_dir: Directorio destino del episodio.
+        frames: Frames con sus metadatos.
+        metadata: Metadatos del episodio.
+        video: Contenedor de video del episodio (formatos ``video`` y
+            ``lerobot_v3``).
+        dataset: Dataset v3 al que se añade el episodio (formato
+            ``lerobot_v3``).
+        thumbnail_dir: Directorio de las miniaturas, una vez escrito.
+    """
+    
+    def __init__(
+        self,
+        episode_dir: Path,
+        frames: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        video: Optional[EpisodeVideoWriter] = None,
+        dataset: Optional[LeRobotV3Dataset] = None
+    ) -> None:
+        """Inicializa la instantánea.
+        
+        Args:
+            episode_dir: Directorio destino del episodio.
+            frames: Frames con sus metadatos.
+            metadata: Metadatos del episodio.
+            video: Contenedor de video ya escrito durante la grabación.
+            dataset: Dataset v3 destino (en lugar de ``episode_dir``).
+        """
+        self.episode_dir = episode_dir
+        self.frames = frames
+        self.metadata = metadata
+        self.video = video
+        self.dataset = dataset
+        self.thumbnail_dir: Optional[Path] = None
+    
+    @property
+    def episode_id(self) -> str:
+        """ID del episodio."""
+        return self.metadata["episode_id"]
+    
+    @property
+    def frame_count(self) -> int:
+        """Número de frames del episodio."""
+        return len(self.frames)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los frames aún no escritos (bytes)."""
+        return sum(len(frame_data.get("data") or b"") for frame_data in self.frames)
+    
+    def write(self) -> str:
+        """Escribe el episodio en disco en formato LeRobotDataset.
+        
+        Los frames ya están codificados; los que se volcaron a disco durante
+        la grabación no se vuelven a escribir. En formato ``video`` se cierra
+        el contenedor y se escribe el índice de instantes por frame. En
+        formato ``lerobot_v3`` el episodio se añade al dataset. Después se
+        generan las miniaturas a partir de los frames ya escritos.
+        
+        Returns:
+            Ruta al directorio del episodio (al video en formato
+            ``lerobot_v3``).
+        """
+        if self.dataset is not None:
+            video_path = self.dataset.append_episode(self)
+            self._write_thumbnails(
+                self.dataset.root / THUMBNAILS_DIR / self.episode_id, video_frame_reader(Path(video_path))
+            )
+            return video_path
+        
+        episode_dir = self.episode_dir
+        episode_dir.mkdir(parents=True, exist_ok=True)
+        
+        if self.video is not None:
+            self._write_video_index()
+            reader = video_frame_reader(self.video.path)
+        else:
+            self._write_images()
+            reader = image_frame_reader(episode_dir, self.frames)
+        self._write_thumbnails(episode_dir / THUMBNAILS_DIR, reader)
+        
+        # Guardar metadata.json
+        metadata_path = episode_dir / "metadata.json"
+        with open(metadata_path, 'w') as f:
+            json.dump(self.metadata, f, indent=2)
+        
+        # Guardar info.json (formato LeRobotDataset)
+        info_data = {
+            "episode_id": self.episode_id,
+            "start_time": self.metadata["start_time"],
+            "end_time": self.metadata["end_time"],
+            "duration_seconds": self.metadata["duration_seconds"],
+            "fps": self.metadata["fps"],
+            "total_frames": self.frame_count,
+            "resolution": self.metadata["resolution"],
+            "motion_detected": self.metadata.get("motion_detected", False),
+            "storage_format": self.metadata.get("storage_format", "images"),
+            "parent_episode_id": self.metadata.get("parent_episode_id"),
+            "segment_index": self.metadata.get("segment_index", 0)
+        }
+        if self.video is not None:
+            info_data["video_path"] = self.video.filename
+        
+        info_path = episode_dir / "info.json"
+        with open(info_path, 'w') as f:
+            json.dump(info_data, f, indent=2)
+        
+        episode_file_path = str(episode_dir)
+        logger.info(
+            f"Episodio guardado: {self.episode_id} "
+            f"({self.frame_count} frames, {self.metadata['duration_seconds']:.2f}s) "
+            f"en {episode_file_path}"
+        )
+        return episode_file_path
+    
+    def _write_images(self) -> None:
+        """Escribe los frames pendientes como imágenes (bytes ya codificados)."""
+        (self.episode_dir / "images").mkdir(parents=True, exist_ok=True)
+        frame_paths: List[str] = []
+        for frame_data in self.frames:
+            frame_paths.append(frame_data["file"])
+            if frame_data["data"] is not None:
+                with open(self.episode_dir / frame_data["file"], 'wb') as f:
+                    f.write(frame_data["data"])
+        
+        self.metadata["frame_paths"] = frame_paths
+    
+    def _write_video_index(self) -> None:
+        """Cierra el contenedor de video y escribe ``timestamps.json``."""
+        self.video.release()
+        with open(self.episode_dir / TIMESTAMPS_FILE, 'w') as f:
+            json.dump(self.frames, f, indent=2)
+        
+        self.metadata["video_path"] = self.video.filename
+        self.metadata["timestamps_path"] = TIMESTAMPS_FILE
+    
+    def _write_thumbnails(self, output_dir: Path, reader: FrameReader) -> None:
+        """Genera las miniaturas; un fallo no impide guardar el episodio.
+        
+        Args:
+            output_dir: Directorio de las miniaturas.
+            reader: Lector de los frames ya escritos.
+        """
+        try:
+            index = write_thumbnails(output_dir, self.frames, reader)
+        except Exception as e:
+            logger.warning(f"No se pudieron generar las miniaturas de {self.episode_id}: {e}")
+            return
+        if index is not None:
+            self.thumbnail_dir = output_dir
+            self.metadata["thumbnails"] = index
+    
+    def write_result(self) -> EpisodeWriteResult:
+        """Escribe el episodio capturando errores y tiempo de escritura.
+        
+        Returns:
+            Resultado de la escritura.
+        """
+        started = time.perf_counter()
+        path: Optional[str] = None
+        error: Optional[Exception] = None
+        try:
+            path = self.write()
+        except Exception as e:
+            logger.error(f"Error escribiendo episodio {self.episode_id}: {e}", exc_info=True)
+            error = e
+        return EpisodeWriteResult(
+            episode_id=self.episode_id,
+            path=path,
+            frame_count=self.frame_count,
+            duration_seconds=self.metadata.get("duration_seconds", 0.0),
+            write_seconds=time.perf_counter() - started,
+            error=error,
+            thumbnail_dir=str(self.thumbnail_dir) if self.thumbnail_dir is not None else None,
+            start_time=datetime.fromisoformat(self.metadata["start_time"]).timestamp(),
+            end_time=datetime.fromisoformat(self.metadata["end_time"]).timestamp()
+        )
+
 
 class EpisodeRecorder:
     """Grabador de episodios en formato LeRobotDataset.
@@ -27,176 +272,448 @@ class EpisodeRecorder:
         current_episode: Lista de frames del episodio actual.
         episode_metadata: Metadatos del episodio actual.
         episode_id: ID del episodio actual.
+        storage_format: ``images`` (un archivo por frame) o ``video`` (un
+            contenedor por episodio).
+        pre_roll: Últimos segundos de frames previos al episodio (None si
+            el pre-roll está desactivado).
+        parent_episode_id: Episodio padre del segmento en curso (None en el
+            primer segmento).
+        segment_index: Número de segmento del episodio en curso.
     """
     
-    def __init__(self, episode_path: str = "./data/episodes") -> None:
+    def __init__(
+        self,
+        episode_path: str = "./data/episodes",
+        writer: Optional['EpisodeWriter'] = None,
+        codec: str = "jpg",
+        quality: int = 85,
+        memory_budget_mb: float = 8.0,
+        storage_format: str = "images",
+        video_codec: str = "mjpg",
+        fps: float = 30.0,
+        pre_roll_seconds: float = 0.0,
+        pre_roll_budget_mb: float = 2.0,
+        segment_seconds: float = 0.0,
+        segment_max_mb: float = 0.0
+    ) -> None:
         """Inicializa el grabador de episodios.
         
         Args:
             episode_path: Ruta al directorio donde se guardan los episodios.
+            writer: Escritor en segundo plano (opcional). Si se indica,
+                ``finish_episode`` no escribe en disco en el thread que graba.
+            codec: Códec de los frames (ver ``FRAME_CODECS``).
+            quality: Calidad de codificación (0-100).
+            memory_budget_mb: Memoria máxima para frames codificados del
+                episodio en curso; al superarla, los frames más antiguos se
+                vuelcan a disco.
+            storage_format: Formato de almacenamiento (ver ``STORAGE_FORMATS``).
+            video_codec: Códec del contenedor en formato ``video`` (ver
+                ``VIDEO_CODECS``); el formato ``lerobot_v3`` usa siempre MP4.
+            fps: Framerate de los frames grabados (metadatos y contenedor).
+            pre_roll_seconds: Segundos de frames previos que se anteponen a
+                cada episodio (0 = sin pre-roll).
+            pre_roll_budget_mb: Memoria máxima del pre-roll.
+            segment_seconds: Duración a partir de la cual un episodio largo
+                se parte en un nuevo segmento (0 = sin límite).
+            segment_max_mb: Tamaño a partir del cual se parte en un nuevo
+                segmento (0 = sin límite).
+        
+        Raises:
+            ValueError: Si el códec o el formato no existen.
+            ImportError: Si el formato ``lerobot_v3`` no tiene pyarrow.
         """
+        if codec not in FRAME_CODECS:
+            raise ValueError(f"Códec de frame desconocido: {codec}")
+        if storage_format not in STORAGE_FORMATS:
+            raise ValueError(f"Formato de almacenamiento desconocido: {storage_format}")
+        if video_codec not in VIDEO_CODECS:
+            raise ValueError(f"Códec de video desconocido: {video_codec}")
         self.episode_path = Path(episode_path)
+        self.writer = writer
+        self.codec: str = codec
+        self.quality: int = quality
+        self.memory_budget: int = int(memory_budget_mb * 1024 * 1024)
+        self.storage_format: str = storage_format
+        self.video_codec: str = video_codec
+        self.fps: float = fps
         self.episode_path.mkdir(parents=True, exist_ok=True)
         self.current_episode: List[Dict[str, Any]] = []
         self.episode_metadata: Dict[str, Any] = {}
         self.episode_id: Optional[str] = None
         self.is_recording: bool = False
+        self.memory_bytes: int = 0  # Bytes codificados retenidos en memoria
+        self.spilled_frames: int = 0  # Frames del episodio ya volcados a disco
+        self._spill_cursor: int = 0  # Primer frame aún en memoria
+        self._video: Optional[EpisodeVideoWriter] = None
+        # En formato lerobot_v3 ``episode_path`` es la raíz del dataset
+        self.dataset: Optional[LeRobotV3Dataset] = (
+            LeRobotV3Dataset(str(self.episode_path), fps=fps)
+            if storage_format == "lerobot_v3" else None
+        )
+        if self.dataset is not None:
+            self.fps = self.dataset.fps
+        self.pre_roll: Optional[PreRollBuffer] = (
+            PreRollBuffer(pre_roll_seconds, int(pre_roll_budget_mb * 1024 * 1024), codec, quality)
+            if pre_roll_seconds > 0 else None
+        )
+        self.segment_seconds: float = segment_seconds
+        self.segment_max_bytes: int = int(segment_max_mb * 1024 * 1024)
+        self.parent_episode_id: Optional[str] = None
+        self.segment_index: int = 0
+        self._segment_started: float = 0.0
+        self._encoded_bytes: int = 0  # Bytes codificados del segmento (formato images)
         
-        logger.info(f"EpisodeRecorder inicializado: {self.episode_path}")
+        logger.info(f"EpisodeRecorder inicializado: {self.episode_path} ({storage_format})")
     
-    def start_episode(self, episode_id: Optional[str] = None) -> str:
+    def start_episode(
+        self,
+        episode_id: Optional[str] = None,
+        parent_episode_id: Optional[str] = None,
+        segment_index: int = 0,
+        start_time: Optional[float] = None
+    ) -> str:
         """Inicia un nuevo episodio.
         
+        Los frames del pre-roll se anteponen al episodio, marcados con
+        ``pre_roll: True``.
+        
         Args:
             episode_id: ID del episodio (se genera automáticamente si None).
+            parent_episode_id: Episodio padre si es un segmento de continuación.
+            segment_index: Número de segmento (0 = primer segmento).
+            start_time: Instante de captura del inicio (por defecto, ahora).
+                La duración del segmento se mide desde él, en el mismo reloj
+                que el ``now`` de ``segment_due``.
             
         Returns:
             ID del episodio.
         """
         if self.is_recording:
             logger.warning("Ya hay un episodio en grabación, finalizando el anterior")
-            self.save_episode()
+            self.finish_episode()
         
         if episode_id is None:
             episode_id = f"ep_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         self.episode_id = episode_id
+        self.parent_episode_id = parent_episode_id
+        self.segment_index = segment_index
+        self._segment_started = time.time() if start_time is None else start_time
+        self._encoded_bytes = 0
         self.current_episode = []
+        self._reset_memory()
         self.episode_metadata = {
             "episode_id": episode_id,
             "start_time": datetime.now().isoformat(),
-            "fps": 30,  # Se actualizará al guardar
+            "fps": self.fps,
             "resolution": None,  # Se establecerá con el primer frame
             "motion_detected": True,
-            "total_frames": 0
+            "total_frames": 0,
+            "storage_format": self.storage_format,
+            "codec": self.codec if self.storage_format == "images" else self.video_codec,
+            "pre_roll_frames": 0,
+            "parent_episode_id": parent_episode_id,
+            "segment_index": segment_index
         }
         self.is_recording = True
         
+        if self.pre_roll is not None and segment_index == 0:
+            pre_roll_frames = self.pre_roll.drain()
+            for entry in pre_roll_frames:
+                self._append_frame(
+                    None, entry.data, entry.shape,
+                    {**entry.metadata, "pre_roll": True},
+                    datetime.fromtimestamp(entry.timestamp)
+                )
+            self.episode_metadata["pre_roll_frames"] = len(pre_roll_frames)
+        
         logger.info(f"Episodio iniciado: {episode_id}")
         return episode_id
     
+    def buffer_pre_roll(
+        self,
+        frame: np.ndarray,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """Guarda un frame en el pre-roll mientras no hay episodio.
+        
+        Args:
+            frame: Frame RGB. No se retiene.
+            metadata: Metadatos del frame (opcional).
+            timestamp: Instante de captura (por defecto, ahora).
+        """
+        if self.pre_roll is not None and not self.is_recording:
+            self.pre_roll.add(frame, metadata, timestamp)
+    
     def add_frame(
         self,
         frame: np.ndarray,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None
     ) -> None:
         """Añade un frame al episodio actual.
         
+        El frame se codifica al añadirlo: el episodio retiene solo bytes
+        comprimidos, y por encima del presupuesto de memoria los frames más
+        antiguos se vuelcan al directorio del episodio. En formato ``video``
+        el frame se escribe directamente en el contenedor del episodio.
+        
         Args:
-            frame: Frame de video (numpy array RGB).
+            frame: Frame de video (numpy array RGB). No se retiene.
             metadata: Metadatos adicionales del frame (opcional).
+            timestamp: Instante de captura (por defecto, ahora). Con el
+                pipeline, el frame llega a la persistencia con retraso: el
+                instante de captura es el que va a ``timestamps.json``.
         """
         if not self.is_recording:
             logger.warning("No hay episodio activo, iniciando uno nuevo")
             self.start_episode()
         
-        # Limitar tamaño de episodio para evitar problemas de memoria
-        MAX_EPISODIE_FRAMES = 300  # ~10 segundos a 30 FPS
-        if len(self.current_episode) >= MAX_EPISODIE_FRAMES:
-            logger.warning(f"Episodio alcanzó límite de {MAX_EPISODIE_FRAMES} frames, guardando...")
-            self.save_episode()
-            self.start_episode()
+        captured = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+        self._append_frame(frame, None, frame.shape, metadata, captured)
+    
+    def _append_frame(
+        self,
+        frame: Optional[np.ndarray],
+        encoded: Optional[bytes],
+        shape: Tuple[int, ...],
+        metadata: Optional[Dict[str, Any]],
+        timestamp: datetime
+    ) -> None:
+        """Añade al episodio un frame crudo o ya codificado (pre-roll).
         
+        Los frames del pre-roll ya están codificados con el códec del
+        grabador: en formato ``images`` se guardan tal cual y en los
+        formatos de video se decodifican para escribirlos en el contenedor.
+        """
+        frame_index = len(self.current_episode)
+        if frame_index == 0:
+            # El episodio empieza con la captura de su primer frame (el
+            # primero del pre-roll si lo hay), en el mismo reloj que los frames
+            self.episode_metadata["start_time"] = timestamp.isoformat()
         frame_data: Dict[str, Any] = {
-            "frame_index": len(self.current_episode),
-            "timestamp": datetime.now().isoformat(),
-            "frame": frame.copy()  # Copia para evitar modificaciones
+            "frame_index": frame_index,
+            "timestamp": timestamp.isoformat()
         }
         
+        if self.storage_format != "images":
+            if self._video is None:
+                self._video = self._open_video()
+            self._video.write(frame if frame is not None else decode_frame(encoded))
+            data = b""
+        else:
+            extension = FRAME_CODECS[self.codec][0]
+            data = encoded if encoded is not None else encode_frame(frame, self.codec, self.quality)
+            frame_data["file"] = f"images/frame_{frame_index:06d}{extension}"
+            frame_data["data"] = data
+        
         if metadata:
             frame_data.update(metadata)
         
         self.current_episode.append(frame_data)
+        self.memory_bytes += len(data)
+        self._encoded_bytes += len(data)
         
         # Actualizar resolución en metadata si es el primer frame
-        if self.episode_metadata.get("resolution") is None and len(frame.shape) >= 2:
+        if self.episode_metadata.get("resolution") is None and len(shape) >= 2:
             self.episode_metadata["resolution"] = {
-                "width": frame.shape[1],
-                "height": frame.shape[0]
+                "width": shape[1],
+                "height": shape[0]
             }
+        
+        if self.memory_bytes > self.memory_budget:
+            self._spill()
     
-    def save_episode(self) -> Optional[str]:
-        """Guarda el episodio actual en formato LeRobotDataset.
+    @property
+    def segment_bytes(self) -> int:
+        """Tamaño aproximado del segmento en curso (bytes)."""
+        if self._video is not None:
+            try:
+                return self._video.path.stat().st_size
+            except OSError:
+                return 0
+        return self._encoded_bytes
+    
+    def segment_due(self, now: Optional[float] = None) -> bool:
+        """Indica si el segmento en curso alcanzó su duración o tamaño máximo.
         
+        Args:
+            now: Instante actual (por defecto, ahora).
+            
         Returns:
-            Ruta al episodio guardado o None si no hay episodio.
+            True si hay que pasar a un nuevo segmento.
         """
-        if not self.is_recording or len(self.current_episode) == 0:
-            logger.warning("No hay episodio para guardar")
-            return None
+        if not self.is_recording or not self.current_episode:
+            return False
+        now = time.time() if now is None else now
+        if self.segment_seconds > 0 and now - self._segment_started >= self.segment_seconds:
+            return True
+        return self.segment_max_bytes > 0 and self.segment_bytes >= self.segment_max_bytes
+    
+    def roll_segment(
+        self,
+        on_complete: Optional[Callable[['EpisodeWriteResult'], None]] = None,
+        now: Optional[float] = None
+    ) -> Optional[str]:
+        """Cierra el segmento en curso y continúa el episodio en uno nuevo.
+        
+        El segmento cerrado se entrega al escritor en segundo plano, de modo
+        que el siguiente frame ya va al nuevo segmento sin esperar al disco.
+        Los segmentos comparten el ID del primero como ``parent_episode_id``
+        y se numeran con ``segment_index``.
         
-        if self.episode_id is None:
-            logger.error("Episode ID no establecido")
+        Args:
+            on_complete: Función llamada con el resultado de escribir el
+                segmento cerrado.
+            now: Instante de inicio del nuevo segmento (por defecto, ahora).
+            
+        Returns:
+            ID del nuevo segmento o None si no había episodio.
+        """
+        if not self.is_recording:
             return None
+        parent_episode_id = self.parent_episode_id or self.episode_id
+        segment_index = self.segment_index + 1
+        self.finish_episode(on_complete=on_complete)
+        segment_id = f"{parent_episode_id}_s{segment_index:03d}"
+        self.start_episode(segment_id, parent_episode_id=parent_episode_id, segment_index=segment_index,
+                           start_time=now)
+        logger.info(f"Episodio {parent_episode_id}: continúa en el segmento {segment_index} ({segment_id})")
+        return segment_id
+    
+    def _open_video(self) -> EpisodeVideoWriter:
+        """Crea el contenedor de video del episodio en curso."""
+        if self.dataset is not None:
+            return self.dataset.staging_video(self.episode_id, quality=self.quality)
+        return EpisodeVideoWriter(
+            self.episode_path / self.episode_id,
+            codec=self.video_codec,
+            fps=self.fps,
+            quality=self.quality
+        )
+    
+    def _spill(self) -> None:
+        """Vuelca a disco los frames más antiguos hasta volver al presupuesto."""
+        images_dir = self.episode_path / self.episode_id / "images"
+        images_dir.mkdir(parents=True, exist_ok=True)
         
-        # Crear directorio del episodio
-        episode_dir = self.episode_path / self.episode_id
-        episode_dir.mkdir(parents=True, exist_ok=True)
-        images_dir = episode_dir / "images"
-        images_dir.mkdir(exist_ok=True)
+        while self.memory_bytes > self.memory_budget and self._spill_cursor < len(self.current_episode):
+            frame_data = self.current_episode[self._spill_cursor]
+            self._spill_cursor += 1
+            data = frame_data["data"]
+            with open(self.episode_path / self.episode_id / frame_data["file"], 'wb') as f:
+                f.write(data)
+            frame_data["data"] = None
+            self.memory_bytes -= len(data)
+            self.spilled_frames += 1
         
-        # Guardar frames como imágenes
-        frame_paths: List[str] = []
-        for frame_data in self.current_episode:
-            frame = frame_data["frame"]
-            frame_index = frame_data["frame_index"]
-            
-            # Guardar frame como JPEG
-            frame_filename = f"frame_{frame_index:06d}.jpg"
-            frame_path = images_dir / frame_filename
-            frame_paths.append(str(frame_path.relative_to(episode_dir)))
-            
-            # Convertir RGB a BGR para OpenCV
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            cv2.imwrite(str(frame_path), frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        logger.debug(
+            f"Episodio {self.episode_id}: {self.spilled_frames} frames volcados a disco, "
+            f"{self.memory_bytes / 1024:.0f} KB en memoria"
+        )
+    
+    def _reset_memory(self) -> None:
+        """Reinicia los contadores de memoria del episodio en curso."""
+        self.memory_bytes = 0
+        self.spilled_frames = 0
+        self._spill_cursor = 0
+    
+    def detach_episode(self) -> Optional['EpisodeSnapshot']:
+        """Separa el episodio actual del grabador sin escribirlo en disco.
         
-        # Actualizar metadata
-        end_time = datetime.now()
-        start_time = datetime.fromisoformat(self.episode_metadata["start_time"])
-        duration = (end_time - start_time).total_seconds()
+        Cierra los metadatos (fin, duración, número de frames) y deja el
+        grabador listo para un nuevo episodio de inmediato; la escritura se
+        hace después con ``EpisodeSnapshot.write``.
         
-        self.episode_metadata.update({
-            "end_time": end_time.isoformat(),
-            "duration_seconds": duration,
-            "total_frames": len(self.current_episode),
-            "frame_paths": frame_paths
-        })
+        Un episodio sin frames se descarta: el grabador queda igualmente
+        listo para el siguiente (y el pre-roll vuelve a llenarse).
         
-        # Guardar metadata.json
-        metadata_path = episode_dir / "metadata.json"
-        with open(metadata_path, 'w') as f:
-            json.dump(self.episode_metadata, f, indent=2)
+        Returns:
+            Instantánea del episodio o None si no hay episodio o no tenía
+            frames.
+        """
+        if not self.is_recording:
+            logger.warning("No hay episodio para guardar")
+            return None
         
-        # Guardar info.json (formato LeRobotDataset)
-        info_data = {
-            "episode_id": self.episode_id,
-            "start_time": self.episode_metadata["start_time"],
-            "end_time": self.episode_metadata["end_time"],
-            "duration_seconds": duration,
-            "fps": self.episode_metadata["fps"],
-            "total_frames": len(self.current_episode),
-            "resolution": self.episode_metadata["resolution"],
-            "motion_detected": self.episode_metadata.get("motion_detected", False)
-        }
+        if len(self.current_episode) == 0 or self.episode_id is None:
+            logger.warning(f"Episodio {self.episode_id} sin frames, descartado")
+            if self._video is not None:
+                self._video.release()
+                self._video.path.unlink(missing_ok=True)
+                self._video = None
+            self._reset_episode()
+            return None
         
-        info_path = episode_dir / "info.json"
-        with open(info_path, 'w') as f:
-            json.dump(info_data, f, indent=2)
+        # Actualizar metadata: fin en la captura del último frame
+        end_time = datetime.fromisoformat(self.current_episode[-1]["timestamp"])
+        start_time = datetime.fromisoformat(self.episode_metadata["start_time"])
+        self.episode_metadata.update({
+            "end_time": end_time.isoformat(),
+            "duration_seconds": (end_time - start_time).total_seconds(),
+            "total_frames": len(self.current_episode)
+        })
         
-        episode_file_path = str(episode_dir)
-        logger.info(
-            f"Episodio guardado: {self.episode_id} "
-            f"({len(self.current_episode)} frames, {duration:.2f}s) "
-            f"en {episode_file_path}"
+        snapshot = EpisodeSnapshot(
+            episode_dir=self.episode_path / self.episode_id,
+            frames=self.current_episode,
+            metadata=self.episode_metadata,
+            video=self._video,
+            dataset=self.dataset
         )
+        self._video = None
+        self._reset_episode()
         
-        # Resetear para próximo episodio
+        return snapshot
+    
+    def _reset_episode(self) -> None:
+        """Deja el grabador sin episodio, listo para el siguiente."""
         self.current_episode = []
         self.episode_metadata = {}
         self.episode_id = None
+        self.parent_episode_id = None
+        self.segment_index = 0
         self.is_recording = False
+        self._reset_memory()
+    
+    def finish_episode(
+        self,
+        on_complete: Optional[Callable[['EpisodeWriteResult'], None]] = None
+    ) -> Optional['EpisodeSnapshot']:
+        """Cierra el episodio actual y lo entrega al escritor en segundo plano.
         
-        return episode_file_path
+        Sin escritor configurado, el episodio se escribe en el momento.
+        
+        Args:
+            on_complete: Función llamada con el resultado de la escritura.
+            
+        Returns:
+            Instantánea entregada o None si no había episodio.
+        """
+        snapshot = self.detach_episode()
+        if snapshot is None:
+            return None
+        
+        if self.writer is not None:
+            self.writer.submit(snapshot, on_complete)
+        else:
+            result = snapshot.write_result()
+            if on_complete is not None:
+                on_complete(result)
+        return snapshot
+    
+    def save_episode(self) -> Optional[str]:
+        """Guarda el episodio actual en formato LeRobotDataset (síncrono).
+        
+        Returns:
+            Ruta al episodio guardado o None si no hay episodio.
+        """
+        snapshot = self.detach_episode()
+        if snapshot is None:
+            return None
+        return snapshot.write()
     
     def stop_episode(self) -> Optional[str]:
         """Detiene y guarda el episodio actual.
@@ -220,5 +737,7 @@ class EpisodeRecorder:
         return {
             "episode_id": self.episode_id,
             "frame_count": len(self.current_episode),
+            "memory_bytes": self.memory_bytes,
+            "spilled_frames": self.spilled_frames,
             "metadata": self.episode_metadata.copy()
         }
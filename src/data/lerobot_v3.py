@@ -0,0 +1,350 @@
+"""Dataset en formato nativo LeRobotDataset v3.
+
+Los episodios cerrados se añaden de forma incremental a un único dataset:
+
+    meta/info.json
+    meta/tasks.parquet
+    meta/episodes/chunk-000/file-000.parquet
+    data/chunk-000/file-000.parquet
+    videos/observation.images.camera/chunk-000/file-000.mp4
+
+Cada episodio ocupa un archivo de datos (tabla de frames con instante,
+movimiento y bounding box) y un archivo de video; los archivos se agrupan
+en chunks de ``chunks_size``. Un entrenamiento puede cargar el dataset
+directamente con lecturas columnares, sin reconvertir los episodios.
+
+El video se graba durante el episodio en ``.staging`` y se mueve a su
+ubicación final al añadir el episodio. ``meta/info.json`` se escribe en
+último lugar: es el punto de confirmación, y los archivos huérfanos de un
+episodio interrumpido se sobrescriben con el siguiente.
+
+Requiere ``pyarrow`` (opcional).
+"""
+
+import logging
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from src.data.episode_video import EpisodeVideoWriter, VIDEO_CODECS
+
+if TYPE_CHECKING:
+    from src.data.lerobot_dataset import EpisodeSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+CODEBASE_VERSION = "v3.0"
+VIDEO_KEY = "observation.images.camera"
+DEFAULT_TASK = "motion episode"
+DATA_PATH = "data/chunk-{chunk_index:03d}/file-{file_index:03d}.parquet"
+VIDEO_PATH = "videos/{video_key}/chunk-{chunk_index:03d}/file-{file_index:03d}.mp4"
+EPISODES_PATH = "meta/episodes/chunk-{chunk_index:03d}/file-{file_index:03d}.parquet"
+TASKS_PATH = "meta/tasks.parquet"
+INFO_PATH = "meta/info.json"
+STAGING_DIR = ".staging"
+
+
+def _write_atomic(path: Path, write: Any) -> None:
+    """Escribe un archivo a través de un temporal y lo renombra.
+
+    Args:
+        path: Ruta destino.
+        write: Función que recibe la ruta temporal y escribe en ella.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class LeRobotV3Dataset:
+    """Dataset LeRobot v3 al que se añaden episodios a medida que se cierran.
+
+    Attributes:
+        root: Directorio raíz del dataset.
+        fps: Framerate de los frames grabados.
+        video_codec: Códec de los videos (contenedor MP4).
+        chunks_size: Archivos por chunk.
+        total_episodes: Episodios confirmados en ``meta/info.json``.
+        total_frames: Frames confirmados en ``meta/info.json``.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        fps: float = 30.0,
+        video_codec: str = "mp4v",
+        chunks_size: int = 1000
+    ) -> None:
+        """Abre o crea el dataset.
+
+        Args:
+            root: Directorio raíz del dataset.
+            fps: Framerate de los frames grabados. Si el dataset ya existe,
+                prevalece el suyo.
+            video_codec: Clave de ``VIDEO_CODECS`` con contenedor MP4.
+            chunks_size: Archivos por chunk.
+
+        Raises:
+            ImportError: Si pyarrow no está instalado.
+        """
+        if pa is None:
+            raise ImportError("pyarrow es necesario para el formato LeRobotDataset v3 (pip install pyarrow)")
+        if VIDEO_CODECS.get(video_codec, (None, None))[1] != ".mp4":
+            logger.warning(f"Códec {video_codec} no usa contenedor MP4, usando mp4v")
+            video_codec = "mp4v"
+
+        self.root = Path(root)
+        self.fps: float = fps
+        self.video_codec: str = video_codec
+        self.chunks_size: int = chunks_size
+        self.total_episodes: int = 0
+        self.total_frames: int = 0
+        self._features: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+        info = self.load_info()
+        if info is not None:
+            self.total_episodes = info["total_episodes"]
+            self.total_frames = info["total_frames"]
+            self.chunks_size = info.get("chunks_size", chunks_size)
+            self._features = info.get("features")
+            if info["fps"] != fps:
+                logger.warning(f"Dataset {self.root} grabado a {info['fps']} FPS (configurado: {fps}), se mantiene")
+                self.fps = info["fps"]
+
+        logger.info(f"Dataset LeRobot v3: {self.root} ({self.total_episodes} episodios, {self.total_frames} frames)")
+
+    def load_info(self) -> Optional[Dict[str, Any]]:
+        """Lee ``meta/info.json``.
+
+        Returns:
+            Diccionario de info o None si el dataset aún no existe.
+        """
+        info_path = self.root / INFO_PATH
+        if not info_path.exists():
+            return None
+        with open(info_path, 'r') as f:
+            return json.load(f)
+
+    def staging_video(self, episode_id: str, quality: int = 85) -> EpisodeVideoWriter:
+        """Crea el escritor de video de un episodio en grabación.
+
+        Args:
+            episode_id: ID del episodio.
+            quality: Calidad de codificación (si el backend la admite).
+
+        Returns:
+            Escritor de video en el directorio de staging.
+        """
+        return EpisodeVideoWriter(
+            self.root / STAGING_DIR,
+            codec=self.video_codec,
+            fps=self.fps,
+            quality=quality,
+            basename=episode_id
+        )
+
+    def _location(self, episode_index: int) -> Dict[str, int]:
+        """Chunk y archivo de un episodio."""
+        chunk_index, file_index = divmod(episode_index, self.chunks_size)
+        return {"chunk_index": chunk_index, "file_index": file_index}
+
+    def append_episode(self, snapshot: 'EpisodeSnapshot') -> str:
+        """Añade un episodio cerrado al dataset.
+
+        Args:
+            snapshot: Episodio con su video ya grabado en staging.
+
+        Returns:
+            Ruta del video del episodio.
+
+        Raises:
+            ValueError: Si el episodio no tiene video.
+        """
+        if snapshot.video is None or snapshot.video.frame_count == 0:
+            raise ValueError(f"Episodio {snapshot.episode_id} sin video")
+
+        with self._lock:
+            episode_index = self.total_episodes
+            location = self._location(episode_index)
+            length = snapshot.frame_count
+
+            # 1. Video: de staging a su ubicación definitiva
+            snapshot.video.release()
+            video_path = self.root / VIDEO_PATH.format(video_key=VIDEO_KEY, **location)
+            video_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(snapshot.video.path, video_path)
+
+            # 2. Tabla de frames
+            data_path = self.root / DATA_PATH.format(**location)
+            table = self._frames_table(snapshot.frames, episode_index)
+            _write_atomic(data_path, lambda p: pq.write_table(table, p))
+
+            # 3. Metadatos del episodio (un archivo por chunk, reescrito)
+            self._append_episode_row(location, {
+                "episode_index": episode_index,
+                "episode_id": snapshot.episode_id,
+                "parent_episode_id": snapshot.metadata.get("parent_episode_id") or "",
+                "segment_index": snapshot.metadata.get("segment_index", 0),
+                "tasks": [DEFAULT_TASK],
+                "length": length,
+                "data/chunk_index": location["chunk_index"],
+                "data/file_index": location["file_index"],
+                "dataset_from_index": self.total_frames,
+                "dataset_to_index": self.total_frames + length,
+                f"videos/{VIDEO_KEY}/chunk_index": location["chunk_index"],
+                f"videos/{VIDEO_KEY}/file_index": location["file_index"],
+                f"videos/{VIDEO_KEY}/from_timestamp": 0.0,
+                f"videos/{VIDEO_KEY}/to_timestamp": length / self.fps,
+                "start_time": snapshot.metadata["start_time"],
+                "end_time": snapshot.metadata["end_time"],
+                "duration_seconds": snapshot.metadata["duration_seconds"]
+            })
+
+            # 4. Confirmación: info.json
+            if self._features is None:
+                self._features = self._build_features(snapshot.metadata["resolution"])
+                _write_atomic(self.root / TASKS_PATH, lambda p: pq.write_table(
+                    pa.table({"task_index": [0], "task": [DEFAULT_TASK]}), p
+                ))
+            self.total_episodes += 1
+            self.total_frames += length
+            self._write_info()
+
+        logger.info(f"Episodio {snapshot.episode_id} añadido al dataset v3 como episodio {episode_index}")
+        return str(video_path)
+
+    def _frames_table(self, frames: List[Dict[str, Any]], episode_index: int) -> 'pa.Table':
+        """Construye la tabla Parquet de frames de un episodio.
+
+        ``timestamp`` es la posición del frame en el video (frame_index / fps),
+        que es lo que usa el decodificador; el instante real de captura se
+        guarda en ``capture_time``. Los frames sin regiones de movimiento
+        tienen ``bbox`` NaN (las columnas de LeRobot son de forma fija).
+        """
+        length = len(frames)
+        no_box = [float("nan")] * 4
+        bbox = [
+            [float(v) for v in frame["bbox"]] if frame.get("bbox") else no_box
+            for frame in frames
+        ]
+        return pa.table({
+            "index": pa.array(range(self.total_frames, self.total_frames + length), pa.int64()),
+            "episode_index": pa.array([episode_index] * length, pa.int64()),
+            "frame_index": pa.array(range(length), pa.int64()),
+            "timestamp": pa.array([i / self.fps for i in range(length)], pa.float32()),
+            "task_index": pa.array([0] * length, pa.int64()),
+            "capture_time": pa.array(
+                [datetime.fromisoformat(frame["timestamp"]).timestamp() for frame in frames],
+                pa.float64()
+            ),
+            "motion": pa.array([bool(frame.get("motion", False)) for frame in frames], pa.bool_()),
+            "motion_energy": pa.array([float(frame.get("motion_energy", 0.0)) for frame in frames], pa.float32()),
+            "bbox": pa.array(bbox, pa.list_(pa.float32(), 4))
+        })
+
+    def _append_episode_row(self, location: Dict[str, int], row: Dict[str, Any]) -> None:
+        """Añade la fila de un episodio al archivo de episodios de su chunk."""
+        episodes_path = self.root / EPISODES_PATH.format(chunk_index=location["chunk_index"], file_index=0)
+        rows: List[Dict[str, Any]] = []
+        if episodes_path.exists():
+            # Descartar filas huérfanas de un episodio interrumpido
+            rows = [
+                r for r in pq.read_table(episodes_path).to_pylist()
+                if r["episode_index"] < row["episode_index"]
+            ]
+        rows.append(row)
+        table = pa.Table.from_pylist(rows)
+        _write_atomic(episodes_path, lambda p: pq.write_table(table, p))
+
+    def _build_features(self, resolution: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        """Describe las columnas y el video del dataset para ``meta/info.json``."""
+        height = resolution["height"] if resolution else 0
+        width = resolution["width"] if resolution else 0
+        scalar = {"shape": [1], "names": None}
+        return {
+            VIDEO_KEY: {
+                "dtype": "video",
+                "shape": [height, width, 3],
+                "names": ["height", "width", "channels"],
+                "info": {
+                    "video.fps": self.fps,
+                    "video.height": height,
+                    "video.width": width,
+                    "video.channels": 3,
+                    "video.codec": VIDEO_CODECS[self.video_codec][0],
+                    "video.pix_fmt": "yuv420p",
+                    "video.is_depth_map": False,
+                    "has_audio": False
+                }
+            },
+            "timestamp": {"dtype": "float32", **scalar},
+            "frame_index": {"dtype": "int64", **scalar},
+            "episode_index": {"dtype": "int64", **scalar},
+            "index": {"dtype": "int64", **scalar},
+            "task_index": {"dtype": "int64", **scalar},
+            "capture_time": {"dtype": "float64", **scalar},
+            "motion": {"dtype": "bool", **scalar},
+            "motion_energy": {"dtype": "float32", **scalar},
+            "bbox": {"dtype": "float32", "shape": [4], "names": ["x", "y", "width", "height"]}
+        }
+
+    def _write_info(self) -> None:
+        """Escribe ``meta/info.json`` con los totales actuales."""
+        info = {
+            "codebase_version": CODEBASE_VERSION,
+            "robot_type": None,
+            "total_episodes": self.total_episodes,
+            "total_frames": self.total_frames,
+            "total_tasks": 1,
+            "chunks_size": self.chunks_size,
+            "fps": self.fps,
+            "splits": {"train": f"0:{self.total_episodes}"},
+            "data_path": DATA_PATH,
+            "video_path": VIDEO_PATH,
+            "features": self._features
+        }
+
+        def write(path: Path) -> None:
+            with open(path, 'w') as f:
+                json.dump(info, f, indent=2)
+
+        _write_atomic(self.root / INFO_PATH, write)
+
+    def read_frames(self) -> 'pa.Table':
+        """Lee la tabla de frames de todo el dataset (lectura columnar).
+
+        Returns:
+            Tabla con los frames de todos los episodios confirmados.
+        """
+        paths = [
+            self.root / DATA_PATH.format(**self._location(index))
+            for index in range(self.total_episodes)
+        ]
+        if not paths:
+            return pa.table({})
+        return pa.concat_tables(pq.read_table(path) for path in paths)
+
+    def read_episodes(self) -> List[Dict[str, Any]]:
+        """Lee los metadatos de todos los episodios confirmados.
+
+        Returns:
+            Lista de filas de ``meta/episodes`` ordenadas por episodio.
+        """
+        rows: List[Dict[str, Any]] = []
+        for chunk_index in range((self.total_episodes + self.chunks_size - 1) // self.chunks_size):
+            path = self.root / EPISODES_PATH.format(chunk_index=chunk_index, file_index=0)
+            rows.extend(pq.read_table(path).to_pylist())
+        return [row for row in rows if row["episode_index"] < self.total_episodes]
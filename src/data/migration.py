@@ -0,0 +1,374 @@
+"""Migración de episodios en formato de imágenes a formatos compactos.
+
+Convierte los episodios ``<origen>/<id>/images/*.jpg`` + ``info.json`` a
+un contenedor de video por episodio (formato ``video``) o a un dataset
+LeRobot v3 (formato ``lerobot_v3``), repartiendo la codificación entre
+procesos. El progreso se registra en un manifiesto JSONL: una ejecución
+interrumpida continúa donde se quedó. Cada episodio convertido se verifica
+contra el ``total_frames`` de su ``info.json`` antes de darlo por bueno y,
+opcionalmente, de borrar el origen.
+
+En formato ``lerobot_v3`` los procesos solo codifican el video; el proceso
+principal añade los episodios al dataset de uno en uno, ya que la
+numeración de episodios es secuencial.
+"""
+
+import logging
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Tuple
+import cv2
+
+from src.data.episode_video import EpisodeVideoWriter
+from src.data.lerobot_dataset import EpisodeSnapshot
+from src.data.lerobot_v3 import LeRobotV3Dataset, STAGING_DIR
+
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_TARGETS = ("video", "lerobot_v3")
+MANIFEST_FILE = "migration_manifest.jsonl"
+IMAGE_SUFFIXES = (".jpg", ".webp", ".png")
+
+
+class MigrationManifest:
+    """Registro de episodios migrados (una línea JSON por episodio).
+
+    Attributes:
+        path: Ruta del manifiesto.
+        completed: IDs de episodios migrados correctamente.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Carga el manifiesto si existe.
+
+        Args:
+            path: Ruta del manifiesto.
+        """
+        self.path = Path(path)
+        self.completed: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Última línea truncada por una interrupción
+                    if entry.get("status") == "done":
+                        self.completed.add(entry["episode_id"])
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Añade el resultado de un episodio y lo fuerza a disco.
+
+        Args:
+            entry: Resultado de ``convert_episode``.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if entry["status"] == "done":
+            self.completed.add(entry["episode_id"])
+
+
+def find_legacy_episodes(source_root: Path) -> List[Path]:
+    """Busca episodios en formato de imágenes.
+
+    Args:
+        source_root: Directorio con un subdirectorio por episodio.
+
+    Returns:
+        Directorios de episodio ordenados por nombre (cronológico).
+    """
+    return sorted(
+        p for p in Path(source_root).iterdir()
+        if (p / "images").is_dir() and (p / "info.json").exists()
+    )
+
+
+def _legacy_frames(episode_dir: Path) -> Tuple[List[Path], Dict[str, Any], Dict[str, Any]]:
+    """Lee las imágenes y metadatos de un episodio en formato de imágenes.
+
+    Returns:
+        Tupla (imágenes ordenadas, info.json, metadata.json).
+    """
+    with open(episode_dir / "info.json", 'r') as f:
+        info = json.load(f)
+    metadata: Dict[str, Any] = dict(info)
+    metadata_path = episode_dir / "metadata.json"
+    if metadata_path.exists():
+        with open(metadata_path, 'r') as f:
+            metadata.update(json.load(f))
+    images = sorted(p for p in (episode_dir / "images").iterdir() if p.suffix in IMAGE_SUFFIXES)
+    return images, info, metadata
+
+
+def convert_episode(
+    episode_dir: str,
+    target: str,
+    output_root: str,
+    fps: float,
+    video_codec: str = "mjpg",
+    quality: int = 85
+) -> Dict[str, Any]:
+    """Convierte un episodio (se ejecuta en un proceso del pool).
+
+    Los instantes por frame no existían en el formato de imágenes: se
+    reparten uniformemente entre el inicio y el fin del episodio.
+
+    Args:
+        episode_dir: Directorio del episodio de origen.
+        target: Formato destino (ver ``MIGRATION_TARGETS``).
+        output_root: Directorio de episodios destino o raíz del dataset v3.
+        fps: Framerate del video destino.
+        video_codec: Códec del contenedor en formato ``video``.
+        quality: Calidad de codificación.
+
+    Returns:
+        Resultado para el manifiesto; en formato ``lerobot_v3`` incluye la
+        instantánea (``snapshot``) a añadir al dataset.
+    """
+    cv2.setNumThreads(1)  # Un proceso por núcleo: sin threads internos
+    started = time.perf_counter()
+    source = Path(episode_dir)
+    result: Dict[str, Any] = {
+        "episode_id": source.name,
+        "source": str(source),
+        "status": "failed",
+        "frames": 0,
+        "worker": os.getpid()
+    }
+    try:
+        images, info, metadata = _legacy_frames(source)
+        expected = info.get("total_frames")
+        if expected is not None and expected != len(images):
+            raise ValueError(f"{len(images)} imágenes, info.json indica {expected}")
+
+        if target == "video":
+            video = EpisodeVideoWriter(Path(output_root) / source.name, codec=video_codec, fps=fps, quality=quality)
+        else:
+            video = EpisodeVideoWriter(Path(output_root) / STAGING_DIR, codec="mp4v", fps=fps,
+                                       quality=quality, basename=source.name)
+
+        start = datetime.fromisoformat(metadata["start_time"])
+        step = metadata.get("duration_seconds", 0.0) / max(len(images), 1)
+        frames: List[Dict[str, Any]] = []
+        for index, image_path in enumerate(images):
+            frame_bgr = cv2.imread(str(image_path))
+            if frame_bgr is None:
+                raise ValueError(f"Imagen ilegible: {image_path.name}")
+            video.write(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB))
+            frames.append({
+                "frame_index": index,
+                "timestamp": (start + timedelta(seconds=index * step)).isoformat(),
+                "motion": metadata.get("motion_detected", True)
+            })
+        video.release()
+
+        # Verificar que el contenedor tiene todos los frames
+        capture = cv2.VideoCapture(str(video.path))
+        try:
+            written = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            capture.release()
+        if written != len(images):
+            raise ValueError(f"El video tiene {written} frames, se esperaban {len(images)}")
+
+        metadata.pop("frame_paths", None)
+        metadata.update({
+            "fps": fps,
+            "storage_format": target,
+            "codec": video.codec,
+            "total_frames": len(frames),
+            "migrated_from": str(source)
+        })
+        snapshot = EpisodeSnapshot(Path(output_root) / source.name, frames, metadata, video=video)
+        if target == "video":
+            result["path"] = snapshot.write()
+        else:
+            result["snapshot"] = snapshot
+        result["status"] = "done"
+        result["frames"] = len(frames)
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+class EpisodeMigrator:
+    """Migración paralela y reanudable de episodios en formato de imágenes.
+
+    Attributes:
+        source_root: Directorio de episodios de origen.
+        output_root: Directorio destino (raíz del dataset en ``lerobot_v3``).
+        target: Formato destino.
+        workers: Procesos de conversión.
+        manifest: Manifiesto de progreso.
+    """
+
+    def __init__(
+        self,
+        source_root: str,
+        output_root: str,
+        target: str = "video",
+        workers: Optional[int] = None,
+        fps: float = 3.0,
+        video_codec: str = "mjpg",
+        quality: int = 85,
+        delete_source: bool = False,
+        manifest_path: Optional[str] = None
+    ) -> None:
+        """Inicializa la migración.
+
+        Args:
+            source_root: Directorio de episodios de origen.
+            output_root: Directorio destino.
+            target: Formato destino (ver ``MIGRATION_TARGETS``).
+            workers: Procesos de conversión (None = núcleos disponibles).
+            fps: Framerate del video destino (los episodios se grababan a
+                15 FPS tomando 1 de cada 5 frames).
+            video_codec: Códec del contenedor en formato ``video``.
+            quality: Calidad de codificación.
+            delete_source: Borrar cada episodio de origen tras migrarlo.
+            manifest_path: Ruta del manifiesto (por defecto, en el destino).
+
+        Raises:
+            ValueError: Si el formato destino no existe o, en formato
+                ``video``, el destino es el mismo directorio que el origen
+                (cada episodio se escribiría sobre el de origen y
+                ``delete_source`` borraría el resultado).
+        """
+        if target not in MIGRATION_TARGETS:
+            raise ValueError(f"Formato destino desconocido: {target}")
+        if target == "video" and Path(source_root).resolve() == Path(output_root).resolve():
+            raise ValueError(f"El destino debe ser distinto del origen: {output_root}")
+        self.source_root = Path(source_root)
+        self.output_root = Path(output_root)
+        self.target: str = target
+        self.workers: int = workers or os.cpu_count() or 1
+        self.fps: float = fps
+        self.video_codec: str = video_codec
+        self.quality: int = quality
+        self.delete_source: bool = delete_source
+        self.manifest = MigrationManifest(Path(manifest_path) if manifest_path else self.output_root / MANIFEST_FILE)
+        self.dataset: Optional[LeRobotV3Dataset] = (
+            LeRobotV3Dataset(str(self.output_root), fps=fps) if target == "lerobot_v3" else None
+        )
+        self._worker_stats: Dict[int, Dict[str, float]] = {}
+
+    def pending_episodes(self) -> List[Path]:
+        """Episodios de origen aún no migrados.
+
+        Returns:
+            Directorios de episodio pendientes.
+        """
+        done = set(self.manifest.completed)
+        if self.dataset is not None:
+            # Episodios añadidos al dataset pero no registrados (interrupción)
+            done.update(row["episode_id"] for row in self.dataset.read_episodes())
+        return [p for p in find_legacy_episodes(self.source_root) if p.name not in done]
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Ejecuta la migración.
+
+        Args:
+            limit: Máximo de episodios a migrar en esta ejecución.
+
+        Returns:
+            Resumen con episodios migrados, fallidos, frames y FPS por proceso.
+        """
+        pending = self.pending_episodes()
+        if limit is not None:
+            pending = pending[:limit]
+        logger.info(
+            f"Migrando {len(pending)} episodios a {self.target} con {self.workers} procesos "
+            f"({len(self.manifest.completed)} ya migrados)"
+        )
+
+        started = time.perf_counter()
+        migrated = failed = frames = 0
+        queue = iter(pending)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Ventana acotada de trabajos en vuelo: no se crean decenas de
+            # miles de futures de golpe
+            in_flight = set()
+            while True:
+                for episode_dir in queue:
+                    in_flight.add(executor.submit(
+                        convert_episode, str(episode_dir), self.target, str(self.output_root),
+                        self.fps, self.video_codec, self.quality
+                    ))
+                    if len(in_flight) >= 2 * self.workers:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = self._complete(future.result())
+                    if result["status"] == "done":
+                        migrated += 1
+                        frames += result["frames"]
+                    else:
+                        failed += 1
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "migrated": migrated,
+            "failed": failed,
+            "frames": frames,
+            "seconds": elapsed,
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+            "workers": self.get_worker_stats()
+        }
+        logger.info(
+            f"Migración terminada: {migrated} episodios, {failed} fallidos, "
+            f"{frames} frames en {elapsed:.1f}s ({summary['fps']:.1f} FPS)"
+        )
+        return summary
+
+    def _complete(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Registra el resultado de un episodio (proceso principal).
+
+        En ``lerobot_v3`` añade el episodio al dataset; tras registrarlo en
+        el manifiesto, borra el origen si se pidió.
+        """
+        snapshot = result.pop("snapshot", None)
+        if snapshot is not None:
+            try:
+                snapshot.dataset = self.dataset
+                result["path"] = snapshot.write()
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = str(e)
+
+        stats = self._worker_stats.setdefault(result["worker"], {"episodes": 0, "frames": 0, "seconds": 0.0})
+        stats["episodes"] += 1
+        stats["frames"] += result["frames"]
+        stats["seconds"] += result["seconds"]
+
+        self.manifest.record(result)
+        if result["status"] != "done":
+            logger.error(f"Error migrando {result['episode_id']}: {result.get('error')}")
+            return result
+
+        if self.delete_source:
+            shutil.rmtree(result["source"], ignore_errors=True)
+        logger.debug(f"Episodio migrado: {result['episode_id']} ({result['frames']} frames)")
+        return result
+
+    def get_worker_stats(self) -> Dict[int, Dict[str, float]]:
+        """FPS de conversión por proceso.
+
+        Returns:
+            Diccionario por PID con episodios, frames, segundos ocupados y FPS.
+        """
+        return {
+            pid: {**stats, "fps": stats["frames"] / stats["seconds"] if stats["seconds"] > 0 else 0.0}
+            for pid, stats in self._worker_stats.items()
+        }
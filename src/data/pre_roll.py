@@ -0,0 +1,135 @@
+"""Buffer circular de pre-roll con frames comprimidos.
+
+Un episodio solo empieza tras varios frames confirmados con movimiento, de
+modo que la entrada del intruso en la escena quedaría fuera. Mientras no se
+graba, los frames muestreados se guardan comprimidos en este buffer (los
+últimos N segundos, con un límite de memoria en bytes) y se anteponen al
+episodio cuando empieza.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import numpy as np
+
+from src.data.frame_codec import encode_frame
+
+
+logger = logging.getLogger(__name__)
+
+
+class PreRollFrame:
+    """Frame comprimido del pre-roll.
+
+    Attributes:
+        timestamp: Instante de captura.
+        data: Bytes codificados.
+        shape: Forma del frame original (alto, ancho, canales).
+        metadata: Metadatos del frame.
+    """
+
+    __slots__ = ('timestamp', 'data', 'shape', 'metadata')
+
+    def __init__(self, timestamp: float, data: bytes, shape: Tuple[int, ...], metadata: Dict[str, Any]) -> None:
+        """Inicializa el frame."""
+        self.timestamp = timestamp
+        self.data = data
+        self.shape = shape
+        self.metadata = metadata
+
+
+class PreRollBuffer:
+    """Últimos segundos de frames comprimidos, acotados en tiempo y bytes.
+
+    No es thread-safe: se usa desde el thread que graba los episodios.
+
+    Attributes:
+        seconds: Ventana de tiempo retenida.
+        max_bytes: Memoria máxima de los frames retenidos.
+        nbytes: Memoria actual de los frames retenidos.
+        evicted: Frames descartados por antigüedad o memoria.
+    """
+
+    def __init__(
+        self,
+        seconds: float = 3.0,
+        max_bytes: int = 2 * 1024 * 1024,
+        codec: str = "jpg",
+        quality: int = 85
+    ) -> None:
+        """Inicializa el buffer.
+
+        Args:
+            seconds: Segundos de pre-roll a retener.
+            max_bytes: Memoria máxima; al superarla se descartan los frames
+                más antiguos aunque estén dentro de la ventana.
+            codec: Códec de los frames (ver ``FRAME_CODECS``).
+            quality: Calidad de codificación.
+        """
+        self.seconds: float = seconds
+        self.max_bytes: int = max_bytes
+        self.codec: str = codec
+        self.quality: int = quality
+        self.nbytes: int = 0
+        self.evicted: int = 0
+        self._frames: Deque[PreRollFrame] = deque()
+
+    def __len__(self) -> int:
+        """Número de frames retenidos."""
+        return len(self._frames)
+
+    def add(self, frame: np.ndarray, metadata: Optional[Dict[str, Any]] = None, timestamp: Optional[float] = None) -> None:
+        """Comprime y añade un frame, descartando los que sobran.
+
+        Args:
+            frame: Frame RGB. No se retiene.
+            metadata: Metadatos del frame (opcional).
+            timestamp: Instante de captura (por defecto, ahora).
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        data = encode_frame(frame, self.codec, self.quality)
+        self._frames.append(PreRollFrame(timestamp, data, frame.shape, dict(metadata or {})))
+        self.nbytes += len(data)
+        self._evict(timestamp)
+
+    def _evict(self, now: float) -> None:
+        """Descarta los frames fuera de la ventana o del presupuesto."""
+        frames = self._frames
+        while frames and (now - frames[0].timestamp > self.seconds or self.nbytes > self.max_bytes):
+            self.nbytes -= len(frames.popleft().data)
+            self.evicted += 1
+
+    def drain(self, now: Optional[float] = None) -> List[PreRollFrame]:
+        """Extrae los frames de la ventana y vacía el buffer.
+
+        Args:
+            now: Instante de referencia para la ventana (por defecto, ahora).
+
+        Returns:
+            Frames en orden de captura.
+        """
+        self._evict(time.time() if now is None else now)
+        frames = list(self._frames)
+        self.clear()
+        return frames
+
+    def clear(self) -> None:
+        """Vacía el buffer."""
+        self._frames.clear()
+        self.nbytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado del buffer.
+
+        Returns:
+            Diccionario con frames, memoria, segundos cubiertos y descartes.
+        """
+        frames = self._frames
+        return {
+            "frames": len(frames),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "seconds": frames[-1].timestamp - frames[0].timestamp if frames else 0.0,
+            "evicted": self.evicted
+        }
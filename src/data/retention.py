@@ -0,0 +1,437 @@
+"""Retención de episodios y cuota de disco.
+
+Los episodios se acumulan en ``storage.episode_path`` hasta llenar la
+tarjeta SD. El gestor de retención borra en segundo plano los episodios que
+incumplen alguna política (antigüedad, número máximo, presupuesto de bytes)
+y, si el disco supera la marca alta de ocupación, libera espacio hasta
+bajar de la marca baja. Se eliminan primero los episodios más antiguos (o
+los de menor valor) y sus filas de la tabla ``episodes`` se borran por lotes.
+
+El tamaño de cada episodio se cachea: un episodio completo (con
+``info.json``) no cambia, así que solo se recorren los directorios nuevos o
+modificados en lugar de todo el árbol en cada pasada.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from src.database.db_manager import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+EVICTION_ORDERS = ("oldest", "lowest_value")
+
+# Un directorio sin info.json se está grabando o escribiendo; pasado este
+# tiempo sin cambios se considera restos de una escritura interrumpida
+INCOMPLETE_GRACE_SECONDS = 3600.0
+
+
+def _disk_size(path: Path) -> int:
+    """Calcula los bytes ocupados en disco por un directorio.
+
+    Args:
+        path: Directorio a recorrer.
+
+    Returns:
+        Bytes asignados (bloques del sistema de archivos si están disponibles).
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            blocks = getattr(st, "st_blocks", None)
+            total += blocks * 512 if blocks is not None else st.st_size
+    return total
+
+
+class EpisodeUsage:
+    """Entrada de la caché de uso de disco de un episodio.
+
+    Attributes:
+        episode_id: ID del episodio (nombre del directorio).
+        path: Directorio del episodio.
+        nbytes: Bytes ocupados en disco.
+        mtime_ns: Fecha de modificación del directorio al medirlo.
+        start_time: Inicio del episodio (epoch).
+        complete: Si el episodio tiene ``info.json``.
+        value: Valor del episodio para el orden ``lowest_value``.
+    """
+
+    __slots__ = ('episode_id', 'path', 'nbytes', 'mtime_ns', 'start_time', 'complete', 'value')
+
+    def __init__(
+        self,
+        episode_id: str,
+        path: Path,
+        nbytes: int,
+        mtime_ns: int,
+        start_time: float,
+        complete: bool,
+        value: float
+    ) -> None:
+        """Inicializa la entrada."""
+        self.episode_id = episode_id
+        self.path = path
+        self.nbytes = nbytes
+        self.mtime_ns = mtime_ns
+        self.start_time = start_time
+        self.complete = complete
+        self.value = value
+
+
+class RetentionManager:
+    """Borra episodios según políticas de antigüedad, número y bytes.
+
+    Attributes:
+        episode_path: Directorio de episodios.
+        max_age_seconds: Antigüedad máxima (0 = sin límite).
+        max_episodes: Número máximo de episodios (0 = sin límite).
+        max_bytes: Presupuesto de bytes de los episodios (0 = sin límite).
+        high_watermark: Ocupación del disco (fracción) que dispara la limpieza.
+        low_watermark: Ocupación del disco a la que se detiene la limpieza.
+        eviction_order: ``oldest`` o ``lowest_value``.
+    """
+
+    def __init__(
+        self,
+        episode_path: str,
+        db_manager: Optional[DatabaseManager] = None,
+        max_age_days: float = 0.0,
+        max_episodes: int = 0,
+        max_total_gb: float = 0.0,
+        high_watermark: float = 0.90,
+        low_watermark: float = 0.80,
+        eviction_order: str = "oldest",
+        interval_seconds: float = 300.0,
+        batch_size: int = 200,
+        protected: Optional[Callable[[], Iterable[Optional[str]]]] = None,
+        on_report: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> None:
+        """Inicializa el gestor.
+
+        Args:
+            episode_path: Directorio con un subdirectorio por episodio.
+            db_manager: Base de datos cuyas filas de ``episodes`` se borran
+                junto a los directorios (opcional).
+            max_age_days: Días que se conserva un episodio (0 = sin límite).
+            max_episodes: Episodios que se conservan (0 = sin límite).
+            max_total_gb: GB que pueden ocupar los episodios (0 = sin límite).
+            high_watermark: Fracción de ocupación del disco que dispara la
+                limpieza (0 = desactivado).
+            low_watermark: Fracción de ocupación objetivo de la limpieza.
+            eviction_order: ``oldest`` (más antiguos primero) o
+                ``lowest_value`` (sin movimiento y más cortos primero).
+            interval_seconds: Segundos entre pasadas en segundo plano.
+            batch_size: Filas por lote al borrar de la base de datos.
+            protected: Función que devuelve los IDs que no deben borrarse
+                (p. ej. el episodio en curso).
+            on_report: Función llamada con el informe de cada pasada que
+                borra algún episodio.
+
+        Raises:
+            ValueError: Si el orden de borrado o las marcas no son válidos.
+        """
+        if eviction_order not in EVICTION_ORDERS:
+            raise ValueError(f"Orden de borrado no soportado: {eviction_order} (opciones: {EVICTION_ORDERS})")
+        if high_watermark and not 0 < low_watermark <= high_watermark <= 1:
+            raise ValueError(
+                f"Marcas de ocupación no válidas: baja={low_watermark}, alta={high_watermark}"
+            )
+
+        self.episode_path = Path(episode_path)
+        self.db_manager = db_manager
+        self.max_age_seconds: float = max_age_days * 86400
+        self.max_episodes: int = int(max_episodes)
+        self.max_bytes: int = int(max_total_gb * 1024 ** 3)
+        self.high_watermark: float = high_watermark
+        self.low_watermark: float = low_watermark
+        self.eviction_order: str = eviction_order
+        self.interval_seconds: float = interval_seconds
+        self.batch_size: int = max(1, batch_size)
+        self._protected = protected
+        self._on_report = on_report
+
+        self._cache: Dict[str, EpisodeUsage] = {}
+        self._root_mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Estadísticas acumuladas
+        self.runs: int = 0
+        self.episodes_deleted: int = 0
+        self.bytes_freed: int = 0
+        self.dirs_scanned: int = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        """Arranca las pasadas periódicas en un thread en segundo plano."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+        logger.info(f"Retención de episodios iniciada (cada {self.interval_seconds:.0f}s)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Detiene el thread de retención.
+
+        Args:
+            timeout: Segundos máximos de espera.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Bucle del thread: una pasada al arrancar y luego cada intervalo."""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error en la retención de episodios: {e}", exc_info=True)
+            self._stop_event.wait(self.interval_seconds)
+
+    def scan(self) -> List[EpisodeUsage]:
+        """Actualiza la caché de uso de disco de forma incremental.
+
+        Solo se recorren los episodios nuevos, los modificados y los que
+        aún no tienen ``info.json``; si el directorio raíz no ha cambiado y
+        todos los episodios están completos no se recorre nada.
+
+        Returns:
+            Episodios en disco.
+        """
+        with self._lock:
+            try:
+                root_mtime_ns = self.episode_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                self._cache.clear()
+                return []
+
+            cache = self._cache
+            if root_mtime_ns == self._root_mtime_ns and all(u.complete for u in cache.values()):
+                return list(cache.values())
+
+            seen: Set[str] = set()
+            with os.scandir(self.episode_path) as entries:
+                for entry in entries:
+                    # Ocultos: directorios temporales (p. ej. ``.staging``)
+                    if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+                        continue
+                    seen.add(entry.name)
+                    try:
+                        mtime_ns = entry.stat(follow_symlinks=False).st_mtime_ns
+                    except OSError:
+                        continue
+                    cached = cache.get(entry.name)
+                    if cached is not None and cached.complete and cached.mtime_ns == mtime_ns:
+                        continue
+                    cache[entry.name] = self._measure(entry.name, Path(entry.path), mtime_ns)
+                    self.dirs_scanned += 1
+
+            for episode_id in set(cache) - seen:
+                del cache[episode_id]
+            self._root_mtime_ns = root_mtime_ns
+            return list(cache.values())
+
+    @staticmethod
+    def _measure(episode_id: str, path: Path, mtime_ns: int) -> EpisodeUsage:
+        """Mide un episodio y lee su ``info.json``.
+
+        Args:
+            episode_id: ID del episodio.
+            path: Directorio del episodio.
+            mtime_ns: Fecha de modificación del directorio.
+
+        Returns:
+            Entrada de la caché.
+        """
+        start_time = mtime_ns / 1e9
+        value = 0.0
+        info_path = path / "info.json"
+        complete = info_path.exists()
+        if complete:
+            try:
+                with open(info_path) as f:
+                    info = json.load(f)
+                start_time = datetime.fromisoformat(info["start_time"]).timestamp()
+                # Sin movimiento vale menos; entre iguales, el más corto
+                value = float(info.get("duration_seconds") or 0.0)
+                if info.get("motion_detected"):
+                    value += 1e9
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"info.json ilegible en {path}: {e}")
+        return EpisodeUsage(episode_id, path, _disk_size(path), mtime_ns, start_time, complete, value)
+
+    def select_evictions(self, episodes: List[EpisodeUsage], now: Optional[float] = None) -> Dict[str, str]:
+        """Elige los episodios a borrar según las políticas.
+
+        Args:
+            episodes: Episodios en disco (ver ``scan``).
+            now: Instante de referencia (por defecto, ahora).
+
+        Returns:
+            Diccionario episode_id -> política que lo borra, en orden de borrado.
+        """
+        now = time.time() if now is None else now
+        protected = {p for p in (self._protected() if self._protected else ()) if p}
+        candidates = []
+        for usage in episodes:
+            if usage.episode_id in protected:
+                continue
+            # Un episodio incompleto se está grabando o escribiendo
+            if not usage.complete and now - usage.mtime_ns / 1e9 < INCOMPLETE_GRACE_SECONDS:
+                continue
+            candidates.append(usage)
+
+        if self.eviction_order == "lowest_value":
+            candidates.sort(key=lambda u: (u.complete, u.value, u.start_time))
+        else:
+            candidates.sort(key=lambda u: (u.complete, u.start_time))
+
+        evictions: Dict[str, str] = {}
+        kept = []
+        for usage in candidates:
+            if not usage.complete:
+                evictions[usage.episode_id] = "incomplete"
+            elif self.max_age_seconds and now - usage.start_time > self.max_age_seconds:
+                evictions[usage.episode_id] = "age"
+            else:
+                kept.append(usage)
+
+        total_bytes = sum(u.nbytes for u in episodes) - sum(
+            u.nbytes for u in candidates if u.episode_id in evictions
+        )
+        count = len(episodes) - len(evictions)
+        bytes_to_free = self._disk_bytes_to_free()
+        freed = sum(u.nbytes for u in candidates if u.episode_id in evictions)
+
+        for usage in kept:
+            if self.max_episodes and count > self.max_episodes:
+                reason = "count"
+            elif self.max_bytes and total_bytes > self.max_bytes:
+                reason = "bytes"
+            elif freed < bytes_to_free:
+                reason = "watermark"
+            else:
+                break
+            evictions[usage.episode_id] = reason
+            count -= 1
+            total_bytes -= usage.nbytes
+            freed += usage.nbytes
+        return evictions
+
+    def _disk_bytes_to_free(self) -> int:
+        """Bytes a liberar para bajar de la marca baja si se supera la alta.
+
+        Returns:
+            Bytes a liberar (0 si el disco no supera la marca alta).
+        """
+        if not self.high_watermark:
+            return 0
+        try:
+            usage = shutil.disk_usage(self.episode_path)
+        except OSError:
+            return 0
+        if usage.used < usage.total * self.high_watermark:
+            return 0
+        return int(usage.used - usage.total * self.low_watermark)
+
+    def run_once(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Ejecuta una pasada de retención.
+
+        Args:
+            now: Instante de referencia (por defecto, ahora).
+
+        Returns:
+            Informe con episodios borrados, bytes liberados (medidos en
+            disco), filas borradas de la BD y borrados por política.
+        """
+        start = time.perf_counter()
+        episodes = self.scan()
+        evictions = self.select_evictions(episodes, now)
+        by_id = {u.episode_id: u for u in episodes}
+
+        deleted: List[str] = []
+        bytes_freed = 0
+        reasons: Dict[str, int] = {}
+        for episode_id, reason in evictions.items():
+            usage = by_id[episode_id]
+            try:
+                shutil.rmtree(usage.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"No se pudo borrar el episodio {episode_id}: {e}")
+                continue
+            deleted.append(episode_id)
+            bytes_freed += usage.nbytes
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+        with self._lock:
+            for episode_id in deleted:
+                self._cache.pop(episode_id, None)
+
+        db_rows = 0
+        if deleted and self.db_manager is not None:
+            for i in range(0, len(deleted), self.batch_size):
+                db_rows += self.db_manager.delete_episodes(deleted[i:i + self.batch_size])
+
+        self.runs += 1
+        self.episodes_deleted += len(deleted)
+        self.bytes_freed += bytes_freed
+        report = {
+            "deleted": len(deleted),
+            "bytes_freed": bytes_freed,
+            "db_rows_deleted": db_rows,
+            "reasons": reasons,
+            "episodes_remaining": len(episodes) - len(deleted),
+            "bytes_remaining": sum(u.nbytes for u in episodes) - bytes_freed,
+            "seconds": time.perf_counter() - start
+        }
+        self.last_report = report
+        if deleted:
+            logger.info(
+                f"Retención: {len(deleted)} episodios borrados, "
+                f"{bytes_freed / 1024 / 1024:.1f} MB liberados ({reasons})"
+            )
+            if self._on_report is not None:
+                self._on_report(report)
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado de la retención.
+
+        Returns:
+            Diccionario con uso cacheado, políticas y totales borrados.
+        """
+        with self._lock:
+            episodes = len(self._cache)
+            nbytes = sum(u.nbytes for u in self._cache.values())
+        return {
+            "episodes": episodes,
+            "bytes": nbytes,
+            "max_episodes": self.max_episodes,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "runs": self.runs,
+            "episodes_deleted": self.episodes_deleted,
+            "bytes_freed": self.bytes_freed,
+            "dirs_scanned": self.dirs_scanned,
+            "last_report": self.last_report
+        }
@@ -0,0 +1,190 @@
+"""Miniaturas e índice de previsualización de episodios.
+
+Al escribir un episodio se generan en segundo plano tres miniaturas: el
+primer frame, el frame de máximo movimiento y una tira de contactos con
+frames repartidos a lo largo del episodio. Solo se decodifican los frames
+elegidos, a partir de las imágenes del episodio o de su contenedor de video.
+El índice ``thumbnails.json`` guarda qué frame corresponde a cada miniatura.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import cv2
+
+
+logger = logging.getLogger(__name__)
+
+# Miniaturas disponibles y su archivo dentro del directorio de miniaturas
+THUMBNAIL_KINDS: Dict[str, str] = {
+    "first": "first.jpg",
+    "peak": "peak.jpg",
+    "strip": "strip.jpg",
+}
+THUMBNAILS_DIR = "thumbnails"
+INDEX_FILE = "thumbnails.json"
+
+# Lector de frames: recibe los índices (ordenados) y devuelve pares
+# (índice, frame BGR) en el mismo orden
+FrameReader = Callable[[List[int]], Iterable[Tuple[int, np.ndarray]]]
+
+
+def select_keyframes(frames: List[Dict[str, Any]], strip_tiles: int = 8) -> Dict[str, Any]:
+    """Elige los frames de cada miniatura a partir de sus metadatos.
+
+    Args:
+        frames: Metadatos de los frames del episodio (``motion_energy``
+            opcional).
+        strip_tiles: Número máximo de frames de la tira de contactos.
+
+    Returns:
+        Diccionario con ``first``, ``peak`` (índices) y ``strip`` (lista de
+        índices).
+    """
+    count = len(frames)
+    energies = [frame.get("motion_energy") for frame in frames]
+    if any(energy is not None for energy in energies):
+        peak = max(range(count), key=lambda i: energies[i] if energies[i] is not None else -1.0)
+    else:
+        peak = count // 2
+    strip = sorted({int(round(i)) for i in np.linspace(0, count - 1, min(strip_tiles, count))})
+    return {"first": 0, "peak": peak, "strip": strip}
+
+
+def image_frame_reader(episode_dir: Path, frames: List[Dict[str, Any]]) -> FrameReader:
+    """Lector de frames de un episodio en formato ``images``.
+
+    Usa los bytes aún en memoria y, para los frames ya volcados a disco,
+    la imagen del directorio del episodio.
+
+    Args:
+        episode_dir: Directorio del episodio.
+        frames: Frames del episodio (``file`` y ``data``).
+
+    Returns:
+        Lector de frames.
+    """
+    def read(indices: List[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        for index in indices:
+            frame_data = frames[index]
+            data = frame_data.get("data")
+            if data is None:
+                data = (episode_dir / frame_data["file"]).read_bytes()
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield index, frame
+    return read
+
+
+def video_frame_reader(video_path: Path) -> FrameReader:
+    """Lector de frames de un contenedor de video.
+
+    Recorre el video una sola vez y solo decodifica los frames pedidos.
+
+    Args:
+        video_path: Ruta del video del episodio.
+
+    Returns:
+        Lector de frames.
+    """
+    def read(indices: List[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        capture = cv2.VideoCapture(str(video_path))
+        try:
+            wanted = iter(indices)
+            target = next(wanted, None)
+            position = 0
+            while target is not None and capture.grab():
+                if position == target:
+                    ok, frame = capture.retrieve()
+                    if ok:
+                        yield position, frame
+                    target = next(wanted, None)
+                position += 1
+        finally:
+            capture.release()
+    return read
+
+
+def _resize_to_width(frame: np.ndarray, width: int) -> np.ndarray:
+    """Reduce un frame a un ancho dado conservando la proporción."""
+    height, frame_width = frame.shape[:2]
+    if frame_width <= width:
+        return frame
+    return cv2.resize(frame, (width, max(1, round(height * width / frame_width))), interpolation=cv2.INTER_AREA)
+
+
+def _write_jpeg(path: Path, frame: np.ndarray, quality: int) -> int:
+    """Escribe un frame BGR como JPEG y devuelve su tamaño en bytes."""
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError(f"No se pudo codificar la miniatura {path.name}")
+    path.write_bytes(buffer.tobytes())
+    return len(buffer)
+
+
+def write_thumbnails(
+    output_dir: Path,
+    frames: List[Dict[str, Any]],
+    reader: FrameReader,
+    width: int = 160,
+    strip_tiles: int = 8,
+    strip_tile_width: int = 96,
+    quality: int = 70
+) -> Optional[Dict[str, Any]]:
+    """Genera las miniaturas y el índice de previsualización de un episodio.
+
+    Args:
+        output_dir: Directorio de las miniaturas (se crea si no existe).
+        frames: Metadatos de los frames del episodio.
+        reader: Lector de frames del episodio.
+        width: Ancho de las miniaturas del primer frame y del pico.
+        strip_tiles: Número máximo de frames de la tira de contactos.
+        strip_tile_width: Ancho de cada frame de la tira.
+        quality: Calidad JPEG de las miniaturas.
+
+    Returns:
+        Índice de previsualización, o None si el episodio no tiene frames
+        legibles.
+    """
+    if not frames:
+        return None
+    keyframes = select_keyframes(frames, strip_tiles)
+    indices = sorted({keyframes["first"], keyframes["peak"], *keyframes["strip"]})
+
+    # Cada frame se reduce al decodificarlo: solo se retienen los reducidos
+    keep_width = max(width, strip_tile_width)
+    decoded: Dict[int, np.ndarray] = {}
+    for index, frame in reader(indices):
+        decoded[index] = _resize_to_width(frame, keep_width)
+    if not decoded:
+        return None
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_data: Dict[str, Any] = {"frame_count": len(frames)}
+    for kind in ("first", "peak"):
+        frame_index = keyframes[kind]
+        if frame_index not in decoded:
+            continue
+        thumbnail = _resize_to_width(decoded[frame_index], width)
+        nbytes = _write_jpeg(output_dir / THUMBNAIL_KINDS[kind], thumbnail, quality)
+        index_data[kind] = {"file": THUMBNAIL_KINDS[kind], "frame_index": frame_index, "bytes": nbytes}
+
+    # Sin frames de la tira legibles se escriben igualmente el índice y el
+    # resto de miniaturas
+    tiles = [_resize_to_width(decoded[i], strip_tile_width) for i in keyframes["strip"] if i in decoded]
+    if tiles:
+        tile_height = min(tile.shape[0] for tile in tiles)
+        strip = np.hstack([tile[:tile_height] for tile in tiles])
+        nbytes = _write_jpeg(output_dir / THUMBNAIL_KINDS["strip"], strip, quality)
+        index_data["strip"] = {
+            "file": THUMBNAIL_KINDS["strip"],
+            "frame_indices": [i for i in keyframes["strip"] if i in decoded],
+            "tile_width": tiles[0].shape[1],
+            "bytes": nbytes
+        }
+
+    with open(output_dir / INDEX_FILE, 'w') as f:
+        json.dump(index_data, f, indent=2)
+    return index_data
@@ -1,5 +1,7 @@
 """Módulo de gestión de base de datos SQLite."""
 
 from .db_manager import DatabaseManager
+from .connection_pool import ConnectionPool
+from .async_db import AsyncDatabase
 
-__all__ = ['DatabaseManager']
+__all__ = ['DatabaseManager', 'ConnectionPool', 'AsyncDatabase']
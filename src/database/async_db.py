@@ -0,0 +1,144 @@
+"""Fachada asíncrona de la base de datos para las rutas de FastAPI.
+
+Los métodos de ``DatabaseManager`` son síncronos: llamarlos desde una ruta
+``async`` bloquea el event loop, y con él el streaming MJPEG, mientras dura
+la consulta. La fachada ejecuta cada consulta en un executor dedicado y la
+limita a un plazo: al agotarse, SQLite interrumpe la consulta (el thread
+queda libre) y la ruta recibe ``TimeoutError``.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from src.database.db_manager import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncDatabase:
+    """Acceso no bloqueante a ``DatabaseManager`` con plazo por consulta.
+
+    Attributes:
+        db_manager: Base de datos síncrona subyacente.
+        timeout: Plazo por defecto de cada consulta (segundos).
+    """
+
+    def __init__(self, db_manager: DatabaseManager, workers: int = 2, timeout: float = 2.0) -> None:
+        """Inicializa la fachada.
+
+        Args:
+            db_manager: Base de datos síncrona.
+            workers: Threads del executor (cada uno con su conexión
+                persistente).
+            timeout: Plazo por defecto de cada consulta en segundos.
+        """
+        self.db_manager = db_manager
+        self.timeout: float = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self.calls: int = 0
+        self.timeouts: int = 0
+        self.errors: int = 0
+        self._total_seconds: float = 0.0
+        self._max_seconds: float = 0.0
+
+    def _call(self, fn: Callable[..., T], timeout: float, args: tuple, kwargs: Dict[str, Any]) -> T:
+        """Ejecuta la consulta en el thread del executor con su plazo."""
+        with self.db_manager.query_deadline(timeout):
+            return fn(*args, **kwargs)
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> T:
+        """Ejecuta una función de la base de datos sin bloquear el event loop.
+
+        Args:
+            fn: Método de ``DatabaseManager`` (o función que lo use).
+            *args: Argumentos posicionales de ``fn``.
+            timeout: Plazo en segundos (por defecto, ``self.timeout``).
+            **kwargs: Argumentos con nombre de ``fn``.
+
+        Returns:
+            Resultado de ``fn``.
+
+        Raises:
+            TimeoutError: Si la consulta no termina en el plazo (también
+                en lugar de ``asyncio.TimeoutError``).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(self._call, fn, timeout, args, kwargs))
+        started = time.perf_counter()
+        try:
+            # El plazo de SQLite no cubre la espera por bloqueos ni la cola
+            # del executor: la espera asíncrona tiene el mismo límite
+            return await asyncio.wait_for(future, timeout)
+        except (TimeoutError, asyncio.TimeoutError) as e:
+            # Hasta Python 3.10 asyncio.TimeoutError es otra clase: las rutas
+            # reciben siempre el TimeoutError estándar
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"Consulta {getattr(fn, '__name__', fn)} cancelada tras {timeout:.2f}s")
+            if isinstance(e, TimeoutError):
+                raise
+            raise TimeoutError(f"Consulta cancelada tras {timeout:.2f}s") from e
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.calls += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    async def get_episodes(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Versión asíncrona de ``DatabaseManager.get_episodes``."""
+        return await self.run(self.db_manager.get_episodes, **kwargs)
+
+    async def get_episodes_page(self, **kwargs: Any) -> Dict[str, Any]:
+        """Versión asíncrona de ``DatabaseManager.get_episodes_page``."""
+        return await self.run(self.db_manager.get_episodes_page, **kwargs)
+
+    async def get_episode(self, episode_id: str) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de ``DatabaseManager.get_episode``."""
+        return await self.run(self.db_manager.get_episode, episode_id)
+
+    async def get_events(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Versión asíncrona de ``DatabaseManager.get_events``."""
+        return await self.run(self.db_manager.get_events, **kwargs)
+
+    async def get_events_page(self, **kwargs: Any) -> Dict[str, Any]:
+        """Versión asíncrona de ``DatabaseManager.get_events_page``."""
+        return await self.run(self.db_manager.get_events_page, **kwargs)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Versión asíncrona de ``DatabaseManager.get_stats``."""
+        return await self.run(self.db_manager.get_stats)
+
+    def close(self) -> None:
+        """Detiene el executor sin esperar a las consultas en curso."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats_summary(self) -> Dict[str, Any]:
+        """Obtiene las estadísticas de la fachada.
+
+        Returns:
+            Diccionario con consultas, plazos agotados, errores y tiempos.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "avg_ms": 1000 * self._total_seconds / self.calls if self.calls else 0.0,
+                "max_ms": 1000 * self._max_seconds,
+                "timeout_s": self.timeout
+            }
@@ -0,0 +1,222 @@
+"""Pool de conexiones SQLite persistentes, una por thread.
+
+Abrir una conexión por consulta hace que el coste de ``sqlite3.connect``
+(abrir el archivo, leer el esquema, preparar las sentencias) domine la
+latencia de las consultas pequeñas del dashboard. El pool mantiene una
+conexión abierta por thread, con su caché de sentencias preparadas, en modo
+WAL: los lectores de la API no bloquean a los escritores del pipeline ni
+al revés.
+"""
+
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+
+
+logger = logging.getLogger(__name__)
+
+# Instrucciones de la máquina virtual de SQLite entre comprobaciones del
+# plazo de una consulta
+PROGRESS_STEPS = 1000
+
+
+class ConnectionPool:
+    """Conexiones SQLite persistentes por thread.
+
+    Cada thread reutiliza su propia conexión (las conexiones no se
+    comparten entre threads); al terminar el thread su conexión se cierra.
+
+    Con ``persistent=False`` se abre una conexión por operación y se cierra
+    al liberarla (comportamiento anterior, útil como referencia).
+
+    Attributes:
+        db_path: Ruta al archivo de base de datos.
+        persistent: Si las conexiones se reutilizan.
+        wal: Si se usa el modo de journal WAL.
+        connections_opened: Conexiones abiertas desde la creación del pool.
+        acquisitions: Número de veces que se ha obtenido una conexión.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        wal: bool = True,
+        synchronous: str = "NORMAL",
+        cache_size_kb: int = 8192,
+        mmap_size_mb: int = 64,
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 256,
+        persistent: bool = True
+    ) -> None:
+        """Inicializa el pool (las conexiones se abren bajo demanda).
+
+        Args:
+            db_path: Ruta al archivo de base de datos.
+            wal: Si True, usa ``journal_mode=WAL`` (lectores y escritor
+                concurrentes).
+            synchronous: Nivel de ``PRAGMA synchronous``; ``NORMAL`` es
+                seguro con WAL y evita un fsync por transacción.
+            cache_size_kb: Caché de páginas por conexión (KiB).
+            mmap_size_mb: Tamaño de la lectura por mmap (0 = desactivado).
+            busy_timeout_ms: Espera ante un bloqueo antes de fallar.
+            cached_statements: Sentencias preparadas que cachea cada conexión.
+            persistent: Si False, cada ``acquire`` abre una conexión nueva
+                que ``release`` cierra.
+        """
+        self.db_path = Path(db_path)
+        self.wal: bool = wal
+        self.synchronous: str = synchronous
+        self.cache_size_kb: int = cache_size_kb
+        self.mmap_size_mb: int = mmap_size_mb
+        self.busy_timeout_ms: int = busy_timeout_ms
+        self.cached_statements: int = cached_statements
+        self.persistent: bool = persistent
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._keys = itertools.count()
+        self.connections_opened: int = 0
+        self.acquisitions: int = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre y configura una conexión nueva.
+
+        Returns:
+            Conexión con ``row_factory`` y PRAGMAs aplicados.
+        """
+        # Solo el thread propietario la usa; otro thread puede cerrarla
+        # (al terminar el propietario o en ``close_all``)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size_mb) * 1024 * 1024}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        self.connections_opened += 1
+        if not self.persistent:
+            return conn
+        with self._lock:
+            key = next(self._keys)
+            self._connections[key] = conn
+        weakref.finalize(threading.current_thread(), self._discard, key)
+        logger.debug(f"Conexión SQLite abierta para {threading.current_thread().name}: {self.db_path}")
+        return conn
+
+    def _discard(self, key: int) -> None:
+        """Cierra la conexión de un thread que ha terminado."""
+        with self._lock:
+            conn = self._connections.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+    def acquire(self) -> sqlite3.Connection:
+        """Obtiene la conexión del thread actual (la abre si no existe).
+
+        Returns:
+            Conexión SQLite del thread.
+        """
+        self.acquisitions += 1
+        if not self.persistent:
+            return self._connect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devuelve la conexión al pool.
+
+        La conexión sigue abierta; una transacción que el llamador no cerró
+        se deshace para no retener bloqueos.
+
+        Args:
+            conn: Conexión obtenida con ``acquire``.
+        """
+        if conn.in_transaction:
+            logger.warning("Transacción abierta al liberar la conexión, se deshace")
+            conn.rollback()
+        if not self.persistent:
+            conn.close()
+
+    @contextmanager
+    def deadline(self, seconds: float) -> Iterator[None]:
+        """Limita el tiempo de las consultas del thread actual.
+    
+        SQLite interrumpe la consulta en curso al agotarse el plazo. Solo
+        tiene efecto con conexiones persistentes (las consultas del bloque
+        usan la misma conexión).
+    
+        Args:
+            seconds: Plazo en segundos para todo el bloque.
+        
+        Raises:
+            TimeoutError: Si alguna consulta se interrumpió por el plazo.
+        """
+        conn = self.acquire()
+        limit = time.monotonic() + seconds
+        expired = False
+    
+        def check() -> int:
+            nonlocal expired
+            if time.monotonic() >= limit:
+                expired = True
+                return 1  # Interrumpe la consulta
+            return 0
+    
+        conn.set_progress_handler(check, PROGRESS_STEPS)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if expired:
+                raise TimeoutError(f"Consulta interrumpida tras {seconds:.2f}s") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, PROGRESS_STEPS)
+            self.release(conn)
+        if expired:
+            raise TimeoutError(f"Consulta interrumpida tras {seconds:.2f}s")
+
+    def close_all(self) -> None:
+        """Cierra todas las conexiones abiertas.
+
+        Los threads que vuelvan a usar el pool abrirán una conexión nueva.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado del pool.
+
+        Returns:
+            Diccionario con conexiones abiertas, adquisiciones y modo de journal.
+        """
+        with self._lock:
+            open_connections = len(self._connections)
+        return {
+            "open_connections": open_connections,
+            "connections_opened": self.connections_opened,
+            "acquisitions": self.acquisitions,
+            "persistent": self.persistent,
+            "journal_mode": "wal" if self.wal else "delete",
+            "synchronous": self.synchronous
+        }
@@ -9,11 +9,72 @@ import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, ContextManager, Tuple
 
+from src.database.connection_pool import ConnectionPool
+from src.database.pagination import decode_cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 
+# Columnas añadidas a tablas existentes después de su creación: las bases
+# de datos anteriores se actualizan con ALTER TABLE al inicializarse
+ADDED_COLUMNS: Dict[str, Dict[str, str]] = {
+    "episodes": {
+        "parent_episode_id": "TEXT",
+        "segment_index": "INTEGER DEFAULT 0",
+        "thumbnail_dir": "TEXT",
+    },
+}
+
+# Índices sustituidos por índices compuestos que los contienen como prefijo
+DROPPED_INDEXES = ("idx_episodes_time", "idx_episodes_motion", "idx_events_time", "idx_events_type")
+
+# Contadores de la tabla stats y la consulta que los recalcula desde cero
+STATS_COUNTERS: Dict[str, str] = {
+    "total_episodes": "SELECT COUNT(*) FROM episodes",
+    "episodes_with_motion": "SELECT COUNT(*) FROM episodes WHERE motion_detected = 1",
+    "total_events": "SELECT COUNT(*) FROM events",
+    "total_models": "SELECT COUNT(*) FROM models",
+}
+
+# Triggers que mantienen los contadores en cada escritura, sea cual sea el
+# método (o la conexión) que la hace
+STATS_TRIGGERS: Dict[str, str] = {
+    "stats_episodes_insert": """
+        AFTER INSERT ON episodes BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'total_episodes';
+            UPDATE stats SET value = value + 1
+            WHERE name = 'episodes_with_motion' AND NEW.motion_detected = 1;
+        END""",
+    "stats_episodes_delete": """
+        AFTER DELETE ON episodes BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'total_episodes';
+            UPDATE stats SET value = value - 1
+            WHERE name = 'episodes_with_motion' AND OLD.motion_detected = 1;
+        END""",
+    "stats_episodes_motion": """
+        AFTER UPDATE OF motion_detected ON episodes BEGIN
+            UPDATE stats SET value = value + (NEW.motion_detected = 1) - (OLD.motion_detected = 1)
+            WHERE name = 'episodes_with_motion';
+        END""",
+    "stats_events_insert": """
+        AFTER INSERT ON events BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'total_events';
+        END""",
+    "stats_events_delete": """
+        AFTER DELETE ON events BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'total_events';
+        END""",
+    "stats_models_insert": """
+        AFTER INSERT ON models BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'total_models';
+        END""",
+    "stats_models_delete": """
+        AFTER DELETE ON models BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'total_models';
+        END""",
+}
+
 
 class DatabaseManager:
     """Gestor de base de datos SQLite.
@@ -21,30 +82,83 @@ class DatabaseManager:
     Esta clase maneja todas las operaciones de base de datos para el sistema,
     incluyendo episodios, eventos, modelos y entrenamientos.
     
+    Las conexiones son persistentes (una por thread, en modo WAL): cada
+    método obtiene la conexión de su thread del pool y la devuelve al
+    terminar, sin cerrarla.
+    
     Attributes:
         db_path: Ruta al archivo de base de datos SQLite.
     """
     
-    def __init__(self, db_path: str = "data/database.db") -> None:
+    def __init__(
+        self,
+        db_path: str = "data/database.db",
+        wal: bool = True,
+        cache_size_kb: int = 8192,
+        mmap_size_mb: int = 64,
+        cached_statements: int = 256,
+        persistent: bool = True
+    ) -> None:
         """Inicializa el gestor de base de datos.
         
         Args:
             db_path: Ruta al archivo de base de datos.
+            wal: Si True, usa el journal WAL (lecturas concurrentes con
+                las escrituras).
+            cache_size_kb: Caché de páginas por conexión (KiB).
+            mmap_size_mb: Lectura por mmap en MB (0 = desactivado).
+            cached_statements: Sentencias preparadas cacheadas por conexión.
+            persistent: Si False, abre y cierra una conexión por operación.
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = ConnectionPool(
+            self.db_path,
+            wal=wal,
+            cache_size_kb=cache_size_kb,
+            mmap_size_mb=mmap_size_mb,
+            cached_statements=cached_statements,
+            persistent=persistent
+        )
         self._init_database()
         logger.info(f"DatabaseManager inicializado: {self.db_path}")
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Obtiene una conexión a la base de datos.
+        """Obtiene la conexión del thread actual.
+        
+        Debe devolverse con ``self._pool.release`` al terminar.
         
         Returns:
             Conexión SQLite configurada.
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
-        return conn
+        return self._pool.acquire()
+    
+    def close(self) -> None:
+        """Cierra todas las conexiones del pool."""
+        self._pool.close_all()
+    
+    def query_deadline(self, seconds: float) -> ContextManager[None]:
+        """Limita el tiempo de las consultas que haga el thread actual.
+        
+        Un método que atrapa ``sqlite3.Error`` devuelve su valor por
+        defecto al interrumpirse; el contexto lanza igualmente
+        ``TimeoutError`` al salir.
+        
+        Args:
+            seconds: Plazo en segundos.
+            
+        Returns:
+            Gestor de contexto que lanza ``TimeoutError`` si se agota el plazo.
+        """
+        return self._pool.deadline(seconds)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado del pool de conexiones.
+        
+        Returns:
+            Diccionario con conexiones abiertas y adquisiciones.
+        """
+        return self._pool.get_stats()
     
     def _init_database(self) -> None:
         """Crea las tablas si no existen."""
@@ -65,7 +179,10 @@ class DatabaseManager:
                     object_detected TEXT,
                     confidence_score REAL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metadata_json TEXT
+                    metadata_json TEXT,
+                    parent_episode_id TEXT,
+                    segment_index INTEGER DEFAULT 0,
+                    thumbnail_dir TEXT
                 )
             """)
             
@@ -116,23 +233,53 @@ class DatabaseManager:
                 )
             """)
             
+            self._add_missing_columns(cursor)
+            
+            # Contadores de get_stats, mantenidos por triggers: consultar el
+            # estado no recorre las tablas
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats'")
+            stats_exists = cursor.fetchone() is not None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            """)
+            for name, body in STATS_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+            if not stats_exists:
+                # Base de datos nueva o anterior a los contadores
+                self._count_stats(cursor)
+            
             # Índices para mejorar rendimiento
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_episodes_time 
-                ON episodes(start_time)
+                CREATE INDEX IF NOT EXISTS idx_episodes_parent 
+                ON episodes(parent_episode_id, segment_index)
+            """)
+            # Índices compuestos en el orden de la paginación (tiempo, id):
+            # cada filtro y el cursor se resuelven recorriendo el índice
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_episodes_time_id 
+                ON episodes(start_time, id)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_episodes_motion_time 
+                ON episodes(motion_detected, start_time, id)
             """)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_episodes_motion 
-                ON episodes(motion_detected)
+                CREATE INDEX IF NOT EXISTS idx_events_time_id 
+                ON events(timestamp, id)
             """)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_events_time 
-                ON events(timestamp)
+                CREATE INDEX IF NOT EXISTS idx_events_type_time 
+                ON events(event_type, timestamp, id)
             """)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_events_type 
-                ON events(event_type)
+                CREATE INDEX IF NOT EXISTS idx_events_severity_time 
+                ON events(severity, timestamp, id)
             """)
+            for index in DROPPED_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
             
             conn.commit()
             logger.debug("Base de datos inicializada correctamente")
@@ -141,7 +288,44 @@ class DatabaseManager:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._pool.release(conn)
+    
+    @staticmethod
+    def _count_stats(cursor: sqlite3.Cursor) -> Dict[str, int]:
+        """Recalcula los contadores de la tabla stats con ``COUNT(*)``.
+        
+        Debe llamarse dentro de una transacción que bloquee las escrituras.
+        
+        Args:
+            cursor: Cursor de la conexión en curso.
+            
+        Returns:
+            Diccionario con los contadores recalculados.
+        """
+        counters: Dict[str, int] = {}
+        for name, query in STATS_COUNTERS.items():
+            cursor.execute(query)
+            counters[name] = cursor.fetchone()[0]
+        cursor.executemany(
+            "INSERT OR REPLACE INTO stats (name, value) VALUES (?, ?)",
+            counters.items()
+        )
+        return counters
+    
+    @staticmethod
+    def _add_missing_columns(cursor: sqlite3.Cursor) -> None:
+        """Añade a las tablas existentes las columnas de ``ADDED_COLUMNS``.
+        
+        Args:
+            cursor: Cursor de la conexión en curso.
+        """
+        for table, columns in ADDED_COLUMNS.items():
+            cursor.execute(f"PRAGMA table_info({table})")
+            existing = {row["name"] for row in cursor.fetchall()}
+            for name, definition in columns.items():
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                    logger.info(f"Columna añadida: {table}.{name}")
     
     def add_episode(
         self,
@@ -150,7 +334,9 @@ class DatabaseManager:
         start_time: datetime,
         motion_detected: bool = False,
         object_detected: Optional[List[str]] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        parent_episode_id: Optional[str] = None,
+        segment_index: int = 0
     ) -> int:
         """Añade un nuevo episodio a la base de datos.
         
@@ -161,6 +347,9 @@ class DatabaseManager:
             motion_detected: Si se detectó movimiento.
             object_detected: Lista de objetos detectados (opcional).
             metadata: Metadatos adicionales en formato dict (opcional).
+            parent_episode_id: Episodio padre si es un segmento de
+                continuación (opcional).
+            segment_index: Número de segmento dentro del episodio padre.
             
         Returns:
             ID del episodio insertado.
@@ -178,15 +367,17 @@ class DatabaseManager:
             cursor.execute("""
                 INSERT INTO episodes 
                 (episode_id, file_path, start_time, motion_detected, 
-                 object_detected, metadata_json)
-                VALUES (?, ?, ?, ?, ?, ?)
+                 object_detected, metadata_json, parent_episode_id, segment_index)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 episode_id,
                 file_path,
                 start_time.isoformat(),
                 motion_detected,
                 object_json,
-                metadata_json
+                metadata_json,
+                parent_episode_id,
+                segment_index
             ))
             
             episode_db_id = cursor.lastrowid
@@ -202,13 +393,16 @@ class DatabaseManager:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._pool.release(conn)
     
     def update_episode(
         self,
         episode_id: str,
         end_time: datetime,
-        duration: float
+        duration: float,
+        file_path: Optional[str] = None,
+        thumbnail_dir: Optional[str] = None,
+        start_time: Optional[datetime] = None
     ) -> None:
         """Actualiza un episodio cuando termina.
         
@@ -216,6 +410,10 @@ class DatabaseManager:
             episode_id: ID del episodio a actualizar.
             end_time: Timestamp de fin.
             duration: Duración en segundos.
+            file_path: Ruta definitiva del episodio (si cambia al escribirlo).
+            thumbnail_dir: Directorio de las miniaturas del episodio.
+            start_time: Timestamp de inicio definitivo (p.ej. el primer frame
+                del pre-roll) si difiere del registrado al iniciarlo.
         """
         conn = self._get_connection()
         cursor = conn.cursor()
@@ -223,9 +421,14 @@ class DatabaseManager:
         try:
             cursor.execute("""
                 UPDATE episodes 
-                SET end_time = ?, duration_seconds = ?
+                SET end_time = ?, duration_seconds = ?, file_path = COALESCE(?, file_path),
+                    thumbnail_dir = COALESCE(?, thumbnail_dir),
+                    start_time = COALESCE(?, start_time)
                 WHERE episode_id = ?
-            """, (end_time.isoformat(), duration, episode_id))
+            """, (
+                end_time.isoformat(), duration, file_path, thumbnail_dir,
+                start_time.isoformat() if start_time is not None else None, episode_id
+            ))
             
             if cursor.rowcount == 0:
                 logger.warning(f"Episodio no encontrado para actualizar: {episode_id}")
@@ -237,26 +440,71 @@ class DatabaseManager:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._pool.release(conn)
     
+    def delete_episodes(self, episode_ids: List[str]) -> int:
+        """Borra un lote de episodios en una sola transacción.
+
+        Los eventos que referencian los episodios borrados se conservan,
+        desvinculados del episodio.
+
+        Args:
+            episode_ids: IDs de los episodios a borrar.
+
+        Returns:
+            Número de episodios borrados.
+        """
+        if not episode_ids:
+            return 0
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            placeholders = ", ".join("?" for _ in episode_ids)
+            cursor.execute(f"""
+                UPDATE events SET episode_id = NULL
+                WHERE episode_id IN (SELECT id FROM episodes WHERE episode_id IN ({placeholders}))
+            """, episode_ids)
+            cursor.execute(
+                f"DELETE FROM episodes WHERE episode_id IN ({placeholders})", episode_ids
+            )
+            deleted = cursor.rowcount
+            conn.commit()
+            logger.debug(f"Episodios borrados: {deleted}")
+            return deleted
+        except sqlite3.Error as e:
+            logger.error(f"Error borrando episodios: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self._pool.release(conn)
+
     def get_episodes(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         motion_only: bool = False,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Obtiene episodios con filtros.
+        """Obtiene episodios con filtros, del más reciente al más antiguo.
         
         Args:
             start_date: Fecha de inicio para filtrar (opcional).
             end_date: Fecha de fin para filtrar (opcional).
             motion_only: Si True, solo episodios con movimiento.
             limit: Número máximo de resultados.
+            after: Cursor de paginación: continúa tras el episodio que
+                codifica (ver ``get_episodes_page``).
             
         Returns:
             Lista de diccionarios con información de episodios.
+            
+        Raises:
+            ValueError: Si el cursor no es válido.
         """
+        after_key = decode_cursor(after) if after else None
         conn = self._get_connection()
         cursor = conn.cursor()
         
@@ -275,7 +523,11 @@ class DatabaseManager:
             if motion_only:
                 query += " AND motion_detected = 1"
             
-            query += " ORDER BY start_time DESC LIMIT ?"
+            if after_key:
+                query += " AND (start_time, id) < (?, ?)"
+                params.extend(after_key)
+            
+            query += " ORDER BY start_time DESC, id DESC LIMIT ?"
             params.append(limit)
             
             cursor.execute(query, params)
@@ -307,7 +559,82 @@ class DatabaseManager:
             logger.error(f"Error obteniendo episodios: {e}")
             return []
         finally:
-            conn.close()
+            self._pool.release(conn)
+    
+    def get_episodes_page(self, limit: int = 100, cursor: Optional[str] = None, **filters: Any) -> Dict[str, Any]:
+        """Obtiene una página de episodios y el cursor de la siguiente.
+        
+        Args:
+            limit: Tamaño de página.
+            cursor: Cursor devuelto por la página anterior (None = primera).
+            **filters: Filtros de ``get_episodes``.
+            
+        Returns:
+            Diccionario con ``items`` y ``next_cursor`` (None en la última
+            página).
+            
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+        rows = self.get_episodes(limit=limit + 1, after=cursor, **filters)
+        items, token = next_cursor(rows, limit, "start_time")
+        return {"items": items, "next_cursor": token}
+    
+    def get_episode(self, episode_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene un episodio por su ID.
+        
+        Args:
+            episode_id: ID del episodio.
+            
+        Returns:
+            Diccionario con la fila del episodio o None si no existe.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("SELECT * FROM episodes WHERE episode_id = ?", (episode_id,))
+            row = cursor.fetchone()
+            return dict(row) if row is not None else None
+        except sqlite3.Error as e:
+            logger.error(f"Error obteniendo episodio: {e}")
+            return None
+        finally:
+            self._pool.release(conn)
+    
+    def get_episode_segments(self, episode_id: str) -> List[Dict[str, Any]]:
+        """Obtiene todos los segmentos de un episodio.
+        
+        Args:
+            episode_id: ID del episodio padre o de cualquiera de sus segmentos.
+            
+        Returns:
+            Segmentos (incluido el primero) ordenados por ``segment_index``.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT COALESCE(parent_episode_id, episode_id) FROM episodes
+                WHERE episode_id = ?
+            """, (episode_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return []
+            parent_episode_id = row[0]
+            
+            cursor.execute("""
+                SELECT * FROM episodes
+                WHERE episode_id = ? OR parent_episode_id = ?
+                ORDER BY segment_index
+            """, (parent_episode_id, parent_episode_id))
+            return [dict(r) for r in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error obteniendo segmentos: {e}")
+            return []
+        finally:
+            self._pool.release(conn)
     
     def add_event(
         self,
@@ -345,13 +672,45 @@ class DatabaseManager:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._pool.release(conn)
     
+    def add_events(self, events: List[Tuple[str, str, str, Optional[int], Optional[str]]]) -> int:
+        """Registra un lote de eventos en una sola transacción.
+
+        Args:
+            events: Tuplas (event_type, message, severity, episode_id,
+                timestamp). Con timestamp None se usa la hora de inserción.
+
+        Returns:
+            Número de eventos insertados.
+        """
+        if not events:
+            return 0
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.executemany("""
+                INSERT INTO events (event_type, message, severity, episode_id, timestamp)
+                VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, events)
+            conn.commit()
+            logger.debug(f"Eventos registrados: {len(events)}")
+            return len(events)
+        except sqlite3.Error as e:
+            logger.error(f"Error añadiendo eventos: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self._pool.release(conn)
+
     def get_events(
         self,
         limit: int = 50,
         event_type: Optional[str] = None,
-        severity: Optional[str] = None
+        severity: Optional[str] = None,
+        after: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Obtiene eventos recientes.
         
@@ -359,10 +718,16 @@ class DatabaseManager:
             limit: Número máximo de resultados.
             event_type: Filtrar por tipo de evento (opcional).
             severity: Filtrar por severidad (opcional).
+            after: Cursor de paginación: continúa tras el evento que
+                codifica (ver ``get_events_page``).
             
         Returns:
             Lista de diccionarios con información de eventos.
+            
+        Raises:
+            ValueError: Si el cursor no es válido.
         """
+        after_key = decode_cursor(after) if after else None
         conn = self._get_connection()
         cursor = conn.cursor()
         
@@ -378,7 +743,11 @@ class DatabaseManager:
                 query += " AND severity = ?"
                 params.append(severity)
             
-            query += " ORDER BY timestamp DESC LIMIT ?"
+            if after_key:
+                query += " AND (timestamp, id) < (?, ?)"
+                params.extend(after_key)
+            
+            query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
             params.append(limit)
             
             cursor.execute(query, params)
@@ -389,7 +758,26 @@ class DatabaseManager:
             logger.error(f"Error obteniendo eventos: {e}")
             return []
         finally:
-            conn.close()
+            self._pool.release(conn)
+    
+    def get_events_page(self, limit: int = 50, cursor: Optional[str] = None, **filters: Any) -> Dict[str, Any]:
+        """Obtiene una página de eventos y el cursor de la siguiente.
+        
+        Args:
+            limit: Tamaño de página.
+            cursor: Cursor devuelto por la página anterior (None = primera).
+            **filters: Filtros de ``get_events``.
+            
+        Returns:
+            Diccionario con ``items`` y ``next_cursor`` (None en la última
+            página).
+            
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+        rows = self.get_events(limit=limit + 1, after=cursor, **filters)
+        items, token = next_cursor(rows, limit, "timestamp")
+        return {"items": items, "next_cursor": token}
     
     def add_model(
         self,
@@ -446,7 +834,7 @@ class DatabaseManager:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._pool.release(conn)
     
     def get_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas del sistema.
@@ -458,27 +846,51 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            stats: Dict[str, Any] = {}
-            
-            # Total de episodios
-            cursor.execute("SELECT COUNT(*) FROM episodes")
-            stats['total_episodes'] = cursor.fetchone()[0]
-            
-            # Episodios con movimiento
-            cursor.execute("SELECT COUNT(*) FROM episodes WHERE motion_detected = 1")
-            stats['episodes_with_motion'] = cursor.fetchone()[0]
-            
-            # Total de eventos
-            cursor.execute("SELECT COUNT(*) FROM events")
-            stats['total_events'] = cursor.fetchone()[0]
-            
-            # Total de modelos
-            cursor.execute("SELECT COUNT(*) FROM models")
-            stats['total_models'] = cursor.fetchone()[0]
+            # Contadores mantenidos por triggers (ver STATS_TRIGGERS)
+            cursor.execute("SELECT name, value FROM stats")
+            counters = {row["name"]: row["value"] for row in cursor.fetchall()}
+            stats: Dict[str, Any] = {name: counters.get(name, 0) for name in STATS_COUNTERS}
             
             return stats
         except sqlite3.Error as e:
             logger.error(f"Error obteniendo estadísticas: {e}")
             return {}
         finally:
-            conn.close()
+            self._pool.release(conn)
+    
+    def reconcile_stats(self) -> Dict[str, int]:
+        """Reconstruye los contadores de estadísticas desde cero.
+        
+        Los triggers mantienen los contadores en cada escritura; solo se
+        desvían si las tablas se modifican sin ellos (restauraciones,
+        edición manual). Recalcula cada contador con ``COUNT(*)`` bloqueando
+        las escrituras mientras tanto.
+        
+        Returns:
+            Diccionario con la corrección aplicada a cada contador desviado
+            (valor correcto menos valor anterior); vacío si no había desvíos.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT name, value FROM stats")
+            previous = {row["name"]: row["value"] for row in cursor.fetchall()}
+            counters = self._count_stats(cursor)
+            conn.commit()
+            
+            drift = {
+                name: value - previous.get(name, 0)
+                for name, value in counters.items()
+                if value != previous.get(name, 0)
+            }
+            if drift:
+                logger.warning(f"Contadores de estadísticas corregidos: {drift}")
+            return drift
+        except sqlite3.Error as e:
+            logger.error(f"Error reconciliando estadísticas: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self._pool.release(conn)
@@ -0,0 +1,74 @@
+"""Cursores opacos para paginación por clave (keyset).
+
+Con ``OFFSET`` SQLite recorre y descarta todas las filas anteriores a la
+página, de modo que las páginas profundas son cada vez más lentas. La
+paginación por clave continúa a partir de la última fila devuelta: el
+cursor codifica su clave de ordenación ``(timestamp, id)`` y la consulta
+siguiente empieza con ``(timestamp, id) < (?, ?)`` sobre un índice con
+ese mismo orden, con el mismo coste en cualquier página.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+Cursor = Tuple[str, int]
+
+
+def encode_cursor(row: Dict[str, Any], time_column: str) -> str:
+    """Codifica la clave de ordenación de una fila como cursor opaco.
+
+    Args:
+        row: Última fila de la página.
+        time_column: Columna de tiempo de la ordenación.
+
+    Returns:
+        Cursor en base64 apto para URLs.
+    """
+    payload = json.dumps([row[time_column], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Decodifica un cursor de ``encode_cursor``.
+
+    Args:
+        token: Cursor recibido del cliente.
+
+    Returns:
+        Tupla ``(timestamp, id)`` de la última fila de la página anterior.
+
+    Raises:
+        ValueError: Si el cursor no es válido.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cursor no válido: {token}") from e
+    if (
+        not isinstance(value, list) or len(value) != 2
+        or not isinstance(value[0], str) or not isinstance(value[1], int)
+    ):
+        raise ValueError(f"Cursor no válido: {token}")
+    return value[0], value[1]
+
+
+def next_cursor(rows: List[Dict[str, Any]], limit: int, time_column: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Separa una página leída con ``limit + 1`` filas y su cursor siguiente.
+
+    Args:
+        rows: Filas leídas (como mucho ``limit + 1``).
+        limit: Tamaño de página.
+        time_column: Columna de tiempo de la ordenación.
+
+    Returns:
+        Tupla (filas de la página, cursor de la siguiente o None si es la
+        última).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1], time_column)
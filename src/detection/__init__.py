@@ -1,5 +1,13 @@
 """Módulo de detección de movimiento."""
 
+from .detection_result import DetectionResult, draw_detections
 from .motion_detector import MotionDetector
+from .episode_state_machine import EpisodeStateMachine, EpisodeDecision
 
-__all__ = ['MotionDetector']
+__all__ = [
+    'MotionDetector',
+    'DetectionResult',
+    'draw_detections',
+    'EpisodeStateMachine',
+    'EpisodeDecision',
+]
@@ -0,0 +1,135 @@
+"""Resultado compacto de detección y anotación bajo demanda.
+
+``MotionDetector.detect`` devuelve un ``DetectionResult`` con las regiones
+de movimiento en coordenadas del frame analizado. La anotación visual se
+dibuja solo cuando un consumidor la solicita, a la resolución del frame
+que se va a servir, escalando las cajas.
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+import cv2
+
+
+Box = Tuple[int, int, int, int]
+
+
+class DetectionResult:
+    """Resultado de una llamada a ``MotionDetector.detect``.
+
+    Attributes:
+        motion_detected: Movimiento confirmado (tras el filtro de frames consecutivos).
+        raw_motion: Movimiento en este frame, sin confirmar.
+        boxes: Bounding boxes (x, y, w, h) de las regiones válidas.
+        areas: Área en píxeles de cada región de ``boxes``.
+        motion_energy: Fracción del frame (0-1) con píxeles en movimiento.
+        frame_size: Tamaño (width, height) del frame analizado.
+    """
+
+    __slots__ = ('motion_detected', 'raw_motion', 'boxes', 'areas', 'motion_energy', 'frame_size')
+
+    def __init__(
+        self,
+        motion_detected: bool = False,
+        raw_motion: bool = False,
+        boxes: Tuple[Box, ...] = (),
+        areas: Tuple[int, ...] = (),
+        motion_energy: float = 0.0,
+        frame_size: Tuple[int, int] = (0, 0)
+    ) -> None:
+        """Inicializa el resultado.
+
+        Args:
+            motion_detected: Movimiento confirmado.
+            raw_motion: Movimiento en este frame, sin confirmar.
+            boxes: Bounding boxes (x, y, w, h).
+            areas: Área en píxeles de cada caja.
+            motion_energy: Fracción del frame con movimiento (0-1).
+            frame_size: Tamaño (width, height) del frame analizado.
+        """
+        self.motion_detected = motion_detected
+        self.raw_motion = raw_motion
+        self.boxes = boxes
+        self.areas = areas
+        self.motion_energy = motion_energy
+        self.frame_size = frame_size
+
+    def scaled_boxes(self, width: int, height: int) -> List[Box]:
+        """Escala las cajas a otra resolución.
+
+        Args:
+            width: Ancho del frame destino.
+            height: Alto del frame destino.
+
+        Returns:
+            Lista de cajas (x, y, w, h) en coordenadas del frame destino.
+        """
+        src_w, src_h = self.frame_size
+        if not self.boxes or src_w == 0 or src_h == 0:
+            return list(self.boxes)
+        if (src_w, src_h) == (width, height):
+            return list(self.boxes)
+        sx = width / src_w
+        sy = height / src_h
+        return [
+            (int(x * sx), int(y * sy), int(w * sx), int(h * sy))
+            for (x, y, w, h) in self.boxes
+        ]
+
+    def union_box(self, width: int, height: int) -> Optional[Box]:
+        """Caja que engloba todas las regiones, escalada a otra resolución.
+
+        Args:
+            width: Ancho del frame destino.
+            height: Alto del frame destino.
+
+        Returns:
+            Caja (x, y, w, h) o None si no hay regiones.
+        """
+        boxes = self.scaled_boxes(width, height)
+        if not boxes:
+            return None
+        x0 = min(x for x, _, _, _ in boxes)
+        y0 = min(y for _, y, _, _ in boxes)
+        x1 = max(x + w for x, _, w, _ in boxes)
+        y1 = max(y + h for _, y, _, h in boxes)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def __repr__(self) -> str:
+        """Representación legible del resultado."""
+        return (
+            f"DetectionResult(motion_detected={self.motion_detected}, "
+            f"raw_motion={self.raw_motion}, boxes={len(self.boxes)}, "
+            f"motion_energy={self.motion_energy:.4f})"
+        )
+
+
+# Resultado neutro para frames sin detección (calibración, errores)
+NO_DETECTION = DetectionResult()
+
+
+def draw_detections(
+    frame: np.ndarray,
+    result: DetectionResult,
+    color: Tuple[int, int, int] = (0, 255, 0),
+    thickness: int = 2
+) -> np.ndarray:
+    """Dibuja en sitio las regiones de movimiento sobre un frame.
+
+    Las cajas se escalan a la resolución del frame recibido, de modo que
+    la anotación se hace a resolución completa aunque la detección se
+    haya hecho sobre el stream lores.
+
+    Args:
+        frame: Frame escribible sobre el que dibujar (se modifica).
+        result: Resultado de detección.
+        color: Color del rectángulo en el orden de canales del frame.
+        thickness: Grosor de línea.
+
+    Returns:
+        El mismo frame recibido.
+    """
+    height, width = frame.shape[:2]
+    for (x, y, w, h) in result.scaled_boxes(width, height):
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, thickness)
+    return frame
@@ -0,0 +1,265 @@
+"""Máquina de estados de episodios, determinista y con reloj inyectable.
+
+Decide cuándo empieza y termina un episodio de movimiento a partir de los
+resultados de detección, sin efectos secundarios: no toca disco, base de
+datos ni ``system_status``. Cada llamada a ``update`` devuelve una
+``EpisodeDecision`` que el llamador ejecuta. El tiempo se recibe en cada
+frame (o de un reloj inyectado), de modo que una secuencia grabada de
+detecciones se puede reproducir a miles de frames por segundo en tests y
+ajustar las constantes de tiempo sin cámara.
+"""
+
+import logging
+import time
+from typing import Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class EpisodeDecision:
+    """Acciones a ejecutar tras procesar un frame.
+
+    Attributes:
+        start: Iniciar un episodio en ``timestamp``.
+        stop: Cerrar el episodio iniciado en ``episode_start_time``.
+        add_frame: Añadir este frame al episodio activo.
+        motion: Movimiento efectivo del frame (tras gracia y calmado forzado).
+        motion_state: Estado de movimiento a mostrar en el sistema.
+        timestamp: Instante del frame.
+        episode_start_time: Inicio del episodio cerrado (si ``stop``).
+        reason: Motivo del cierre (si ``stop``).
+    """
+
+    __slots__ = (
+        'start', 'stop', 'add_frame', 'motion', 'motion_state',
+        'timestamp', 'episode_start_time', 'reason'
+    )
+
+    def __init__(self, timestamp: float) -> None:
+        """Inicializa una decisión sin acciones.
+
+        Args:
+            timestamp: Instante del frame.
+        """
+        self.start: bool = False
+        self.stop: bool = False
+        self.add_frame: bool = False
+        self.motion: bool = False
+        self.motion_state: bool = False
+        self.timestamp: float = timestamp
+        self.episode_start_time: Optional[float] = None
+        self.reason: Optional[str] = None
+
+    def __repr__(self) -> str:
+        """Representación legible de la decisión."""
+        actions = [name for name in ('start', 'stop', 'add_frame') if getattr(self, name)]
+        return f"EpisodeDecision({', '.join(actions) or 'none'}, t={self.timestamp:.3f})"
+
+
+class EpisodeStateMachine:
+    """Lógica de inicio y cierre de episodios de movimiento.
+
+    Un episodio empieza tras ``start_frames`` frames con movimiento y se
+    cierra (calmado forzado) cuando:
+
+    - dura más de ``max_duration_factor * calm_timeout`` segundos (si
+      ``max_duration_factor`` > 0),
+    - hay ``calm_check_frames`` frames sin movimiento y dura más de
+      ``calm_timeout``, o
+    - hay ``calm_frames`` frames consecutivos sin movimiento.
+
+    Tras un calmado forzado se ignora el movimiento durante
+    ``grace_period`` segundos.
+
+    Attributes:
+        episode_active: Si hay un episodio en curso.
+        episode_start_time: Instante de inicio del episodio en curso.
+        frames_without_motion: Frames consecutivos sin movimiento.
+        frames_with_motion_after_grace: Frames con movimiento acumulados
+            desde el último período de gracia.
+        last_forced_calm_time: Instante del último calmado forzado.
+    """
+
+    def __init__(
+        self,
+        calm_timeout: float = 2.0,
+        max_duration_factor: float = 3.0,
+        grace_period: float = 8.0,
+        start_frames: int = 10,
+        calm_frames: int = 5,
+        calm_check_frames: int = 3,
+        sample_every: int = 5,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        """Inicializa la máquina de estados.
+
+        Args:
+            calm_timeout: Segundos mínimos de episodio antes de poder calmarlo
+                por frames sin movimiento.
+            max_duration_factor: Duración máxima del episodio en múltiplos de
+                ``calm_timeout`` (0 = sin límite, p.ej. cuando el grabador
+                parte los episodios largos en segmentos).
+            grace_period: Segundos en que se ignora el movimiento tras un
+                calmado forzado.
+            start_frames: Frames con movimiento necesarios para iniciar un
+                episodio (~0.6 s a 15 FPS).
+            calm_frames: Frames consecutivos sin movimiento que fuerzan el
+                calmado (~0.3 s).
+            calm_check_frames: Frames sin movimiento a partir de los cuales
+                se comprueba la duración mínima (~0.2 s).
+            sample_every: Añadir al episodio uno de cada N frames.
+            clock: Reloj usado cuando ``update`` no recibe el instante.
+        """
+        self.calm_timeout: float = calm_timeout
+        self.max_duration_factor: float = max_duration_factor
+        self.grace_period: float = grace_period
+        self.start_frames: int = start_frames
+        self.calm_frames: int = calm_frames
+        self.calm_check_frames: int = calm_check_frames
+        self.sample_every: int = max(1, sample_every)
+        self.clock = clock
+
+        self.episode_active: bool = False
+        self.episode_start_time: Optional[float] = None
+        self.frames_without_motion: int = 0
+        self.frames_with_motion_after_grace: int = 0
+        self.last_forced_calm_time: Optional[float] = None
+        self.motion_state: bool = False
+        self._frames_seen: int = 0
+
+    @property
+    def max_episode_duration(self) -> float:
+        """Duración máxima de un episodio en segundos (0 = sin límite)."""
+        return self.calm_timeout * max(0.0, self.max_duration_factor)
+
+    def update(
+        self,
+        motion_detected: bool,
+        processed: bool = True,
+        frame_index: Optional[int] = None,
+        now: Optional[float] = None
+    ) -> EpisodeDecision:
+        """Procesa el resultado de detección de un frame.
+
+        Args:
+            motion_detected: Movimiento confirmado por el detector.
+            processed: False si el detector no analizó este frame (se
+                trata como frame sin movimiento).
+            frame_index: Número de frame (para el muestreo de grabación);
+                por defecto, un contador interno.
+            now: Instante del frame; por defecto, el reloj inyectado.
+
+        Returns:
+            Decisión con las acciones a ejecutar.
+        """
+        now = self.clock() if now is None else now
+        self._frames_seen += 1
+        index = self._frames_seen if frame_index is None else frame_index
+        decision = EpisodeDecision(now)
+        motion = motion_detected if processed else False
+        state = self.motion_state
+
+        if not motion:
+            self.frames_without_motion += 1
+        else:
+            self.frames_without_motion = 0
+
+        # El cierre se basa en el TIEMPO del episodio, no solo en el detector,
+        # para que un detector que siempre reporta movimiento no lo atrape
+        force_calm = False
+        if self.episode_active:
+            episode_duration = now - self.episode_start_time
+            if self.max_episode_duration > 0 and episode_duration > self.max_episode_duration:
+                force_calm = True
+                decision.reason = (
+                    f"episodio activo por {episode_duration:.2f}s "
+                    f"(máximo: {self.max_episode_duration}s)"
+                )
+            elif self.frames_without_motion >= self.calm_check_frames and episode_duration > self.calm_timeout:
+                force_calm = True
+                decision.reason = (
+                    f"{self.frames_without_motion} frames sin movimiento "
+                    f"y {episode_duration:.2f}s de episodio"
+                )
+
+        # Respaldo rápido: muchos frames seguidos sin movimiento
+        if self.frames_without_motion >= self.calm_frames:
+            force_calm = True
+            if decision.reason is None:
+                decision.reason = f"{self.frames_without_motion} frames sin movimiento"
+
+        # Sin episodio activo el estado se mantiene en calma hasta confirmar
+        # el movimiento con suficientes frames
+        if not self.episode_active:
+            state = False
+
+        if force_calm:
+            motion = False
+            state = False
+            if self.episode_active:
+                decision.stop = True
+                decision.episode_start_time = self.episode_start_time
+                self.episode_active = False
+                self.episode_start_time = None
+                self.frames_without_motion = 0
+                self.last_forced_calm_time = now
+                logger.info(f"Forzando calmado: {decision.reason}")
+        elif self.episode_active:
+            if processed:
+                state = motion
+            elif self.frames_without_motion >= 2:
+                state = False
+
+        # Período de gracia tras un calmado forzado: evita que un episodio
+        # se reabra inmediatamente después de cerrarse
+        in_grace_period = False
+        if self.last_forced_calm_time is not None:
+            if now - self.last_forced_calm_time < self.grace_period:
+                in_grace_period = True
+                motion = False
+                state = False
+                self.frames_with_motion_after_grace = 0
+            else:
+                self.last_forced_calm_time = None
+
+        if motion and not force_calm and not in_grace_period:
+            self.frames_without_motion = 0
+            self.frames_with_motion_after_grace += 1
+            if not self.episode_active and self.frames_with_motion_after_grace >= self.start_frames:
+                decision.start = True
+                self.episode_active = True
+                self.episode_start_time = now
+                self.last_forced_calm_time = None
+                self.frames_with_motion_after_grace = 0
+        elif not in_grace_period and not self.episode_active:
+            # Tolerancia a ruido: solo se reinicia la cuenta tras varios
+            # frames seguidos sin movimiento
+            if self.frames_without_motion >= self.calm_frames:
+                self.frames_with_motion_after_grace = 0
+
+        decision.add_frame = self.episode_active and index % self.sample_every == 0
+        decision.motion = motion
+        decision.motion_state = state
+        self.motion_state = state
+        return decision
+
+    def close(self, now: Optional[float] = None) -> EpisodeDecision:
+        """Cierra el episodio activo sin período de gracia (p.ej. al apagar).
+
+        Args:
+            now: Instante de cierre; por defecto, el reloj inyectado.
+
+        Returns:
+            Decisión con ``stop`` si había un episodio activo.
+        """
+        now = self.clock() if now is None else now
+        decision = EpisodeDecision(now)
+        if self.episode_active:
+            decision.stop = True
+            decision.episode_start_time = self.episode_start_time
+            decision.reason = "cierre solicitado"
+            self.episode_active = False
+            self.episode_start_time = None
+        self.motion_state = False
+        return decision
@@ -5,10 +5,12 @@ de frames con actualización adaptativa del fondo.
 """
 
 import logging
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 import numpy as np
 import cv2
 
+from src.detection.detection_result import DetectionResult, NO_DETECTION
+
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +22,19 @@ class MotionDetector:
     para identificar áreas de movimiento. El fondo se actualiza adaptativamente
     para manejar cambios graduales en la iluminación.
     
+    El fondo se mantiene como un acumulador float32 actualizado en sitio
+    (``cv2.accumulateWeighted``), y todos los buffers intermedios del loop
+    (gris, blur, diferencia, máscara, etiquetas) se preasignan y reutilizan
+    mientras no cambie la resolución de entrada.
+    
     Attributes:
         threshold: Umbral de diferencia de píxeles para considerar movimiento.
-        min_area: Área mínima de contorno para considerar movimiento válido.
+        min_area: Área mínima (en píxeles) de una región para considerar movimiento válido.
         blur_kernel: Tamaño del kernel para blur gaussiano.
         background_update_rate: Tasa de actualización del fondo (0-1).
-        background: Frame de fondo actual.
+        background: Acumulador float32 del fondo actual.
         background_set: Indica si el fondo ha sido establecido.
+        last_result: Resultado de la última detección.
     """
     
     def __init__(
@@ -63,6 +71,17 @@ class MotionDetector:
         self.background_set: bool = False
         self.motion_frame_count: int = 0  # Contador de frames consecutivos con movimiento
         self.calibration_count: int = 0  # Contador de frames de calibración
+        self.last_result: DetectionResult = NO_DETECTION
+        
+        # Buffers de trabajo preasignados (se crean con la primera resolución vista)
+        self._buffer_shape: Optional[Tuple[int, int]] = None
+        self._gray: Optional[np.ndarray] = None
+        self._blurred: Optional[np.ndarray] = None
+        self._background_u8: Optional[np.ndarray] = None
+        self._delta: Optional[np.ndarray] = None
+        self._mask: Optional[np.ndarray] = None
+        self._eroded: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
         
         logger.info(
             f"MotionDetector inicializado: threshold={threshold}, "
@@ -71,33 +90,86 @@ class MotionDetector:
             f"calibration_frames={calibration_frames}"
         )
     
-    def set_background(self, frame: np.ndarray) -> None:
-        """Establece el frame de fondo inicial.
+    def _ensure_buffers(self, shape: Tuple[int, int]) -> None:
+        """Preasigna los buffers de trabajo para una resolución dada.
+        
+        Args:
+            shape: Shape (height, width) de los frames en escala de grises.
+        """
+        if self._buffer_shape == shape:
+            return
+        
+        self._buffer_shape = shape
+        self._gray = np.empty(shape, dtype=np.uint8)
+        self._blurred = np.empty(shape, dtype=np.uint8)
+        self._background_u8 = np.empty(shape, dtype=np.uint8)
+        self._delta = np.empty(shape, dtype=np.uint8)
+        self._mask = np.empty(shape, dtype=np.uint8)
+        self._eroded = np.empty(shape, dtype=np.uint8)
+        self._labels = np.empty(shape, dtype=np.int32)
+        logger.debug(f"Buffers de detección preasignados para {shape[1]}x{shape[0]}")
+    
+    def _blur_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Obtiene el frame en escala de grises suavizado.
+        
+        Los frames de un solo canal (p.ej. el plano Y de un stream YUV420)
+        se usan directamente como vista, sin conversión ni copia. El
+        resultado se escribe en un buffer reutilizado: solo es válido hasta
+        la siguiente llamada.
         
         Args:
-            frame: Frame RGB para usar como fondo.
+            frame: Frame RGB o de un solo canal (luma).
             
-        Raises:
-            ValueError: Si el frame no es válido.
+        Returns:
+            Buffer interno con el frame en escala de grises suavizado.
         """
-        if frame is None or frame.size == 0:
-            raise ValueError("Frame inválido para establecer fondo")
+        self._ensure_buffers(frame.shape[:2])
         
-        # Convertir a escala de grises
         if len(frame.shape) == 3:
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY, dst=self._gray)
         else:
-            gray = frame.copy()
+            gray = frame
         
-        # Aplicar blur gaussiano
-        self.background = cv2.GaussianBlur(
+        return cv2.GaussianBlur(
             gray,
             (self.blur_kernel, self.blur_kernel),
-            0
+            0,
+            dst=self._blurred
         )
+    
+    def _set_background_blurred(self, gray_blurred: np.ndarray) -> None:
+        """Establece el fondo a partir de un frame ya suavizado."""
+        if self.background is None or self.background.shape != gray_blurred.shape:
+            self.background = gray_blurred.astype(np.float32)
+        else:
+            np.copyto(self.background, gray_blurred)
         self.background_set = True
         logger.info("Fondo establecido")
     
+    def _update_background_blurred(self, gray_blurred: np.ndarray, rate: float) -> None:
+        """Aplica la media móvil exponencial en sitio sobre el acumulador float32.
+        
+        Args:
+            gray_blurred: Frame en escala de grises suavizado.
+            rate: Tasa de actualización a aplicar (0-1).
+        """
+        if self.background is not None:
+            cv2.accumulateWeighted(gray_blurred, self.background, rate)
+    
+    def set_background(self, frame: np.ndarray) -> None:
+        """Establece el frame de fondo inicial.
+        
+        Args:
+            frame: Frame RGB o de un solo canal (luma) para usar como fondo.
+            
+        Raises:
+            ValueError: Si el frame no es válido.
+        """
+        if frame is None or frame.size == 0:
+            raise ValueError("Frame inválido para establecer fondo")
+        
+        self._set_background_blurred(self._blur_gray(frame))
+    
     def update_background(self, frame: np.ndarray) -> None:
         """Actualiza el fondo adaptativamente.
         
@@ -105,41 +177,29 @@ class MotionDetector:
         adaptarse a cambios graduales en iluminación.
         
         Args:
-            frame: Frame RGB actual.
+            frame: Frame RGB o de un solo canal (luma) actual.
         """
         if not self.background_set:
             self.set_background(frame)
             return
         
-        # Convertir a escala de grises y aplicar blur
-        if len(frame.shape) == 3:
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = frame.copy()
-        
-        gray_blurred = cv2.GaussianBlur(
-            gray,
-            (self.blur_kernel, self.blur_kernel),
-            0
-        )
-        
-        # Actualización adaptativa: media móvil exponencial
-        if self.background is not None:
-            self.background = (
-                (1 - self.background_update_rate) * self.background +
-                self.background_update_rate * gray_blurred
-            ).astype(np.uint8)
+        self._update_background_blurred(self._blur_gray(frame), self.background_update_rate)
     
-    def detect(self, frame: np.ndarray) -> Tuple[bool, np.ndarray]:
+    def detect(self, frame: np.ndarray) -> DetectionResult:
         """Detecta movimiento en el frame.
         
+        El frame se convierte a escala de grises y se suaviza una única vez;
+        el resultado se reutiliza para la detección y para actualizar el fondo.
+        Las regiones de movimiento se extraen con componentes conexas; el área
+        de cada región es su número de píxeles. El frame nunca se copia ni se
+        anota: la anotación se hace bajo demanda con ``draw_detections``.
+        
         Args:
-            frame: Frame RGB para analizar.
+            frame: Frame RGB o de un solo canal (plano Y) para analizar. Puede
+                ser una vista de solo lectura.
             
         Returns:
-            Tupla (motion_detected, annotated_frame):
-                - motion_detected: True si se detectó movimiento.
-                - annotated_frame: Frame con rectángulos dibujados en áreas de movimiento.
+            DetectionResult con las cajas en coordenadas de ``frame``.
                 
         Raises:
             ValueError: Si el frame no es válido.
@@ -147,138 +207,93 @@ class MotionDetector:
         if frame is None or frame.size == 0:
             raise ValueError("Frame inválido para detección")
         
+        self.last_result = NO_DETECTION
+        
+        # Escala de grises + blur una sola vez por llamada
+        gray_blurred = self._blur_gray(frame)
+        
         # Período de calibración: acumular frames para establecer fondo estable
         if not self.background_set:
             self.calibration_count += 1
             if self.calibration_count < self.calibration_frames:
                 # Durante calibración, actualizar fondo con todos los frames
-                if self.background is None:
-                    # Convertir a escala de grises
-                    if len(frame.shape) == 3:
-                        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-                    else:
-                        gray = frame.copy()
-                    # Aplicar blur
-                    self.background = cv2.GaussianBlur(
-                        gray,
-                        (self.blur_kernel, self.blur_kernel),
-                        0
-                    )
+                if self.background is None or self.background.shape != gray_blurred.shape:
+                    self.background = gray_blurred.astype(np.float32)
                 else:
-                    # Promediar con frames anteriores durante calibración
-                    if len(frame.shape) == 3:
-                        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-                    else:
-                        gray = frame.copy()
-                    gray_blurred = cv2.GaussianBlur(
-                        gray,
-                        (self.blur_kernel, self.blur_kernel),
-                        0
-                    )
                     # Promedio móvil durante calibración
                     alpha = 1.0 / (self.calibration_count + 1)
-                    self.background = (
-                        (1 - alpha) * self.background +
-                        alpha * gray_blurred
-                    ).astype(np.uint8)
-                return False, frame.copy()
+                    self._update_background_blurred(gray_blurred, alpha)
+                return NO_DETECTION
             else:
                 # Calibración completa
                 self.background_set = True
                 logger.info(f"Calibración completada después de {self.calibration_count} frames")
         
-        # Convertir a escala de grises
-        if len(frame.shape) == 3:
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = frame.copy()
-        
-        # Aplicar blur gaussiano para reducir ruido
-        gray_blurred = cv2.GaussianBlur(
-            gray,
-            (self.blur_kernel, self.blur_kernel),
-            0
-        )
-        
         # Verificar que el fondo esté inicializado y tenga el mismo tamaño
         try:
             if self.background is None:
                 # Fondo no inicializado, establecerlo ahora
-                self.set_background(frame)
-                return False, frame.copy()
+                self._set_background_blurred(gray_blurred)
+                return NO_DETECTION
             
             # Verificar que el fondo no esté vacío
             if not hasattr(self.background, 'size') or self.background.size == 0:
-                self.set_background(frame)
-                return False, frame.copy()
+                self._set_background_blurred(gray_blurred)
+                return NO_DETECTION
             
             # Verificar que el fondo tenga el mismo tamaño que el frame procesado
             if self.background.shape != gray_blurred.shape:
                 # Tamaños diferentes, recalibrar fondo
-                self.set_background(frame)
-                return False, frame.copy()
+                self._set_background_blurred(gray_blurred)
+                return NO_DETECTION
         except (AttributeError, ValueError) as e:
             # Error al acceder al fondo, recalibrar
             logger.warning(f"Error validando fondo, recalibrando: {e}")
-            self.set_background(frame)
-            return False, frame.copy()
+            self._set_background_blurred(gray_blurred)
+            return NO_DETECTION
         
-        # Calcular diferencia absoluta con el fondo
+        # Calcular diferencia absoluta con el fondo (todo en buffers preasignados)
         try:
-            frame_delta = cv2.absdiff(self.background, gray_blurred)
+            cv2.convertScaleAbs(self.background, dst=self._background_u8)
+            frame_delta = cv2.absdiff(self._background_u8, gray_blurred, dst=self._delta)
         except cv2.error as e:
             # Error en absdiff, probablemente tamaños incompatibles
             logger.warning(f"Error en absdiff, recalibrando fondo: {e}")
-            self.set_background(frame)
-            return False, frame.copy()
+            self._set_background_blurred(gray_blurred)
+            return NO_DETECTION
         
         # Aplicar threshold para binarizar
-        _, thresh = cv2.threshold(
+        cv2.threshold(
             frame_delta,
             self.threshold,
             255,
-            cv2.THRESH_BINARY
+            cv2.THRESH_BINARY,
+            dst=self._mask
         )
         
         # Erosión primero para eliminar ruido pequeño
-        thresh = cv2.erode(thresh, None, iterations=2)
+        cv2.erode(self._mask, None, dst=self._eroded, iterations=2)
         
         # Dilatación para conectar áreas cercanas (menos iteraciones)
-        thresh = cv2.dilate(thresh, None, iterations=1)
+        thresh = cv2.dilate(self._eroded, None, dst=self._mask, iterations=1)
         
-        # Encontrar contornos
-        contours, _ = cv2.findContours(
-            thresh.copy(),
-            cv2.RETR_EXTERNAL,
-            cv2.CHAIN_APPROX_SIMPLE
+        # Componentes conexas con estadísticas (bounding box + área en una pasada)
+        num_labels, _, stats, _ = cv2.connectedComponentsWithStats(
+            thresh,
+            labels=self._labels,
+            connectivity=8,
+            ltype=cv2.CV_32S
         )
         
-        # Crear copia del frame para anotar
-        annotated_frame = frame.copy()
-        motion_detected = False
-        
-        # Procesar contornos
-        raw_motion_detected = False
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            
-            # Filtrar por área mínima
-            if area < self.min_area:
-                continue
-            
-            raw_motion_detected = True
-            
-            # Obtener bounding box
-            (x, y, w, h) = cv2.boundingRect(contour)
-            
-            # Dibujar rectángulo verde en el frame anotado
-            cv2.rectangle(
-                annotated_frame,
-                (x, y),
-                (x + w, y + h),
-                (0, 255, 0),  # Verde en RGB
-                2
-            )
+        # Procesar regiones (la etiqueta 0 es el fondo)
+        region_areas = stats[1:, cv2.CC_STAT_AREA]
+        boxes: List[Tuple[int, int, int, int]] = []
+        areas: List[int] = []
+        for label in np.flatnonzero(region_areas >= self.min_area) + 1:
+            x, y, w, h, area = stats[label]
+            boxes.append((int(x), int(y), int(w), int(h)))
+            areas.append(int(area))
+        raw_motion_detected = bool(boxes)
         
         # Filtro de estabilización: requiere frames consecutivos
         if raw_motion_detected:
@@ -295,27 +310,28 @@ class MotionDetector:
         
         # Actualizar fondo adaptativamente SIEMPRE, pero más rápido cuando no hay movimiento
         # Esto previene que el fondo quede "atrapado" en un estado que siempre detecta movimiento
+        # Se reutiliza el frame suavizado calculado arriba (sin reconvertir)
         if not motion_detected:
             # Actualizar fondo más agresivamente cuando no hay movimiento
             # para adaptarse rápidamente a cambios de iluminación y volver a "calmado"
-            original_rate = self.background_update_rate
-            # Aumentar temporalmente la tasa de actualización para adaptación rápida
-            self.background_update_rate = min(0.1, original_rate * 2.5)  # Hasta 0.1 máximo
-            self.update_background(frame)
-            # Restaurar tasa original
-            self.background_update_rate = original_rate
+            rate = min(0.1, self.background_update_rate * 2.5)  # Hasta 0.1 máximo
         else:
             # CRÍTICO: Actualizar fondo incluso cuando hay movimiento, pero muy lentamente
             # Esto previene que el fondo quede "atrapado" y siempre detecte movimiento
-            # Usar una tasa muy baja para que el objeto en movimiento no se convierta en fondo
-            original_rate = self.background_update_rate
-            # Actualizar muy lentamente (10% de la tasa normal) cuando hay movimiento
-            self.background_update_rate = original_rate * 0.1
-            self.update_background(frame)
-            # Restaurar tasa original
-            self.background_update_rate = original_rate
-        
-        return motion_detected, annotated_frame
+            # Usar una tasa muy baja (10% de la normal) para que el objeto no se convierta en fondo
+            rate = self.background_update_rate * 0.1
+        self._update_background_blurred(gray_blurred, rate)
+        
+        height, width = gray_blurred.shape
+        self.last_result = DetectionResult(
+            motion_detected=motion_detected,
+            raw_motion=raw_motion_detected,
+            boxes=tuple(boxes),
+            areas=tuple(areas),
+            motion_energy=float(region_areas.sum()) / (width * height),
+            frame_size=(width, height)
+        )
+        return self.last_result
     
     def reset_background(self) -> None:
         """Resetea el fondo, forzando recalibración en el próximo frame."""
@@ -0,0 +1,13 @@
+"""Módulo de pipeline por etapas - colas acotadas y workers."""
+
+from .bounded_queue import BoundedQueue, DROP_POLICIES
+from .stage import PipelineStage, Pipeline
+from .frame_item import FrameItem
+
+__all__ = [
+    'BoundedQueue',
+    'DROP_POLICIES',
+    'PipelineStage',
+    'Pipeline',
+    'FrameItem',
+]
@@ -0,0 +1,170 @@
+"""Cola acotada entre etapas del pipeline con política de descarte.
+
+Cuando la cola está llena, la política decide qué pasa con el nuevo
+elemento:
+
+- ``block``: el productor espera hasta que haya hueco (o hasta el timeout).
+- ``drop_oldest``: se descarta el elemento más antiguo de la cola.
+- ``drop_newest``: se descarta el elemento nuevo.
+
+Las políticas de descarte garantizan que una etapa lenta nunca bloquee a
+la anterior; ``block`` se reserva para trabajos que no pueden perderse.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+
+class BoundedQueue:
+    """Cola FIFO acotada y thread-safe con política de descarte.
+
+    Attributes:
+        maxsize: Capacidad máxima.
+        policy: Política aplicada cuando la cola está llena.
+        dropped: Elementos descartados desde el inicio.
+        put_count: Elementos aceptados desde el inicio.
+        high_watermark: Profundidad máxima alcanzada.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: str = 'drop_oldest',
+        on_drop: Optional[Callable[[Any], None]] = None
+    ) -> None:
+        """Inicializa la cola.
+
+        Args:
+            maxsize: Capacidad máxima (>= 1).
+            policy: Una de ``DROP_POLICIES``.
+            on_drop: Función llamada (fuera del lock) con cada elemento
+                descartado, p.ej. para liberar los recursos que retiene.
+
+        Raises:
+            ValueError: Si la capacidad o la política no son válidas.
+        """
+        if maxsize < 1:
+            raise ValueError(f"La capacidad debe ser >= 1: {maxsize}")
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Política de descarte desconocida: {policy}")
+
+        self.maxsize: int = maxsize
+        self.policy: str = policy
+        self.on_drop = on_drop
+        self.dropped: int = 0
+        self.put_count: int = 0
+        self.high_watermark: int = 0
+        self._items: Deque[Any] = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        """Profundidad actual de la cola."""
+        with self._lock:
+            return len(self._items)
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """Encola un elemento aplicando la política de descarte.
+
+        Args:
+            item: Elemento a encolar.
+            timeout: Espera máxima con la política ``block`` (None = sin límite).
+
+        Returns:
+            True si el elemento se encoló (aunque se haya descartado otro).
+        """
+        evicted: List[Any] = []
+        accepted = self._put(item, timeout, evicted)
+        if self.on_drop is not None:
+            for dropped in evicted:
+                self.on_drop(dropped)
+        return accepted
+
+    def _put(self, item: Any, timeout: Optional[float], evicted: List[Any]) -> bool:
+        """Encola con el lock tomado; añade a ``evicted`` los descartados."""
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                if self.policy == 'drop_newest':
+                    self.dropped += 1
+                    evicted.append(item)
+                    return False
+                if self.policy == 'drop_oldest':
+                    evicted.append(self._items.popleft())
+                    self.dropped += 1
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.dropped += 1
+                            evicted.append(item)
+                            return False
+                        self._not_full.wait(remaining)
+
+            self._items.append(item)
+            self.put_count += 1
+            if len(self._items) > self.high_watermark:
+                self.high_watermark = len(self._items)
+            self._not_empty.notify()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Extrae el elemento más antiguo.
+
+        Args:
+            timeout: Espera máxima si la cola está vacía (None = sin límite).
+
+        Returns:
+            Elemento o None si se agotó el timeout.
+        """
+        with self._lock:
+            if not self._items:
+                self._not_empty.wait_for(lambda: self._items, timeout)
+                if not self._items:
+                    return None
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List[Any]:
+        """Extrae hasta ``max_items`` elementos, esperando solo por el primero.
+
+        Args:
+            max_items: Número máximo de elementos a extraer.
+            timeout: Espera máxima si la cola está vacía (None = sin límite).
+
+        Returns:
+            Elementos en orden FIFO (lista vacía si se agotó el timeout).
+        """
+        with self._lock:
+            if not self._items:
+                self._not_empty.wait_for(lambda: self._items, timeout)
+            batch = [self._items.popleft() for _ in range(min(max_items, len(self._items)))]
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de la cola.
+
+        Returns:
+            Diccionario con profundidad, capacidad, política y contadores.
+        """
+        with self._lock:
+            return {
+                "depth": len(self._items),
+                "capacity": self.maxsize,
+                "policy": self.policy,
+                "high_watermark": self.high_watermark,
+                "enqueued": self.put_count,
+                "dropped": self.dropped
+            }
@@ -0,0 +1,60 @@
+"""Elemento que recorre las etapas del pipeline de cámara."""
+
+from typing import Optional
+import numpy as np
+
+from src.camera.frame_buffer import FrameRef
+from src.detection.detection_result import DetectionResult, NO_DETECTION
+
+
+class FrameItem:
+    """Frame capturado en tránsito entre etapas.
+
+    El frame principal no viaja en el elemento: está publicado en el
+    buffer circular y se referencia por su secuencia. Los elementos cuyo
+    frame se va a leer más adelante lo retienen con ``ref``, de modo que el
+    slot no se reutiliza mientras el elemento espera en las colas; quien
+    termina con el elemento (o lo descarta) debe llamar a ``release``.
+
+    Attributes:
+        seq: Secuencia del frame en el buffer circular (None si no se publicó).
+        index: Número de frame desde el inicio de la captura.
+        timestamp: Instante de captura (time.time()).
+        detect_frame: Frame de detección (stream lores) o None.
+        detection: Resultado de detección de este frame.
+        processed: True si el detector analizó este frame.
+        ref: Referencia que retiene el frame en el buffer (o None).
+    """
+
+    __slots__ = ('seq', 'index', 'timestamp', 'detect_frame', 'detection', 'processed', 'ref')
+
+    def __init__(
+        self,
+        seq: Optional[int],
+        index: int,
+        timestamp: float,
+        detect_frame: Optional[np.ndarray] = None,
+        ref: Optional[FrameRef] = None
+    ) -> None:
+        """Inicializa el elemento.
+
+        Args:
+            seq: Secuencia en el buffer circular.
+            index: Número de frame.
+            timestamp: Instante de captura.
+            detect_frame: Frame de detección (opcional).
+            ref: Referencia al frame publicado (opcional).
+        """
+        self.seq = seq
+        self.index = index
+        self.timestamp = timestamp
+        self.detect_frame = detect_frame
+        self.detection: DetectionResult = NO_DETECTION
+        self.processed: bool = False
+        self.ref: Optional[FrameRef] = ref
+
+    def release(self) -> None:
+        """Libera el frame retenido. Llamadas repetidas no tienen efecto."""
+        if self.ref is not None:
+            self.ref.release()
+            self.ref = None
@@ -0,0 +1,199 @@
+"""Etapas del pipeline: un worker por etapa con su propia cola acotada.
+
+Cada ``PipelineStage`` consume elementos de su cola en un thread propio y
+los pasa a su handler; el handler decide si envía resultados a la etapa
+siguiente. Una etapa lenta solo llena su propia cola, que descarta según
+su política, en lugar de frenar a las etapas anteriores.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.pipeline.bounded_queue import BoundedQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStage:
+    """Etapa del pipeline con cola acotada y thread worker.
+
+    Attributes:
+        name: Nombre de la etapa (para logs y estadísticas).
+        queue: Cola de entrada.
+        processed: Elementos procesados.
+        errors: Elementos cuyo handler lanzó una excepción.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        maxsize: int = 8,
+        policy: str = 'drop_oldest',
+        put_timeout: Optional[float] = None,
+        on_stop: Optional[Callable[[], None]] = None,
+        on_drop: Optional[Callable[[Any], None]] = None
+    ) -> None:
+        """Inicializa la etapa.
+
+        Args:
+            name: Nombre de la etapa.
+            handler: Función llamada con cada elemento (en el thread de la etapa).
+            maxsize: Capacidad de la cola de entrada.
+            policy: Política de descarte de la cola (ver ``BoundedQueue``).
+            put_timeout: Espera máxima al encolar con la política ``block``.
+            on_stop: Función llamada en el thread de la etapa tras vaciar la
+                cola al detenerse (p.ej. para cerrar trabajo pendiente).
+            on_drop: Función llamada con cada elemento que descarta la cola.
+        """
+        self.name: str = name
+        self.handler = handler
+        self.queue = BoundedQueue(maxsize, policy, on_drop=on_drop)
+        self.put_timeout: Optional[float] = put_timeout
+        self.on_stop = on_stop
+        self.processed: int = 0
+        self.errors: int = 0
+        self._busy_time: float = 0.0
+        self._last_latency: float = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._running: bool = False
+
+    @property
+    def is_running(self) -> bool:
+        """Indica si el worker de la etapa está activo."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, item: Any) -> bool:
+        """Envía un elemento a la etapa.
+
+        Args:
+            item: Elemento a procesar.
+
+        Returns:
+            True si se encoló, False si se descartó.
+        """
+        return self.queue.put(item, timeout=self.put_timeout)
+
+    def start(self) -> None:
+        """Arranca el worker de la etapa."""
+        if self.is_running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"Etapa '{self.name}' iniciada")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Detiene el worker tras procesar lo que quede en la cola.
+
+        Args:
+            timeout: Espera máxima para vaciar la cola.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning(
+                    f"Etapa '{self.name}' no terminó en {timeout}s "
+                    f"({len(self.queue)} elementos pendientes)"
+                )
+            self._thread = None
+
+    def _run(self) -> None:
+        """Loop del worker: procesa elementos hasta que se detiene y la cola queda vacía."""
+        while self._running or len(self.queue) > 0:
+            item = self.queue.get(timeout=0.2)
+            if item is None:
+                continue
+            started = time.perf_counter()
+            try:
+                self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error en etapa '{self.name}': {e}", exc_info=True)
+            self._last_latency = time.perf_counter() - started
+            self._busy_time += self._last_latency
+            self.processed += 1
+
+        if self.on_stop is not None:
+            try:
+                self.on_stop()
+            except Exception as e:
+                logger.error(f"Error deteniendo etapa '{self.name}': {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de la etapa.
+
+        Returns:
+            Diccionario con el estado de la cola y los tiempos de proceso.
+        """
+        stats = self.queue.get_stats()
+        stats.update({
+            "running": self.is_running,
+            "processed": self.processed,
+            "errors": self.errors,
+            "avg_ms": 1000 * self._busy_time / self.processed if self.processed else 0.0,
+            "last_ms": 1000 * self._last_latency
+        })
+        return stats
+
+
+class Pipeline:
+    """Conjunto ordenado de etapas que se arrancan y detienen juntas.
+
+    Las etapas se detienen en orden, de modo que cada una vacía su cola
+    (y entrega sus resultados a la siguiente) antes de que se detenga la
+    siguiente.
+    """
+
+    def __init__(self, stages: Optional[List[PipelineStage]] = None) -> None:
+        """Inicializa el pipeline.
+
+        Args:
+            stages: Etapas en orden de flujo.
+        """
+        self.stages: List[PipelineStage] = list(stages or [])
+
+    def __getitem__(self, name: str) -> PipelineStage:
+        """Obtiene una etapa por nombre."""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def add(self, stage: PipelineStage) -> PipelineStage:
+        """Añade una etapa al final del pipeline.
+
+        Args:
+            stage: Etapa a añadir.
+
+        Returns:
+            La misma etapa.
+        """
+        self.stages.append(stage)
+        return stage
+
+    def start(self) -> None:
+        """Arranca todas las etapas (de la última a la primera)."""
+        for stage in reversed(self.stages):
+            stage.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Detiene las etapas en orden de flujo, vaciando cada cola.
+
+        Args:
+            timeout: Espera máxima por etapa.
+        """
+        for stage in self.stages:
+            stage.stop(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Obtiene estadísticas de todas las etapas.
+
+        Returns:
+            Diccionario nombre de etapa -> estadísticas.
+        """
+        return {stage.name: stage.get_stats() for stage in self.stages}
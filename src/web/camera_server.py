@@ -1,25 +1,34 @@
 """Servidor FastAPI principal para streaming y API REST."""
 
+import functools
 import logging
-import asyncio
 import threading
 import time
+from contextlib import aclosing
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple
 import cv2
-import numpy as np
 from fastapi import FastAPI, Request
 from fastapi.responses import StreamingResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from src.camera.imx219_handler import IMX219Handler
+from src.camera.frame_source import FrameSource, create_frame_source
+from src.camera.frame_buffer import FrameRef, FrameRingBuffer
 from src.detection.motion_detector import MotionDetector
+from src.detection.detection_result import DetectionResult, NO_DETECTION
+from src.detection.episode_state_machine import EpisodeStateMachine
 from src.database.db_manager import DatabaseManager
-from src.data.lerobot_dataset import EpisodeRecorder
+from src.database.async_db import AsyncDatabase
+from src.data.lerobot_dataset import EpisodeRecorder, EpisodeWriteResult
+from src.data.episode_writer import EpisodeWriter
+from src.data.retention import RetentionManager
 from src.alerts.notification import NotificationManager
+from src.pipeline import Pipeline, PipelineStage, FrameItem
 from src.web.routes import router, system_status
+from src.web.mjpeg_broadcaster import StreamVariantRegistry
+from src.web.snapshot_cache import SnapshotCache
 
 
 logger = logging.getLogger(__name__)
@@ -50,23 +59,59 @@ class CameraServer:
         self.port = port
         
         # Inicializar componentes
-        self.camera: Optional[IMX219Handler] = None
+        self.camera: Optional[FrameSource] = None
         self.detector: Optional[MotionDetector] = None
         self.db_manager: Optional[DatabaseManager] = None
+        self.async_db: Optional[AsyncDatabase] = None  # Acceso de las rutas de la API
         self.recorder: Optional[EpisodeRecorder] = None
+        self.episode_writer: Optional[EpisodeWriter] = None
+        self.retention: Optional[RetentionManager] = None
         self.notifier: Optional[NotificationManager] = None
         
-        # Estado del sistema
-        self.current_frame: Optional[np.ndarray] = None
-        self.frame_lock = threading.Lock()
+        self.config = self._load_config(config_path)
+        
+        # Estado del sistema: los frames se publican en un buffer circular
+        # preasignado; los consumidores obtienen vistas de solo lectura.
+        # Los frames en cola que se grabarán retienen su slot: el buffer
+        # debe tener sitio para ellos además de los del streaming
+        self.frame_buffer = FrameRingBuffer(
+            capacity=int(self.config.get('camera', {}).get('buffer_slots', 12))
+        )
+        self.frame_misses = 0  # Frames ya reutilizados en el buffer al ir a leerlos
         self.camera_thread: Optional[threading.Thread] = None
         self.is_running = False
         
         # Estado de episodio
-        self.episode_active = False
-        self.episode_start_time: Optional[float] = None
+        self.episode_state = EpisodeStateMachine()
         self.episode_id: Optional[str] = None
-        self.episode_db_id: Optional[int] = None
+        self.episode_db_id: Optional[int] = None  # Propiedad de la etapa de persistencia
+        self._segment_start_time: Optional[float] = None  # Propiedad de la etapa de persistencia
+        # Post-roll: el episodio sigue grabando unos segundos tras el calmado
+        self.post_roll_seconds: float = float(self.config.get('storage', {}).get('post_roll_seconds', 0.0))
+        self._post_roll_deadline: Optional[float] = None
+        self._post_roll_start: Optional[float] = None
+        
+        # Pipeline por etapas: captura -> detección -> episodios -> persistencia
+        # (la codificación MJPEG es la etapa de los difusores de stream)
+        self.pipeline: Optional[Pipeline] = None
+        self.detect_every = 2
+        self.frames_captured = 0
+        self.last_detection: DetectionResult = NO_DETECTION
+        
+        # Variantes del stream MJPEG: cada frame se codifica una vez por
+        # variante (ancho, calidad, anotación) y se reparte a sus clientes
+        web_config = self.config.get('web', {})
+        self.stream_variants = StreamVariantRegistry(
+            self.frame_buffer,
+            default_quality=web_config.get('stream_quality', 70),
+            max_fps=web_config.get('stream_fps', 10),
+            max_variants=web_config.get('stream_max_variants', 8)
+        )
+        self.snapshot_cache = SnapshotCache(
+            self.frame_buffer,
+            self.stream_variants,
+            max_entries=web_config.get('snapshot_cache_entries', 4)
+        )
         
         # FastAPI app
         self.app = FastAPI(
@@ -80,6 +125,24 @@ class CameraServer:
         
         logger.info(f"CameraServer inicializado: {host}:{port}")
     
+    @staticmethod
+    def _load_config(config_path: str) -> Dict[str, Any]:
+        """Carga la configuración YAML del servidor.
+        
+        Args:
+            config_path: Ruta al archivo de configuración.
+            
+        Returns:
+            Diccionario de configuración (vacío si no se pudo leer).
+        """
+        try:
+            import yaml
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer la configuración, usando valores por defecto: {e}")
+            return {}
+    
     def _setup_routes(self) -> None:
         """Configura las rutas de FastAPI."""
         # Montar archivos estáticos
@@ -104,47 +167,65 @@ class CameraServer:
         
         # Streaming MJPEG
         @self.app.get("/video_feed")
-        async def video_feed():
-            """Stream MJPEG de video en tiempo real."""
+        async def video_feed(
+            annotate: bool = True,
+            w: Optional[int] = None,
+            q: Optional[int] = None,
+            fps: Optional[float] = None
+        ):
+            """Stream MJPEG de video en tiempo real.
+            
+            Args:
+                annotate: Si True, dibuja las áreas de movimiento sobre el stream.
+                w: Ancho de salida en píxeles (por defecto, resolución nativa).
+                q: Calidad JPEG 10-95 (por defecto, ``web.stream_quality``).
+                fps: FPS máximos para este cliente (por defecto, ``web.stream_fps``).
+            """
             return StreamingResponse(
-                self._generate_frames(),
+                self._generate_frames(annotate=annotate, width=w, quality=q, fps=fps),
                 media_type="multipart/x-mixed-replace; boundary=frame"
             )
         
         # Incluir rutas API
         self.app.include_router(router)
     
-    async def _generate_frames(self):
-        """Generador async de frames MJPEG."""
-        while self.is_running:
-            with self.frame_lock:
-                frame = self.current_frame
-            
-            if frame is not None:
-                # Convertir RGB a BGR para OpenCV
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                
-                # Codificar como JPEG con calidad optimizada para Raspberry Pi
-                # Calidad 70 es un buen balance entre calidad y tamaño
-                ret, buffer = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                if ret:
-                    frame_bytes = buffer.tobytes()
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            
-            # Reducir FPS a 10 para mejor rendimiento en Raspberry Pi
-            await asyncio.sleep(0.1)  # ~10 FPS (óptimo para Pi)
+    async def _generate_frames(
+        self,
+        annotate: bool = True,
+        width: Optional[int] = None,
+        quality: Optional[int] = None,
+        fps: Optional[float] = None
+    ):
+        """Generador async de frames MJPEG.
+        
+        Los frames se obtienen del difusor compartido de la variante
+        solicitada: la codificación JPEG se hace una vez por frame y
+        variante, independientemente del número de clientes.
+        
+        Args:
+            annotate: Si True, sirve la variante con las áreas de movimiento
+                dibujadas.
+            width: Ancho de salida (None = nativo).
+            quality: Calidad JPEG (None = calidad por defecto).
+            fps: FPS máximos del cliente (None = los de la variante).
+        """
+        async with aclosing(self.stream_variants.stream(width, quality, fps, annotate)) as chunks:
+            async for chunk in chunks:
+                if not self.is_running:
+                    break
+                yield chunk
     
     def _camera_thread_func(self) -> None:
-        """Thread que captura frames y detecta movimiento."""
+        """Thread de captura: inicializa los componentes, arranca las etapas
+        del pipeline y publica cada frame capturado."""
         try:
             # Inicializar componentes
             import yaml
             with open(self.config_path, 'r') as f:
                 config = yaml.safe_load(f)
             
-            # Cámara
-            self.camera = IMX219Handler(self.config_path)
+            # Cámara (o fuente de reproducción según camera.source)
+            self.camera = create_frame_source(self.config_path)
             self.camera.start()
             time.sleep(2)  # Calentamiento
             
@@ -158,23 +239,65 @@ class CameraServer:
                 consecutive_frames=det_config.get('consecutive_frames', 1),
                 calibration_frames=det_config.get('calibration_frames', 30)
             )
+            storage_config = config.get('storage', {})
+            self.episode_state = self._build_episode_state(det_config, storage_config)
             
             # Base de datos
             db_config = config.get('database', {})
-            self.db_manager = DatabaseManager(db_path=db_config.get('db_path', 'data/database.db'))
+            self.db_manager = DatabaseManager(
+                db_path=db_config.get('db_path', 'data/database.db'),
+                wal=db_config.get('wal', True),
+                cache_size_kb=db_config.get('cache_size_kb', 8192),
+                mmap_size_mb=db_config.get('mmap_size_mb', 64)
+            )
+            self.async_db = AsyncDatabase(
+                self.db_manager,
+                workers=db_config.get('workers', 2),
+                timeout=db_config.get('query_timeout', 2.0)
+            )
             
-            # Recorder
-            storage_config = config.get('storage', {})
+            # Recorder: los episodios cerrados se escriben en segundo plano
+            self.episode_writer = EpisodeWriter(
+                max_pending=storage_config.get('writer_queue', 2)
+            )
+            self.episode_writer.start()
             self.recorder = EpisodeRecorder(
-                episode_path=storage_config.get('episode_path', './data/episodes')
+                episode_path=storage_config.get('episode_path', './data/episodes'),
+                writer=self.episode_writer,
+                codec=storage_config.get('frame_codec', 'jpg'),
+                quality=storage_config.get('frame_quality', 85),
+                memory_budget_mb=storage_config.get('memory_budget_mb', 8),
+                storage_format=storage_config.get('format', 'images'),
+                video_codec=storage_config.get('video_codec', 'mjpg'),
+                # Se graba uno de cada N frames: el video conserva el ritmo real
+                fps=config.get('camera', {}).get('framerate', 15) / self.episode_state.sample_every,
+                pre_roll_seconds=storage_config.get('pre_roll_seconds', 0.0),
+                pre_roll_budget_mb=storage_config.get('pre_roll_budget_mb', 2.0),
+                segment_seconds=storage_config.get('segment_seconds', 0.0),
+                segment_max_mb=storage_config.get('segment_max_mb', 0.0)
             )
             
             # Notifier
-            self.notifier = NotificationManager(db_manager=self.db_manager)
+            self.notifier = NotificationManager(
+                db_manager=self.db_manager,
+                batch_size=db_config.get('event_batch_size', 100),
+                flush_interval=db_config.get('event_flush_ms', 250) / 1000.0
+            )
+            
+            # Retención: borra episodios antiguos en segundo plano
+            self.retention = self._build_retention(storage_config)
+            if self.retention is not None:
+                self.retention.start()
+            
+            # Etapas del pipeline (detección, episodios, persistencia)
+            self.pipeline = self._build_pipeline(config.get('pipeline', {}))
+            self.pipeline.start()
             
             # Configurar router con referencias
-            router.db_manager = self.db_manager  # type: ignore
+            router.db = self.async_db  # type: ignore
             router.motion_detector = self.detector  # type: ignore
+            router.snapshot_cache = self.snapshot_cache  # type: ignore
+            router.pipeline_stats = self.get_pipeline_stats  # type: ignore
             
             # Actualizar estado
             system_status["camera_active"] = True
@@ -183,229 +306,54 @@ class CameraServer:
             logger.info("Thread de cámara iniciado")
             self.notifier.log_event("system_started", "Sistema iniciado correctamente")
             
-            frame_count = 0
+            framerate = config.get('camera', {}).get('framerate', 15)
+            frame_interval = 1.0 / framerate if framerate else 0.0
+            detect_stage = self.pipeline["detect"]
             last_fps_time = time.time()
-            motion_active_frames = 0
-            last_motion_time: Optional[float] = None  # Tiempo desde que dejó de haber movimiento
-            last_motion_detected = False  # Estado anterior de movimiento
-            frames_without_motion = 0  # Contador de frames consecutivos sin movimiento
-            last_forced_calm_time: Optional[float] = None  # Tiempo del último calmado forzado
-            calm_grace_period = 8.0  # Período de gracia después de forzar calmado (segundos) - aumentado para máxima estabilidad
-            frames_with_motion_after_grace = 0  # Contador de frames con movimiento después del período de gracia
             
-            # Loop principal
+            # Loop de captura: solo captura, publica y encola; el resto de
+            # etapas trabaja en sus propios threads
             while self.is_running:
                 frame_start = time.time()
                 
-                # Capturar frame
-                frame = self.camera.capture_frame()
+                # Capturar frame: stream principal (streaming/grabación) y
+                # stream lores de luminancia (detección) generado por el ISP.
+                # Solo se pide el lores de los frames que se van a analizar:
+                # en fuentes sin ISP se genera por software
+                analysed = (self.frames_captured + 1) % self.detect_every == 0
+                frame, detect_frame = self.camera.capture_streams(lores=analysed)
                 if frame is None:
                     time.sleep(0.1)
                     continue
                 
-                frame_count += 1
-                
-                # Reducir carga: procesar detección solo cada 2 frames
-                if frame_count % 2 == 0:
-                    try:
-                        # Detectar movimiento (con frame reducido para mejor rendimiento)
-                        if frame.shape[0] > 720:
-                            # Reducir a 640x360 para detección más rápida
-                            small_frame = cv2.resize(frame, (640, 360))
-                            motion_detected, annotated_small = self.detector.detect(small_frame)
-                            # Escalar de vuelta al tamaño original
-                            annotated_frame = cv2.resize(annotated_small, (frame.shape[1], frame.shape[0]))
-                        else:
-                            motion_detected, annotated_frame = self.detector.detect(frame)
-                        
-                        # Actualizar frame actual (thread-safe)
-                        with self.frame_lock:
-                            self.current_frame = annotated_frame
-                    except Exception as e:
-                        logger.error(f"Error en detección: {e}", exc_info=True)
-                        # En caso de error, usar frame sin procesar
-                        with self.frame_lock:
-                            self.current_frame = frame
-                        motion_detected = False
-                else:
-                    # Frame sin procesar - asumir NO movimiento para incrementar contador
-                    # Esto ayuda a que el contador se incremente más rápido
-                    motion_detected = False
-                    # Frame sin procesar - solo actualizar para mantener fluidez
-                    with self.frame_lock:
-                        self.current_frame = frame
-                    time.sleep(0.05)  # Sleep para reducir CPU
-                    # NO hacer continue aquí - necesitamos procesar la lógica de episodios
-                
-                # Guardar estado actual para siguiente iteración (solo cuando procesamos)
-                if frame_count % 2 == 0:
-                    last_motion_detected = motion_detected
-                
-                # CRÍTICO: Sistema basado en TIEMPO, no solo en frames
-                # Rastrear tiempo desde que se inició el episodio o desde último movimiento real
-                current_time = time.time()
-                
-                # Contar frames consecutivos sin movimiento
-                if not motion_detected:
-                    frames_without_motion += 1
-                else:
-                    frames_without_motion = 0
-                
-                # Leer timeout de configuración
-                calm_timeout = det_config.get('calm_timeout', 2.0)
-                max_episode_duration = calm_timeout * 3  # Máximo 3x el timeout (6 segundos por defecto)
-                
-                # CRÍTICO: Forzar estado a False basándose en TIEMPO del EPISODIO, no del detector
-                # Si hay episodio activo y ha pasado más tiempo del máximo, forzar cierre
-                # Esto previene que el episodio quede atrapado si el detector siempre reporta movimiento
-                force_calm = False
-                if self.episode_active:
-                    episode_duration = current_time - self.episode_start_time
-                    
-                    # Si el episodio lleva más tiempo del máximo, forzar cierre
-                    if episode_duration > max_episode_duration:
-                        force_calm = True
-                        logger.info(f"Forzando calmado: episodio activo por {episode_duration:.2f}s (máximo: {max_episode_duration}s)")
-                    # También verificar si hay frames sin movimiento Y tiempo suficiente
-                    elif frames_without_motion >= 3:  # ~0.2 segundos
-                        # Si hay frames sin movimiento, verificar tiempo desde inicio del episodio
-                        if episode_duration > calm_timeout:
-                            force_calm = True
-                            logger.info(f"Forzando calmado: {frames_without_motion} frames sin movimiento y {episode_duration:.2f}s de episodio")
-                
-                # También forzar si hay muchos frames sin movimiento (backup rápido)
-                if frames_without_motion >= 5:  # ~0.3 segundos
-                    force_calm = True
+                self.frames_captured += 1
                 
-                # CRÍTICO: Si NO hay episodio activo, el detector se usa para detectar movimiento
-                # pero el estado se mantiene en False hasta confirmar con suficientes frames
-                # Esto previene que falsos positivos cambien el estado inmediatamente
-                if not self.episode_active:
-                    # El detector detecta movimiento normalmente (motion_detected puede ser True)
-                    # pero el estado del sistema se mantiene en False hasta confirmación
-                    # NO forzar motion_detected = False aquí, permitir detección
-                    system_status["motion_detected"] = False  # Estado siempre False sin episodio activo
-                
-                if force_calm:
-                    # Forzar estado a False y mantenerlo así, IGNORANDO lo que dice el detector
-                    motion_detected = False
-                    system_status["motion_detected"] = False
-                    # Si hay episodio activo, forzar cierre también
-                    if self.episode_active:
-                        # Cerrar episodio inmediatamente
-                        self._close_episode()
-                        last_motion_time = None
-                        frames_without_motion = 0
-                        last_forced_calm_time = current_time  # Registrar tiempo del calmado forzado
-                        # Forzar reset del fondo del detector para que se recalibre
-                        # IMPORTANTE: No resetear aquí porque causa errores de OpenCV
-                        # El reset se hará automáticamente cuando el detector detecte
-                        # que el fondo es None o tiene tamaño incorrecto
-                        logger.info("Fondo del detector será recalibrado en el próximo frame")
-                else:
-                    # Actualizar estado del sistema solo si hay episodio activo
-                    # Si no hay episodio activo, el estado ya está forzado a False arriba
-                    if self.episode_active:
-                        # Solo actualizar si realmente procesamos el frame
-                        if frame_count % 2 == 0:
-                            system_status["motion_detected"] = motion_detected
-                        # Si no procesamos el frame y hay muchos sin movimiento, forzar False
-                        elif frames_without_motion >= 2:
-                            system_status["motion_detected"] = False
-                
-                # Manejar episodios
-                try:
-                    # CRÍTICO: Verificar si estamos en período de gracia después de forzar calmado
-                    # Esto previene que se inicie un nuevo episodio inmediatamente después de cerrar uno
-                    in_grace_period = False
-                    if last_forced_calm_time is not None:
-                        time_since_forced_calm = current_time - last_forced_calm_time
-                        if time_since_forced_calm < calm_grace_period:
-                            in_grace_period = True
-                            # Durante el período de gracia, ignorar cualquier movimiento reportado
-                            motion_detected = False
-                            system_status["motion_detected"] = False
-                            frames_with_motion_after_grace = 0  # Resetear contador durante gracia
-                        else:
-                            # Fuera del período de gracia, NO resetear contador aquí
-                            # El contador se resetea solo si hay varios frames sin movimiento
-                            last_forced_calm_time = None
-                    
-                    if motion_detected and not force_calm and not in_grace_period:
-                        motion_active_frames += 1
-                        frames_without_motion = 0
-                        frames_with_motion_after_grace += 1
-                        
-                        # CRÍTICO: Requerir múltiples frames con movimiento después del período de gracia
-                        # para evitar falsos positivos que inicien episodios inmediatamente
-                        # Reducido a 10 frames (~0.6 segundos) para permitir detección más rápida
-                        frames_required_after_grace = 10  # ~0.6 segundos a 15 FPS - balanceado
-                        
-                        if not self.episode_active:
-                            # Solo iniciar episodio si hay suficientes frames consecutivos con movimiento
-                            # Esto previene que falsos positivos ocasionales inicien episodios
-                            if frames_with_motion_after_grace >= frames_required_after_grace:
-                                # Iniciar nuevo episodio
-                                self.episode_id = self.recorder.start_episode()
-                                self.episode_start_time = time.time()
-                                self.episode_active = True
-                                last_forced_calm_time = None  # Resetear período de gracia
-                                frames_with_motion_after_grace = 0
-                                
-                                # Registrar en BD
-                                self.episode_db_id = self.db_manager.add_episode(
-                                    episode_id=self.episode_id,
-                                    file_path=f"{self.recorder.episode_path}/{self.episode_id}",
-                                    start_time=datetime.fromtimestamp(self.episode_start_time),
-                                    motion_detected=True
-                                )
-                                
-                                self.notifier.episode_started(self.episode_id, self.episode_db_id)
-                                system_status["motion_count"] += 1
-                    else:
-                        # Si no hay movimiento o estamos en período de gracia
-                        motion_active_frames = 0
-                        if not in_grace_period:
-                            # CRÍTICO: Solo resetear contador si hay varios frames consecutivos sin movimiento
-                            # Esto permite que el detector acumule frames incluso si hay movimiento intermitente
-                            # Solo resetear si hay 5+ frames consecutivos sin movimiento (tolerancia a ruido)
-                            if not self.episode_active:
-                                if frames_without_motion >= 5:  # ~0.3 segundos sin movimiento
-                                    frames_with_motion_after_grace = 0
-                                # Si hay menos de 5 frames sin movimiento, mantener el contador
-                                # Esto permite que el movimiento intermitente se acumule
-                        
-                        # No hay episodio activo y no hay movimiento - asegurar estado calmado
-                        if not self.episode_active:
-                            if system_status.get("motion_detected", False):
-                                system_status["motion_detected"] = False
-                                frames_without_motion = 0
-                    
-                    # Añadir frame al episodio solo cada 5 frames para reducir memoria
-                    if self.episode_active and self.recorder and frame_count % 5 == 0:
-                        try:
-                            # Reducir resolución del frame antes de guardar
-                            small_frame = cv2.resize(frame, (640, 360)) if frame.shape[0] > 720 else frame
-                            self.recorder.add_frame(small_frame, {"motion": motion_detected})
-                        except Exception as e:
-                            logger.error(f"Error añadiendo frame al episodio: {e}")
-                except Exception as e:
-                    logger.error(f"Error manejando episodios: {e}", exc_info=True)
+                # Publicar frame (única copia por captura). La detección de
+                # este frame aún no existe: se adjunta la última disponible
+                frame_seq = self.frame_buffer.write(
+                    frame, {"detection": self.last_detection}, timestamp=frame_start
+                )
+                # Retener el slot de los frames que se leerán en etapas
+                # posteriores (grabación o detección sin lores)
+                index = self.frames_captured
+                needs_frame = (
+                    index % self.episode_state.sample_every == 0
+                    or (analysed and detect_frame is None)
+                )
+                detect_stage.submit(FrameItem(
+                    frame_seq, index, frame_start, detect_frame,
+                    ref=self._pin_frame(frame_seq) if needs_frame else None
+                ))
                 
                 # Calcular FPS cada 30 frames
-                if frame_count % 30 == 0:
-                    try:
-                        elapsed = time.time() - last_fps_time
-                        fps = 30 / elapsed if elapsed > 0 else 0
-                        system_status["fps"] = fps
-                        last_fps_time = time.time()
-                    except Exception as e:
-                        logger.error(f"Error calculando FPS: {e}")
+                if self.frames_captured % 30 == 0:
+                    elapsed = time.time() - last_fps_time
+                    system_status["fps"] = 30 / elapsed if elapsed > 0 else 0
+                    last_fps_time = time.time()
                 
-                # Control de framerate - ajustado para 15 FPS
+                # Control de framerate
                 frame_time = time.time() - frame_start
-                sleep_time = max(0, 0.067 - frame_time)  # ~15 FPS
-                time.sleep(sleep_time)
+                time.sleep(max(0, frame_interval - frame_time))
         
         except Exception as e:
             logger.critical(f"Error en thread de cámara: {e}", exc_info=True)
@@ -415,61 +363,476 @@ class CameraServer:
         finally:
             if self.camera:
                 self.camera.stop()
-            if self.episode_active:
-                self._close_episode()
+            if self.pipeline:
+                # Vacía las colas en orden; la etapa de episodios cierra el
+                # episodio activo antes de que se detenga la persistencia
+                self.pipeline.stop()
+            if self.episode_writer:
+                self.episode_writer.stop()
+            if self.retention:
+                self.retention.stop()
+            if self.notifier:
+                # Guarda los eventos en cola antes de cerrar la base de datos
+                self.notifier.close()
+            if self.async_db:
+                self.async_db.close()
+            if self.db_manager:
+                self.db_manager.close()
             system_status["camera_active"] = False
             logger.info("Thread de cámara terminado")
     
-    def _close_episode(self) -> None:
-        """Cierra el episodio actual."""
-        if not self.episode_active or not self.recorder:
-            # Asegurar estado calmado incluso si no hay episodio activo
-            system_status["motion_detected"] = False
-            return
+    @staticmethod
+    def _build_episode_state(det_config: Dict[str, Any], storage_config: Dict[str, Any]) -> EpisodeStateMachine:
+        """Construye la máquina de estados de episodios.
         
-        try:
-            # Guardar referencias antes de resetear
-            episode_id = self.episode_id
-            episode_db_id = self.episode_db_id
-            episode_start = self.episode_start_time
+        Con segmentos activados, un evento largo se graba entero partido en
+        segmentos enlazados: la duración máxima del episodio (calmado
+        forzado seguido del período de gracia, que pierde frames) solo se
+        aplica sin segmentos.
+        
+        Args:
+            det_config: Sección ``detection`` de la configuración.
+            storage_config: Sección ``storage`` de la configuración.
             
-            end_time = time.time()
-            duration = end_time - episode_start if episode_start else 0
+        Returns:
+            Máquina de estados configurada.
+        """
+        segmented = (
+            storage_config.get('segment_seconds', 0.0) > 0
+            or storage_config.get('segment_max_mb', 0.0) > 0
+        )
+        max_duration_factor = det_config.get('max_duration_factor', 3.0)
+        if segmented and max_duration_factor > 0:
+            logger.info("Segmentos activados: los episodios largos no se cierran por duración")
+            max_duration_factor = 0.0
+        return EpisodeStateMachine(
+            calm_timeout=det_config.get('calm_timeout', 2.0),
+            max_duration_factor=max_duration_factor,
+            grace_period=det_config.get('grace_period', 8.0),
+            start_frames=det_config.get('episode_start_frames', 10),
+            calm_frames=det_config.get('episode_calm_frames', 5)
+        )
+    
+    def _build_pipeline(self, pipeline_config: Dict[str, Any]) -> Pipeline:
+        """Construye las etapas del pipeline a partir de la configuración.
+        
+        Args:
+            pipeline_config: Sección ``pipeline`` de la configuración.
+            
+        Returns:
+            Pipeline sin arrancar.
+        """
+        self.detect_every = max(1, int(pipeline_config.get('detect_every', 2)))
+        stages_config = pipeline_config.get('stages', {})
+        
+        def stage(name: str, handler, queue_size: int, drop_policy: str, **kwargs) -> PipelineStage:
+            stage_config = stages_config.get(name, {})
+            return PipelineStage(
+                name,
+                handler,
+                maxsize=stage_config.get('queue_size', queue_size),
+                policy=stage_config.get('drop_policy', drop_policy),
+                **kwargs
+            )
+        
+        # Un frame descartado por una cola libera su slot del buffer
+        return Pipeline([
+            stage('detect', self._detect_stage, 4, 'drop_oldest', on_drop=FrameItem.release),
+            stage('episode', self._episode_stage, 32, 'drop_oldest', on_stop=self._close_episode,
+                  on_drop=FrameItem.release),
+            # Los trabajos de persistencia (inicio/cierre de episodio) no
+            # pueden perderse: por defecto se espera en lugar de descartar
+            stage('persistence', self._persistence_stage, 64, 'block'),
+        ])
+    
+    def _build_retention(self, storage_config: Dict[str, Any]) -> Optional[RetentionManager]:
+        """Crea el gestor de retención a partir de la configuración.
+        
+        Args:
+            storage_config: Sección ``storage`` de la configuración.
             
-            # Guardar episodio
-            episode_path = self.recorder.save_episode()
+        Returns:
+            Gestor sin arrancar, o None si está desactivado o el formato
+            no guarda un directorio por episodio.
+        """
+        retention_config = storage_config.get('retention', {})
+        if not retention_config.get('enabled', True):
+            return None
+        if storage_config.get('format', 'images') == 'lerobot_v3':
+            # Los episodios comparten archivos Parquet/MP4 del dataset
+            logger.warning("Retención desactivada: el formato lerobot_v3 no permite borrar episodios sueltos")
+            return None
+        
+        def on_report(report: Dict[str, Any]) -> None:
+            self.notifier.log_event(
+                "retention",
+                f"{report['deleted']} episodios borrados, "
+                f"{report['bytes_freed'] / 1024 / 1024:.1f} MB liberados"
+            )
+        
+        return RetentionManager(
+            episode_path=storage_config.get('episode_path', './data/episodes'),
+            db_manager=self.db_manager,
+            max_age_days=retention_config.get('max_age_days', 0.0),
+            max_episodes=retention_config.get('max_episodes', 0),
+            max_total_gb=retention_config.get('max_total_gb', 0.0),
+            high_watermark=retention_config.get('high_watermark', 0.90),
+            low_watermark=retention_config.get('low_watermark', 0.80),
+            eviction_order=retention_config.get('eviction_order', 'oldest'),
+            interval_seconds=retention_config.get('interval_seconds', 300.0),
+            batch_size=retention_config.get('batch_size', 200),
+            protected=lambda: (self.recorder.episode_id,) if self.recorder else (),
+            on_report=on_report
+        )
+    
+    def _pin_frame(self, seq: Optional[int]) -> Optional[FrameRef]:
+        """Obtiene una referencia a un frame publicado, contando los fallos.
+        
+        Args:
+            seq: Secuencia del frame (None si no llegó a publicarse).
             
-            # Actualizar en BD
-            if self.episode_db_id and self.db_manager:
-                self.db_manager.update_episode(
-                    episode_id=self.episode_id,
-                    end_time=datetime.fromtimestamp(end_time),
-                    duration=duration
-                )
-                
-                episode_info = self.recorder.get_current_episode_info()
-                frame_count = episode_info["frame_count"] if episode_info else 0
+        Returns:
+            Referencia o None si el slot ya se reutilizó.
+        """
+        if seq is None:
+            return None
+        ref = self.frame_buffer.acquire(seq)
+        if ref is None:
+            self.frame_misses += 1
+            logger.debug(f"Frame {seq} ya no está en el buffer circular")
+        return ref
+    
+    def _detect_stage(self, item: FrameItem) -> None:
+        """Etapa de detección: analiza uno de cada ``detect_every`` frames.
+        
+        Args:
+            item: Frame capturado.
+        """
+        if item.index % self.detect_every == 0:
+            ref = None
+            try:
+                detect_frame = item.detect_frame
+                if detect_frame is None:
+                    # Fuente sin stream lores: usar el frame publicado,
+                    # reduciéndolo por software solo si es necesario
+                    source = item.ref
+                    if source is None:
+                        source = ref = self._pin_frame(item.seq)
+                    if source is not None:
+                        detect_frame = (
+                            cv2.resize(source.frame, (640, 360)) if source.frame.shape[0] > 720 else source.frame
+                        )
                 
-                self.notifier.episode_saved(
-                    self.episode_id,
-                    duration,
-                    frame_count,
-                    self.episode_db_id
-                )
+                if detect_frame is not None:
+                    # Detectar movimiento sin copiar ni anotar el frame: el
+                    # resultado se publica como metadato y se dibuja al servirlo
+                    item.detection = self.detector.detect(detect_frame)
+                    item.processed = True
+                    self.last_detection = item.detection
+            except Exception as e:
+                logger.error(f"Error en detección: {e}", exc_info=True)
+                # En caso de error, frame procesado sin movimiento
+                item.detection = NO_DETECTION
+                item.processed = True
+            finally:
+                if ref is not None:
+                    ref.release()
+        else:
+            # Frame sin procesar: conserva la última detección como metadato
+            item.detection = self.last_detection
+        
+        item.detect_frame = None
+        if item.index % self.episode_state.sample_every != 0:
+            # La etapa de episodios no lee este frame
+            item.release()
+        self.pipeline["episode"].submit(item)
+    
+    def _episode_stage(self, item: FrameItem) -> None:
+        """Etapa de episodios: aplica las decisiones de la máquina de estados.
+        
+        Los trabajos lentos (disco, base de datos, notificaciones) se envían
+        a la etapa de persistencia.
+        
+        Args:
+            item: Frame con su resultado de detección; su frame retenido se
+                libera al terminar.
+        """
+        try:
+            self._apply_episode_decision(item)
+        finally:
+            item.release()
+    
+    def _apply_episode_decision(self, item: FrameItem) -> None:
+        """Aplica al frame la decisión de la máquina de estados."""
+        decision = self.episode_state.update(
+            item.detection.motion_detected,
+            processed=item.processed,
+            frame_index=item.index,
+            now=item.timestamp
+        )
+        system_status["motion_detected"] = decision.motion_state
+        
+        if decision.stop:
+            if self.post_roll_seconds > 0:
+                self._post_roll_deadline = decision.timestamp + self.post_roll_seconds
+                self._post_roll_start = decision.episode_start_time
+            else:
+                self._submit_close(decision.episode_start_time, decision.timestamp)
+        
+        # El post-roll termina al agotar su tiempo o si empieza otro episodio
+        in_post_roll = self._post_roll_deadline is not None
+        if in_post_roll and (decision.start or item.timestamp >= self._post_roll_deadline):
+            self._end_post_roll(min(item.timestamp, self._post_roll_deadline))
+            in_post_roll = False
+        
+        if decision.start:
+            self._submit_open(decision.timestamp)
+        
+        # Añadir frame al episodio (uno de cada N para reducir memoria) o,
+        # sin episodio, al pre-roll
+        sampled = item.index % self.episode_state.sample_every == 0
+        metadata = {
+            "motion": decision.motion,
+            "motion_energy": item.detection.motion_energy
+        }
+        if decision.add_frame or (in_post_roll and sampled):
+            if in_post_roll:
+                metadata["post_roll"] = True
+            self._submit_frame("add_frame", item, metadata)
+        elif sampled and not self.episode_active and self.recorder is not None and self.recorder.pre_roll is not None:
+            self._submit_frame("pre_roll", item, metadata)
+    
+    def _submit_frame(self, kind: str, item: FrameItem, metadata: Dict[str, Any]) -> None:
+        """Envía un frame reducido a la etapa de persistencia.
+        
+        Args:
+            kind: ``add_frame`` (episodio) o ``pre_roll``.
+            item: Frame con su resultado de detección.
+            metadata: Metadatos del frame; se añade la bounding box.
+        """
+        ref = item.ref if item.ref is not None else self._pin_frame(item.seq)
+        if ref is None:
+            return
+        with ref:
+            # Reducir resolución (o copiar) antes de salir del slot:
+            # el frame viaja a la etapa de persistencia
+            small_frame = (
+                cv2.resize(ref.frame, (640, 360))
+                if ref.frame.shape[0] > 720 else ref.frame.copy()
+            )
+        bbox = item.detection.union_box(small_frame.shape[1], small_frame.shape[0])
+        metadata["bbox"] = list(bbox) if bbox is not None else None
+        self.pipeline["persistence"].submit((kind, {
+            "frame": small_frame,
+            "metadata": metadata,
+            "timestamp": item.timestamp
+        }))
+    
+    def _end_post_roll(self, end_time: float) -> None:
+        """Cierra el episodio cuyo post-roll ha terminado.
+        
+        Args:
+            end_time: Instante de cierre.
+        """
+        self._submit_close(self._post_roll_start, end_time)
+        self._post_roll_deadline = None
+        self._post_roll_start = None
+    
+    @property
+    def episode_active(self) -> bool:
+        """Indica si hay un episodio en curso."""
+        return self.episode_state.episode_active
+    
+    def _submit_open(self, start_time: float) -> None:
+        """Envía el inicio de un episodio a la etapa de persistencia.
+        
+        Args:
+            start_time: Instante de inicio.
+        """
+        self.episode_id = f"ep_{datetime.fromtimestamp(start_time).strftime('%Y%m%d_%H%M%S')}"
+        system_status["motion_count"] += 1
+        self.pipeline["persistence"].submit(("start_episode", {
+            "episode_id": self.episode_id,
+            "start_time": start_time
+        }))
+    
+    def _submit_close(self, start_time: Optional[float], end_time: float) -> None:
+        """Envía el cierre del episodio actual a la etapa de persistencia.
+        
+        Args:
+            start_time: Instante de inicio del episodio.
+            end_time: Instante de cierre.
+        """
+        self.pipeline["persistence"].submit(("close_episode", {
+            "episode_id": self.episode_id,
+            "start_time": start_time,
+            "end_time": end_time
+        }))
+        self.episode_id = None
+        logger.info(f"Episodio cerrado, estado actualizado a calmado")
+    
+    def _close_episode(self) -> None:
+        """Cierra el episodio activo al detener la etapa de episodios."""
+        decision = self.episode_state.close()
+        system_status["motion_detected"] = False
+        if self._post_roll_deadline is not None:
+            self._end_post_roll(decision.timestamp)
+        elif decision.stop:
+            self._submit_close(decision.episode_start_time, decision.timestamp)
+    
+    def _persistence_stage(self, job: Tuple[str, Dict[str, Any]]) -> None:
+        """Etapa de persistencia: grabación en disco, base de datos y notificaciones.
+        
+        Args:
+            job: Tupla (tipo, datos) con tipo ``start_episode``, ``add_frame``,
+                ``pre_roll`` o ``close_episode``.
+        """
+        kind, data = job
+        
+        if kind == "add_frame":
+            # Partir antes de añadir: el último segmento nunca queda vacío.
+            # La duración del segmento se mide con el instante de captura
+            now = data.get("timestamp")
+            if self.recorder.segment_due(now=now):
+                self._roll_segment(now)
+            self.recorder.add_frame(data["frame"], data["metadata"], now)
+        
+        elif kind == "pre_roll":
+            self.recorder.buffer_pre_roll(data["frame"], data["metadata"], data["timestamp"])
+        
+        elif kind == "start_episode":
+            episode_id = data["episode_id"]
+            self.recorder.start_episode(episode_id, start_time=data["start_time"])
+            self._segment_start_time = data["start_time"]
             
-            self.episode_active = False
-            self.episode_id = None
+            # Registrar en BD
+            self.episode_db_id = self.db_manager.add_episode(
+                episode_id=episode_id,
+                file_path=f"{self.recorder.episode_path}/{episode_id}",
+                start_time=datetime.fromtimestamp(data["start_time"]),
+                motion_detected=True
+            )
+            self.notifier.episode_started(episode_id, self.episode_db_id)
+        
+        elif kind == "close_episode":
+            # El escritor guarda el episodio en segundo plano; la BD y la
+            # notificación se actualizan al terminar la escritura
+            # Si el episodio se partió en segmentos, se cierra el último
+            on_written = functools.partial(
+                self._on_episode_written,
+                self.recorder.episode_id if self.recorder.is_recording else data["episode_id"],
+                self.episode_db_id,
+                self._segment_start_time or data["start_time"],
+                data["end_time"]
+            )
+            if self.recorder.finish_episode(on_complete=on_written) is None:
+                # Episodio sin frames: no hay nada que escribir
+                on_written(None)
             self.episode_db_id = None
-            self.episode_start_time = None
-            
-            # Asegurar que el estado se actualice a False INMEDIATAMENTE
-            system_status["motion_detected"] = False
-            
-            logger.info(f"Episodio cerrado, estado actualizado a calmado")
-        except Exception as e:
-            logger.error(f"Error cerrando episodio: {e}", exc_info=True)
-            # Asegurar estado incluso si hay error
-            system_status["motion_detected"] = False
+            self._segment_start_time = None
+        
+        else:
+            logger.warning(f"Trabajo de persistencia desconocido: {kind}")
+    
+    def _roll_segment(self, now: Optional[float] = None) -> None:
+        """Continúa el episodio en curso en un nuevo segmento (etapa de persistencia).
+        
+        El segmento cerrado se escribe en segundo plano y se registra en la
+        BD al terminar, igual que un episodio; el nuevo segmento se registra
+        enlazado a su episodio padre.
+        
+        Args:
+            now: Instante de captura del primer frame del nuevo segmento
+                (por defecto, ahora).
+        """
+        now = time.time() if now is None else now
+        on_written = functools.partial(
+            self._on_episode_written,
+            self.recorder.episode_id,
+            self.episode_db_id,
+            self._segment_start_time,
+            now
+        )
+        segment_id = self.recorder.roll_segment(on_complete=on_written, now=now)
+        if segment_id is None:
+            return
+        self._segment_start_time = now
+        self.episode_db_id = self.db_manager.add_episode(
+            episode_id=segment_id,
+            file_path=f"{self.recorder.episode_path}/{segment_id}",
+            start_time=datetime.fromtimestamp(now),
+            motion_detected=True,
+            parent_episode_id=self.recorder.parent_episode_id,
+            segment_index=self.recorder.segment_index
+        )
+    
+    def _on_episode_written(
+        self,
+        episode_id: str,
+        episode_db_id: Optional[int],
+        start_time: Optional[float],
+        end_time: float,
+        result: Optional[EpisodeWriteResult]
+    ) -> None:
+        """Callback del escritor: actualiza la BD y notifica el episodio guardado.
+        
+        Args:
+            episode_id: ID del episodio.
+            episode_db_id: ID del episodio en la BD.
+            start_time: Instante de inicio.
+            end_time: Instante de cierre.
+            result: Resultado de la escritura (None si no tenía frames).
+        """
+        if result is not None and not result.ok:
+            self.notifier.error("episode_writer", f"No se pudo guardar {episode_id}: {result.error}")
+            return
+        
+        written_start: Optional[float] = None
+        if result is not None and result.start_time is not None:
+            # Los instantes escritos en disco (del primer frame del pre-roll
+            # al último del post-roll) mandan sobre los del detector
+            written_start = start_time = result.start_time
+            end_time = result.end_time
+        duration = end_time - start_time if start_time else 0
+        frame_count = result.frame_count if result is not None else 0
+        
+        # Actualizar en BD
+        if episode_db_id and self.db_manager:
+            self.db_manager.update_episode(
+                episode_id=episode_id,
+                end_time=datetime.fromtimestamp(end_time),
+                duration=duration,
+                file_path=result.path if result is not None else None,
+                thumbnail_dir=result.thumbnail_dir if result is not None else None,
+                start_time=datetime.fromtimestamp(written_start) if written_start is not None else None
+            )
+            self.notifier.episode_saved(episode_id, duration, frame_count, episode_db_id)
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado de cada etapa del pipeline.
+        
+        Returns:
+            Diccionario con captura, etapas (profundidad de cola, descartes,
+            tiempos), escritor de episodios, retención, conexiones de la BD y
+            codificación del stream.
+        """
+        return {
+            "capture": {
+                "frames": self.frames_captured,
+                "fps": system_status.get("fps", 0.0),
+                "frame_buffer": self.frame_buffer.get_stats(),
+                "frame_misses": self.frame_misses
+            },
+            "stages": self.pipeline.get_stats() if self.pipeline else {},
+            "writer": self.episode_writer.get_stats() if self.episode_writer else {},
+            "retention": self.retention.get_stats() if self.retention else {},
+            "database": {
+                "pool": self.db_manager.get_pool_stats(),
+                "queries": self.async_db.get_stats_summary(),
+                "events": self.notifier.get_stats() if self.notifier else {}
+            } if self.db_manager and self.async_db else {},
+            "encode": self.stream_variants.get_stats()
+        }
     
     def start(self) -> None:
         """Inicia el servidor."""
@@ -488,12 +851,11 @@ class CameraServer:
     def stop(self) -> None:
         """Detiene el servidor."""
         self.is_running = False
+        self.stream_variants.close()
         
+        # El thread de captura vacía el pipeline y cierra el episodio activo
         if self.camera_thread:
-            self.camera_thread.join(timeout=5)
-        
-        if self.episode_active:
-            self._close_episode()
+            self.camera_thread.join(timeout=45)
         
         if self.camera:
             self.camera.stop()
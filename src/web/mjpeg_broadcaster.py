@@ -0,0 +1,434 @@
+"""Difusor MJPEG que codifica cada frame una sola vez para todos los clientes.
+
+Una única tarea asíncrona espera nuevas secuencias en el buffer de frames
+(sin ocupar un thread mientras espera), las codifica a JPEG (en un thread, fuera del event loop) y reparte los
+bytes a todos los suscriptores. Cada suscriptor tiene un slot "solo el
+último frame": un cliente lento descarta frames en lugar de encolarlos,
+y el coste de CPU no crece con el número de clientes.
+
+Cada combinación (ancho, calidad, anotación) es una variante del stream
+con su propio difusor; ``StreamVariantRegistry`` las crea bajo demanda,
+las comparte entre los clientes que piden la misma variante y las libera
+cuando se desconecta su último suscriptor. Los FPS se limitan por
+cliente sobre la salida compartida de la variante.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Optional, Set, Dict, Any, Tuple
+import cv2
+
+from src.camera.frame_buffer import FrameRingBuffer
+from src.detection.detection_result import NO_DETECTION, draw_detections
+
+
+logger = logging.getLogger(__name__)
+
+# Cabecera de cada parte del stream multipart/x-mixed-replace
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+
+# Los anchos solicitados se redondean a este múltiplo para que peticiones
+# casi iguales compartan variante en lugar de crear una nueva cada una
+WIDTH_STEP = 16
+
+VariantKey = Tuple[Optional[int], int, bool]
+
+
+class _Subscriber:
+    """Slot "solo el último frame" de un cliente del stream."""
+
+    __slots__ = ('chunk', 'seq', 'event', 'interval', 'next_due')
+
+    def __init__(self, max_fps: Optional[float] = None) -> None:
+        """Inicializa el slot vacío.
+
+        Args:
+            max_fps: FPS máximos para este cliente (None = sin límite propio).
+        """
+        self.chunk: Optional[bytes] = None
+        self.seq: int = 0
+        self.event = asyncio.Event()
+        self.interval: float = 1.0 / max_fps if max_fps else 0.0
+        self.next_due: float = 0.0
+
+    def is_due(self, now: float) -> bool:
+        """Indica si al cliente le corresponde un nuevo frame."""
+        return now >= self.next_due
+
+    def mark_delivered(self, now: float) -> None:
+        """Programa el siguiente frame según el límite de FPS del cliente."""
+        # Avanzar la fecha límite en lugar de partir de ``now`` para que la
+        # latencia de entrega no reduzca los FPS efectivos
+        self.next_due += self.interval
+        if self.next_due < now - self.interval:
+            self.next_due = now + self.interval
+
+
+class MJPEGBroadcaster:
+    """Codificador MJPEG compartido por todos los clientes de un stream.
+
+    La tarea de codificación solo existe mientras haya suscriptores, de
+    modo que sin clientes conectados no se codifica nada.
+
+    Attributes:
+        quality: Calidad JPEG (0-100).
+        max_fps: Frames por segundo máximos codificados.
+        annotate: Si True, dibuja las áreas de movimiento antes de codificar.
+        width: Ancho de salida en píxeles (None = resolución nativa).
+        frames_encoded: Número de frames codificados desde el inicio.
+        latest_jpeg: Último JPEG codificado (bytes) o None.
+        latest_seq: Secuencia del último JPEG codificado.
+    """
+
+    def __init__(
+        self,
+        frame_buffer: FrameRingBuffer,
+        quality: int = 70,
+        max_fps: float = 10.0,
+        annotate: bool = True,
+        width: Optional[int] = None
+    ) -> None:
+        """Inicializa el difusor.
+
+        Args:
+            frame_buffer: Buffer circular del que leer los frames.
+            quality: Calidad JPEG (0-100).
+            max_fps: Frames por segundo máximos codificados.
+            annotate: Si True, dibuja las áreas de movimiento.
+            width: Ancho de salida (None = nativo). El alto mantiene la
+                relación de aspecto.
+        """
+        self.frame_buffer = frame_buffer
+        self.quality: int = quality
+        self.max_fps: float = max_fps
+        self.annotate: bool = annotate
+        self.width: Optional[int] = width
+        self.frames_encoded: int = 0
+        self.latest_jpeg: Optional[bytes] = None
+        self.latest_seq: int = 0
+        self._subscribers: Set[_Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._closed: bool = False
+
+    @property
+    def subscriber_count(self) -> int:
+        """Número de clientes suscritos."""
+        return len(self._subscribers)
+
+    def encode(self, seq: Optional[int] = None) -> Optional[bytes]:
+        """Codifica un frame del buffer a JPEG (bloqueante).
+
+        Args:
+            seq: Secuencia a codificar (None = la más reciente).
+
+        Returns:
+            Bytes JPEG o None si la secuencia ya no está disponible.
+        """
+        ref = self.frame_buffer.acquire(seq)
+        if ref is None:
+            return None
+        with ref:
+            height, width = ref.frame.shape[:2]
+            if self.width is not None and self.width < width:
+                # Reducir antes de convertir: la conversión de color y el
+                # dibujo se hacen ya sobre el frame pequeño
+                out_height = max(1, round(height * self.width / width))
+                frame_bgr = cv2.resize(ref.frame, (self.width, out_height),
+                                       interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(frame_bgr, cv2.COLOR_RGB2BGR, dst=frame_bgr)
+            else:
+                frame_bgr = cv2.cvtColor(ref.frame, cv2.COLOR_RGB2BGR)
+            detection = ref.meta.get("detection", NO_DETECTION)
+
+        if self.annotate:
+            draw_detections(frame_bgr, detection)
+
+        ret, buffer = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ret:
+            logger.warning(f"No se pudo codificar el frame {seq}")
+            return None
+        return buffer.tobytes()
+
+    async def subscribe(self, max_fps: Optional[float] = None) -> AsyncIterator[bytes]:
+        """Genera las partes multipart del stream para un cliente.
+
+        Args:
+            max_fps: FPS máximos para este cliente. Por encima de los FPS del
+                difusor no tiene efecto.
+
+        Yields:
+            Parte MJPEG (cabecera + JPEG) lista para enviar.
+        """
+        subscriber = _Subscriber(max_fps)
+        self._subscribers.add(subscriber)
+        self._ensure_task()
+        logger.info(f"Cliente de stream conectado ({self.subscriber_count} activos)")
+
+        try:
+            while not self._closed:
+                try:
+                    await asyncio.wait_for(subscriber.event.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                subscriber.event.clear()
+                if subscriber.chunk is not None:
+                    yield subscriber.chunk
+        finally:
+            self._subscribers.discard(subscriber)
+            logger.info(f"Cliente de stream desconectado ({self.subscriber_count} activos)")
+
+    def _ensure_task(self) -> None:
+        """Arranca la tarea de codificación si no está corriendo."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        """Codifica cada nueva secuencia una vez y la reparte a los suscriptores."""
+        min_interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        last_seq = 0
+
+        while self._subscribers and not self._closed:
+            # Espera en el event loop: con varias variantes activas, esperar
+            # en threads agotaría el executor compartido con la codificación
+            seq = await self.frame_buffer.wait_for_newer_async(last_seq, 0.5)
+            if seq <= last_seq:
+                continue
+
+            started = time.monotonic()
+            last_seq = seq
+            # Si ningún cliente espera frame (todos limitados a menos FPS),
+            # no se codifica
+            due = [sub for sub in self._subscribers if sub.is_due(started)]
+            if not due:
+                continue
+
+            jpeg = await asyncio.to_thread(self.encode, seq)
+            if jpeg is not None:
+                self.frames_encoded += 1
+                self.latest_jpeg = jpeg
+                self.latest_seq = seq
+                chunk = MJPEG_PART_HEADER + jpeg + b'\r\n'
+                for subscriber in due:
+                    # Sobrescribir: un cliente lento solo ve el último frame
+                    subscriber.chunk = chunk
+                    subscriber.seq = seq
+                    subscriber.mark_delivered(started)
+                    subscriber.event.set()
+
+            remaining = min_interval - (time.monotonic() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+        logger.debug("Tarea de codificación MJPEG detenida (sin suscriptores)")
+
+    def close(self) -> None:
+        """Finaliza los streams de todos los suscriptores."""
+        self._closed = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas del difusor.
+
+        Returns:
+            Diccionario con suscriptores, frames codificados y última secuencia.
+        """
+        return {
+            "subscribers": self.subscriber_count,
+            "frames_encoded": self.frames_encoded,
+            "latest_seq": self.latest_seq,
+            "quality": self.quality,
+            "annotate": self.annotate,
+            "width": self.width
+        }
+
+
+class StreamVariantRegistry:
+    """Variantes del stream MJPEG creadas bajo demanda y compartidas.
+
+    Cada variante (ancho, calidad, anotación) tiene un único difusor, de
+    modo que cada frame se codifica una vez por variante en uso. Una
+    variante se elimina cuando se desconecta su último suscriptor.
+
+    Attributes:
+        default_quality: Calidad usada si el cliente no la indica.
+        max_fps: FPS máximos de cualquier variante.
+        max_variants: Número máximo de variantes simultáneas.
+    """
+
+    def __init__(
+        self,
+        frame_buffer: FrameRingBuffer,
+        default_quality: int = 70,
+        max_fps: float = 10.0,
+        max_variants: int = 8,
+        min_width: int = 160
+    ) -> None:
+        """Inicializa el registro.
+
+        Args:
+            frame_buffer: Buffer circular compartido por todas las variantes.
+            default_quality: Calidad JPEG por defecto.
+            max_fps: FPS máximos codificados por variante.
+            max_variants: Variantes simultáneas permitidas; al superarlo, las
+                nuevas peticiones reciben la variante por defecto.
+            min_width: Ancho mínimo aceptado.
+        """
+        self.frame_buffer = frame_buffer
+        self.default_quality: int = default_quality
+        self.max_fps: float = max_fps
+        self.max_variants: int = max_variants
+        self.min_width: int = min_width
+        self._variants: Dict[VariantKey, MJPEGBroadcaster] = {}
+        self._closed: bool = False
+
+    def __len__(self) -> int:
+        """Número de variantes activas."""
+        return len(self._variants)
+
+    def normalize(
+        self,
+        width: Optional[int] = None,
+        quality: Optional[int] = None,
+        annotate: bool = True
+    ) -> VariantKey:
+        """Convierte los parámetros de un cliente en la clave de su variante.
+
+        El ancho se limita al rango válido y se redondea a ``WIDTH_STEP``;
+        un ancho igual o superior al nativo equivale a ``None``.
+
+        Args:
+            width: Ancho solicitado.
+            quality: Calidad solicitada.
+            annotate: Si se solicita la variante anotada.
+
+        Returns:
+            Clave (width, quality, annotate).
+        """
+        if width is not None:
+            width = max(self.min_width, (int(width) // WIDTH_STEP) * WIDTH_STEP)
+            native = self.frame_buffer.shape
+            if native is not None and width >= native[1]:
+                width = None
+        quality = self.default_quality if quality is None else max(10, min(95, int(quality)))
+        return (width, quality, bool(annotate))
+
+    def find(self, key: VariantKey) -> Optional[MJPEGBroadcaster]:
+        """Obtiene el difusor de una variante activa sin crearla.
+
+        Args:
+            key: Clave normalizada (ver ``normalize``).
+
+        Returns:
+            Difusor de la variante o None si no hay clientes en ella.
+        """
+        return self._variants.get(key)
+
+    def get(
+        self,
+        width: Optional[int] = None,
+        quality: Optional[int] = None,
+        annotate: bool = True
+    ) -> MJPEGBroadcaster:
+        """Obtiene (o crea) el difusor de una variante.
+
+        Tras ``close`` no se crean variantes: se devuelve un difusor ya
+        cerrado, sin registrar, cuyo stream termina de inmediato.
+
+        Args:
+            width: Ancho solicitado.
+            quality: Calidad solicitada.
+            annotate: Si se solicita la variante anotada.
+
+        Returns:
+            Difusor de la variante.
+        """
+        key = self.normalize(width, quality, annotate)
+        broadcaster = self._variants.get(key)
+        if broadcaster is not None:
+            return broadcaster
+
+        if self._closed:
+            width, quality, annotate = key
+            broadcaster = MJPEGBroadcaster(self.frame_buffer, quality=quality, max_fps=self.max_fps,
+                                           annotate=annotate, width=width)
+            broadcaster.close()
+            logger.debug(f"Registro de variantes cerrado, variante {key} no creada")
+            return broadcaster
+
+        if len(self._variants) >= self.max_variants:
+            fallback = (None, self.default_quality, bool(annotate))
+            logger.warning(f"Límite de {self.max_variants} variantes alcanzado, usando {fallback}")
+            key = fallback
+            broadcaster = self._variants.get(key)
+            if broadcaster is not None:
+                return broadcaster
+
+        width, quality, annotate = key
+        broadcaster = MJPEGBroadcaster(
+            self.frame_buffer,
+            quality=quality,
+            max_fps=self.max_fps,
+            annotate=annotate,
+            width=width
+        )
+        self._variants[key] = broadcaster
+        logger.info(f"Variante de stream creada: width={width} quality={quality} annotate={annotate}")
+        return broadcaster
+
+    async def stream(
+        self,
+        width: Optional[int] = None,
+        quality: Optional[int] = None,
+        fps: Optional[float] = None,
+        annotate: bool = True
+    ) -> AsyncIterator[bytes]:
+        """Suscribe un cliente a su variante y la libera al desconectarse.
+
+        Args:
+            width: Ancho solicitado.
+            quality: Calidad solicitada.
+            fps: FPS máximos del cliente (limitados a ``max_fps``).
+            annotate: Si se solicita la variante anotada.
+
+        Yields:
+            Partes MJPEG de la variante.
+        """
+        broadcaster = self.get(width, quality, annotate)
+        if fps is not None and fps <= 0:
+            fps = None
+        try:
+            # Cerrar la suscripción explícitamente para que el cliente deje
+            # de contar antes de decidir si la variante se libera
+            async with aclosing(broadcaster.subscribe(max_fps=fps)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        finally:
+            self._release(broadcaster)
+
+    def _release(self, broadcaster: MJPEGBroadcaster) -> None:
+        """Elimina la variante si ya no tiene suscriptores."""
+        if broadcaster.subscriber_count > 0:
+            return
+        for key, candidate in list(self._variants.items()):
+            if candidate is broadcaster:
+                del self._variants[key]
+                logger.info(f"Variante de stream liberada: {key}")
+
+    def close(self) -> None:
+        """Finaliza los streams de todas las variantes y no admite nuevas."""
+        self._closed = True
+        for broadcaster in self._variants.values():
+            broadcaster.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de las variantes activas.
+
+        Returns:
+            Diccionario con el número de variantes y las estadísticas de cada una.
+        """
+        return {
+            "variants": len(self._variants),
+            "streams": [broadcaster.get_stats() for broadcaster in self._variants.values()]
+        }
@@ -2,17 +2,26 @@
 
 import logging
 from datetime import datetime
+from pathlib import Path
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
-from src.database.db_manager import DatabaseManager
+from src.database.async_db import AsyncDatabase
+from src.data.thumbnails import THUMBNAIL_KINDS
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["api"])
 
+# Las consultas se ejecutan fuera del event loop (``router.db`` es un
+# ``AsyncDatabase``): una consulta lenta no detiene el streaming MJPEG
+
+# Las miniaturas no cambian una vez escritas: se cachean sin revalidar
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
 # Modelos Pydantic para respuestas
 class EpisodeResponse(BaseModel):
@@ -25,6 +34,13 @@ class EpisodeResponse(BaseModel):
     duration_seconds: Optional[float]
     motion_detected: bool
     object_detected: Optional[List[str]]
+    thumbnail_url: Optional[str] = None
+
+
+class EpisodePage(BaseModel):
+    """Página de episodios con el cursor de la siguiente."""
+    items: List[EpisodeResponse]
+    next_cursor: Optional[str] = None
 
 
 class EventResponse(BaseModel):
@@ -37,6 +53,12 @@ class EventResponse(BaseModel):
     severity: str
 
 
+class EventPage(BaseModel):
+    """Página de eventos con el cursor de la siguiente."""
+    items: List[EventResponse]
+    next_cursor: Optional[str] = None
+
+
 class StatusResponse(BaseModel):
     """Respuesta de estado del sistema."""
     camera_active: bool
@@ -64,26 +86,32 @@ system_status = {
 }
 
 
-@router.get("/episodes", response_model=List[EpisodeResponse])
+@router.get("/episodes", response_model=EpisodePage)
 async def get_episodes(
     start_date: Optional[str] = Query(None, description="Fecha inicio (ISO format)"),
     end_date: Optional[str] = Query(None, description="Fecha fin (ISO format)"),
     motion_only: bool = Query(False, description="Solo episodios con movimiento"),
-    limit: int = Query(100, ge=1, le=1000, description="Límite de resultados")
-) -> List[EpisodeResponse]:
-    """Obtiene lista de episodios con filtros.
+    limit: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (next_cursor)")
+) -> EpisodePage:
+    """Obtiene una página de episodios con filtros, del más reciente al más antiguo.
+    
+    Para recorrer el historial completo se repite la petición con el
+    ``next_cursor`` de la respuesta hasta que sea null; cada página cuesta
+    lo mismo con independencia de su profundidad.
     
     Args:
         start_date: Fecha de inicio para filtrar (ISO format).
         end_date: Fecha de fin para filtrar (ISO format).
         motion_only: Si True, solo episodios con movimiento.
-        limit: Número máximo de resultados.
+        limit: Número máximo de resultados por página.
+        cursor: Cursor devuelto por la página anterior.
         
     Returns:
-        Lista de episodios.
+        Página de episodios y cursor de la siguiente.
     """
     try:
-        db_manager = router.db_manager  # type: ignore
+        db: AsyncDatabase = router.db  # type: ignore
         
         start_dt = None
         end_dt = None
@@ -93,43 +121,103 @@ async def get_episodes(
         if end_date:
             end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
         
-        episodes = db_manager.get_episodes(
+        page = await db.get_episodes_page(
             start_date=start_dt,
             end_date=end_dt,
             motion_only=motion_only,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
-        return [EpisodeResponse(**ep) for ep in episodes]
+        return EpisodePage(
+            items=[
+                EpisodeResponse(
+                    **ep,
+                    thumbnail_url=f"/api/episodes/{ep['episode_id']}/thumbnail" if ep.get('thumbnail_dir') else None
+                )
+                for ep in page["items"]
+            ],
+            next_cursor=page["next_cursor"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Consulta de episodios demasiado lenta")
     except Exception as e:
         logger.error(f"Error obteniendo episodios: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/events", response_model=List[EventResponse])
+@router.get("/episodes/{episode_id}/thumbnail")
+async def get_episode_thumbnail(
+    episode_id: str,
+    kind: str = Query("peak", description="Miniatura: first, peak o strip")
+) -> FileResponse:
+    """Obtiene una miniatura del episodio.
+    
+    Las miniaturas se generan al guardar el episodio y no cambian, de modo
+    que se sirven con caché de larga duración.
+    
+    Args:
+        episode_id: ID del episodio.
+        kind: ``first`` (primer frame), ``peak`` (máximo movimiento) o
+            ``strip`` (tira de contactos).
+        
+    Returns:
+        Imagen JPEG de la miniatura.
+    """
+    if kind not in THUMBNAIL_KINDS:
+        raise HTTPException(status_code=400, detail=f"Miniatura desconocida: {kind}")
+    db: Optional[AsyncDatabase] = getattr(router, 'db', None)
+    if db is None:
+        raise HTTPException(status_code=503, detail="Sistema no inicializado")
+    
+    try:
+        episode = await db.get_episode(episode_id)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Consulta del episodio demasiado lenta")
+    if episode is None or not episode.get("thumbnail_dir"):
+        raise HTTPException(status_code=404, detail="Episodio sin miniaturas")
+    path = Path(episode["thumbnail_dir"]) / THUMBNAIL_KINDS[kind]
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Miniatura no encontrada")
+    return FileResponse(path, media_type="image/jpeg", headers={"Cache-Control": THUMBNAIL_CACHE_CONTROL})
+
+
+@router.get("/events", response_model=EventPage)
 async def get_events(
-    limit: int = Query(50, ge=1, le=500, description="Límite de resultados"),
+    limit: int = Query(50, ge=1, le=500, description="Tamaño de página"),
     event_type: Optional[str] = Query(None, description="Filtrar por tipo"),
-    severity: Optional[str] = Query(None, description="Filtrar por severidad")
-) -> List[EventResponse]:
-    """Obtiene eventos recientes.
+    severity: Optional[str] = Query(None, description="Filtrar por severidad"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (next_cursor)")
+) -> EventPage:
+    """Obtiene una página de eventos, del más reciente al más antiguo.
     
     Args:
-        limit: Número máximo de resultados.
+        limit: Número máximo de resultados por página.
         event_type: Filtrar por tipo de evento.
         severity: Filtrar por severidad.
+        cursor: Cursor devuelto por la página anterior.
         
     Returns:
-        Lista de eventos.
+        Página de eventos y cursor de la siguiente.
     """
     try:
-        db_manager = router.db_manager  # type: ignore
-        events = db_manager.get_events(
+        db: AsyncDatabase = router.db  # type: ignore
+        page = await db.get_events_page(
             limit=limit,
             event_type=event_type,
-            severity=severity
+            severity=severity,
+            cursor=cursor
+        )
+        return EventPage(
+            items=[EventResponse(**ev) for ev in page["items"]],
+            next_cursor=page["next_cursor"]
         )
-        return [EventResponse(**ev) for ev in events]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Consulta de eventos demasiado lenta")
     except Exception as e:
         logger.error(f"Error obteniendo eventos: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -143,8 +231,8 @@ async def get_status() -> StatusResponse:
         Estado del sistema.
     """
     try:
-        db_manager = router.db_manager  # type: ignore
-        stats = db_manager.get_stats()
+        db: AsyncDatabase = router.db  # type: ignore
+        stats = await db.get_stats()
         
         # Convertir start_time a datetime si es un timestamp
         start_time = system_status.get("start_time")
@@ -163,11 +251,88 @@ async def get_status() -> StatusResponse:
             total_events=stats.get("total_events", 0),
             uptime_seconds=uptime
         )
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Consulta de estado demasiado lenta")
     except Exception as e:
         logger.error(f"Error obteniendo estado: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/pipeline")
+async def get_pipeline() -> dict:
+    """Obtiene el estado de las etapas del pipeline de cámara.
+    
+    Returns:
+        Profundidad de cola, descartes y tiempos de proceso por etapa.
+    """
+    pipeline_stats = getattr(router, 'pipeline_stats', None)
+    if pipeline_stats is None:
+        raise HTTPException(status_code=503, detail="Sistema no inicializado")
+    return pipeline_stats()
+
+
+@router.get("/snapshot.jpg")
+async def get_snapshot(
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, description="Ancho de salida en píxeles"),
+    q: Optional[int] = Query(None, ge=1, le=100, description="Calidad JPEG"),
+    annotate: bool = Query(False, description="Dibujar áreas de movimiento")
+) -> Response:
+    """Obtiene el frame más reciente como JPEG.
+    
+    El JPEG se sirve desde memoria; el ETag identifica el frame, de modo
+    que una petición con ``If-None-Match`` sobre un frame sin cambios
+    recibe un 304 sin cuerpo.
+    
+    Args:
+        request: Petición HTTP (para la cabecera If-None-Match).
+        w: Ancho de salida (por defecto, resolución nativa).
+        q: Calidad JPEG (por defecto, la del stream).
+        annotate: Si True, dibuja las áreas de movimiento.
+        
+    Returns:
+        Imagen JPEG o respuesta 304.
+    """
+    snapshot_cache = getattr(router, 'snapshot_cache', None)
+    if snapshot_cache is None:
+        raise HTTPException(status_code=503, detail="Sistema no inicializado")
+    
+    headers = {"Cache-Control": "no-cache"}
+    
+    # Comprobar la petición condicional antes de tocar el frame
+    if_none_match = request.headers.get("if-none-match")
+    etag = snapshot_cache.current_etag(w, q, annotate)
+    if if_none_match and etag and _etag_matches(if_none_match, etag):
+        snapshot_cache.not_modified += 1
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    
+    snapshot = await snapshot_cache.get(w, q, annotate)
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Aún no hay frames disponibles")
+    
+    jpeg, etag = snapshot
+    return Response(content=jpeg, media_type="image/jpeg", headers={**headers, "ETag": etag})
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara la cabecera If-None-Match con un ETag (comparación débil).
+    
+    Args:
+        if_none_match: Valor de la cabecera (uno o varios ETags o ``*``).
+        etag: ETag actual.
+        
+    Returns:
+        True si alguno de los ETags coincide.
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
 @router.post("/config")
 async def update_config(config: ConfigUpdate) -> dict:
     """Actualiza configuración del sistema.
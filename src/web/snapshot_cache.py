@@ -0,0 +1,188 @@
+"""Caché en memoria del último frame como JPEG para ``/api/snapshot.jpg``.
+
+Cada combinación (ancho, calidad, anotación) tiene una entrada con el
+último JPEG y la secuencia de frame de la que procede. Si ya hay un
+stream MJPEG activo de esa variante se reutiliza su JPEG sin volver a
+codificar; si no, se codifica una sola vez por secuencia, aunque lleguen
+muchas peticiones a la vez. El ETag se deriva de la secuencia, así que
+una petición condicional sobre un frame sin cambios se resuelve sin
+tocar el frame.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from src.camera.frame_buffer import FrameRingBuffer
+from src.web.mjpeg_broadcaster import MJPEGBroadcaster, StreamVariantRegistry, VariantKey
+
+
+logger = logging.getLogger(__name__)
+
+
+class _SnapshotEntry:
+    """Último JPEG codificado de una variante de snapshot."""
+
+    __slots__ = ('encoder', 'seq', 'jpeg', 'lock')
+
+    def __init__(self, encoder: MJPEGBroadcaster) -> None:
+        """Inicializa la entrada vacía.
+
+        Args:
+            encoder: Difusor (sin suscriptores) usado solo para codificar.
+        """
+        self.encoder = encoder
+        self.seq: int = 0
+        self.jpeg: Optional[bytes] = None
+        self.lock = asyncio.Lock()
+
+
+class SnapshotCache:
+    """Caché del último JPEG por variante para peticiones de snapshot.
+
+    Attributes:
+        max_entries: Número máximo de variantes en caché (LRU).
+        hits: Peticiones servidas desde caché o desde un stream activo.
+        encodes: Codificaciones realizadas por la caché.
+        not_modified: Respuestas 304 servidas.
+    """
+
+    def __init__(
+        self,
+        frame_buffer: FrameRingBuffer,
+        stream_variants: StreamVariantRegistry,
+        max_entries: int = 4
+    ) -> None:
+        """Inicializa la caché.
+
+        Args:
+            frame_buffer: Buffer circular de frames.
+            stream_variants: Registro de variantes del stream, usado para
+                normalizar parámetros y reutilizar JPEG ya codificados.
+            max_entries: Número máximo de variantes en caché.
+        """
+        self.frame_buffer = frame_buffer
+        self.stream_variants = stream_variants
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.encodes: int = 0
+        self.not_modified: int = 0
+        self._entries: "OrderedDict[VariantKey, _SnapshotEntry]" = OrderedDict()
+        # Las secuencias se reinician con el proceso: el prefijo evita que un
+        # ETag de antes de un reinicio coincida con un frame distinto
+        self._boot_token: str = format(int(time.time()), 'x')
+
+    def etag(self, key: VariantKey, seq: int) -> str:
+        """Construye el ETag de una variante y secuencia.
+
+        Args:
+            key: Clave normalizada de la variante.
+            seq: Secuencia del frame.
+
+        Returns:
+            ETag entre comillas.
+        """
+        width, quality, annotate = key
+        return f'"{self._boot_token}-{seq}-{width or 0}-{quality}-{int(annotate)}"'
+
+    def current_etag(
+        self,
+        width: Optional[int] = None,
+        quality: Optional[int] = None,
+        annotate: bool = False
+    ) -> Optional[str]:
+        """ETag del frame más reciente, sin codificar nada.
+
+        Args:
+            width: Ancho solicitado.
+            quality: Calidad solicitada.
+            annotate: Si se solicita la variante anotada.
+
+        Returns:
+            ETag o None si aún no hay frames.
+        """
+        seq = self.frame_buffer.latest_seq
+        if seq == 0:
+            return None
+        return self.etag(self.stream_variants.normalize(width, quality, annotate), seq)
+
+    async def get(
+        self,
+        width: Optional[int] = None,
+        quality: Optional[int] = None,
+        annotate: bool = False
+    ) -> Optional[Tuple[bytes, str]]:
+        """Obtiene el JPEG del frame más reciente de una variante.
+
+        Args:
+            width: Ancho solicitado.
+            quality: Calidad solicitada.
+            annotate: Si se solicita la variante anotada.
+
+        Returns:
+            Tupla (jpeg, etag) o None si aún no hay frames.
+        """
+        key = self.stream_variants.normalize(width, quality, annotate)
+        seq = self.frame_buffer.latest_seq
+        if seq == 0:
+            return None
+
+        # Un stream activo de la misma variante ya codificó este frame
+        broadcaster = self.stream_variants.find(key)
+        if broadcaster is not None and broadcaster.latest_seq == seq and broadcaster.latest_jpeg:
+            self.hits += 1
+            return broadcaster.latest_jpeg, self.etag(key, seq)
+
+        entry = self._entry(key)
+        async with entry.lock:
+            # Otra petición pudo codificar la secuencia mientras esperábamos
+            if entry.jpeg is not None and entry.seq >= seq:
+                self.hits += 1
+                return entry.jpeg, self.etag(key, entry.seq)
+
+            seq = self.frame_buffer.latest_seq
+            jpeg = await asyncio.to_thread(entry.encoder.encode, seq)
+            if jpeg is None:
+                # El slot se reutilizó entre leer la secuencia y codificar
+                if entry.jpeg is None:
+                    return None
+                return entry.jpeg, self.etag(key, entry.seq)
+            self.encodes += 1
+            entry.seq = seq
+            entry.jpeg = jpeg
+            return jpeg, self.etag(key, seq)
+
+    def _entry(self, key: VariantKey) -> _SnapshotEntry:
+        """Obtiene (o crea) la entrada de una variante, con desalojo LRU."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        width, quality, annotate = key
+        entry = _SnapshotEntry(MJPEGBroadcaster(
+            self.frame_buffer,
+            quality=quality,
+            annotate=annotate,
+            width=width
+        ))
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            logger.debug(f"Variante de snapshot desalojada de la caché: {evicted}")
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de la caché.
+
+        Returns:
+            Diccionario con entradas, aciertos, codificaciones y 304 servidos.
+        """
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "encodes": self.encodes,
+            "not_modified": self.not_modified
+        }
@@ -84,7 +84,7 @@ async function updateEpisodes() {
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
-        const episodes = await response.json();
+        const episodes = (await response.json()).items;
         
         const episodesList = document.getElementById('episodes-list');
         
@@ -95,6 +95,7 @@ async function updateEpisodes() {
         
         episodesList.innerHTML = episodes.map(episode => `
             <div class="episode-item">
+                ${episode.thumbnail_url ? `<img class="episode-thumbnail" src="${episode.thumbnail_url}" alt="" loading="lazy" width="160">` : ''}
                 <h4>${episode.episode_id}</h4>
                 <p>Inicio: ${formatDate(episode.start_time)}</p>
                 <p>Duración: ${episode.duration_seconds ? episode.duration_seconds.toFixed(1) + 's' : 'En curso'}</p>
@@ -0,0 +1,96 @@
+"""Tests para la fachada asíncrona de la base de datos."""
+
+import asyncio
+import time
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.database.async_db import AsyncDatabase
+from src.database.db_manager import DatabaseManager
+from src.web.routes import router
+
+# Consulta sin fin: solo termina si SQLite la interrumpe
+ENDLESS_QUERY = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Fixture con una BD temporal y un episodio."""
+    db = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    db.add_episode("ep_1", "x", datetime(2024, 1, 1))
+    yield db
+    db.close()
+
+
+def endless_query(db: DatabaseManager) -> None:
+    """Consulta lenta que usa la conexión del thread actual."""
+    db._get_connection().execute(ENDLESS_QUERY).fetchone()
+
+
+def test_slow_query_times_out_without_blocking_loop(db):
+    """Test de plazo por consulta con el event loop libre."""
+    async def scenario():
+        async_db = AsyncDatabase(db, workers=1, timeout=0.3)
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            await async_db.run(endless_query, db)
+        elapsed = time.perf_counter() - started
+
+        # La consulta se interrumpe en SQLite: el único worker queda libre
+        stats = await async_db.get_stats()
+        task.cancel()
+        async_db.close()
+        return elapsed, max(gaps), stats, async_db.get_stats_summary()
+
+    elapsed, max_gap, stats, summary = asyncio.run(scenario())
+    assert 0.25 < elapsed < 1.0
+    assert max_gap < 0.1
+    assert stats["total_episodes"] == 1
+    assert summary["timeouts"] == 1 and summary["calls"] == 2
+
+
+def test_query_deadline_interrupts_swallowed_errors(db):
+    """Test de que el plazo se señala aunque el método atrape el error."""
+    original = db.get_stats
+
+    def slow_stats():
+        try:
+            endless_query(db)
+        except Exception:
+            return {}  # Como los métodos de DatabaseManager
+        return original()
+
+    with pytest.raises(TimeoutError):
+        with db.query_deadline(0.1):
+            slow_stats()
+    assert db.get_stats()["total_episodes"] == 1
+
+
+def test_routes_return_504_on_timeout(db, monkeypatch):
+    """Test de las rutas de la API sobre la fachada asíncrona."""
+    router.db = AsyncDatabase(db, timeout=0.2)  # type: ignore
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    try:
+        assert client.get("/api/status").json()["total_episodes"] == 1
+        assert [e["episode_id"] for e in client.get("/api/episodes").json()["items"]] == ["ep_1"]
+
+        monkeypatch.setattr(db, "get_events", lambda **kwargs: endless_query(db))
+        assert client.get("/api/events").status_code == 504
+        assert client.get("/api/status").status_code == 200
+    finally:
+        router.db.close()  # type: ignore
+        router.db = None  # type: ignore
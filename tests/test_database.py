@@ -3,6 +3,8 @@
 import pytest
 import tempfile
 import os
+import sqlite3
+import threading
 from datetime import datetime
 from src.database.db_manager import DatabaseManager
 
@@ -16,8 +18,11 @@ def temp_db():
     db = DatabaseManager(db_path=db_path)
     yield db
     
-    # Limpiar
-    os.unlink(db_path)
+    # Limpiar (incluidos los archivos del journal WAL)
+    db.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
 
 
 def test_database_initialization(temp_db):
@@ -80,3 +85,129 @@ def test_get_stats(temp_db):
     stats = temp_db.get_stats()
     assert stats['total_episodes'] == 1
     assert stats['total_events'] == 1
+
+
+def test_connections_are_reused_per_thread(temp_db):
+    """Test de una conexión persistente por thread en modo WAL."""
+    for i in range(5):
+        temp_db.add_event("motion", f"Evento {i}")
+    temp_db.get_events()
+    stats = temp_db.get_pool_stats()
+    assert stats["connections_opened"] == 1 and stats["acquisitions"] >= 6
+    
+    conn = temp_db._get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    
+    # Otro thread usa su propia conexión, que se cierra al terminar
+    worker = threading.Thread(target=temp_db.get_stats)
+    worker.start()
+    worker.join()
+    del worker
+    stats = temp_db.get_pool_stats()
+    assert stats["connections_opened"] == 2 and stats["open_connections"] == 1
+
+
+def test_readers_not_blocked_by_writer(temp_db):
+    """Test de que una escritura en curso no bloquea las lecturas (WAL)."""
+    temp_db.add_episode("ep_1", "x", datetime.now())
+    writer = sqlite3.connect(temp_db.db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO events (event_type, message) VALUES ('motion', 'pendiente')")
+    try:
+        assert len(temp_db.get_episodes()) == 1
+        assert temp_db.get_stats()["total_events"] == 0
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_episode_pages_follow_cursor(temp_db):
+    """Test de paginación por cursor con empates en start_time."""
+    for i in range(7):
+        # Pares de episodios con el mismo instante: el id desempata
+        temp_db.add_episode(f"ep_{i}", f"path_{i}", datetime(2024, 1, 1, 0, i // 2), motion_detected=(i % 2 == 0))
+    
+    seen = []
+    cursor = None
+    while True:
+        page = temp_db.get_episodes_page(limit=3, cursor=cursor)
+        seen.extend(ep["episode_id"] for ep in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"ep_{i}" for i in (6, 5, 4, 3, 2, 1, 0)]
+    
+    first = temp_db.get_episodes_page(limit=2, motion_only=True)
+    rest = temp_db.get_episodes_page(limit=2, motion_only=True, cursor=first["next_cursor"])
+    assert [ep["episode_id"] for ep in first["items"] + rest["items"]] == ["ep_6", "ep_4", "ep_2", "ep_0"]
+    assert rest["next_cursor"] is None
+    
+    with pytest.raises(ValueError):
+        temp_db.get_episodes_page(cursor="no-es-un-cursor")
+
+
+def test_event_pages_use_composite_index(temp_db):
+    """Test de paginación de eventos recorriendo el índice compuesto."""
+    temp_db.add_events([("motion", f"evento {i}", "info", None, "2024-01-01 00:00:00") for i in range(5)])
+    
+    page = temp_db.get_events_page(limit=4, event_type="motion")
+    last = temp_db.get_events_page(limit=4, event_type="motion", cursor=page["next_cursor"])
+    assert [e["message"] for e in page["items"] + last["items"]] == [f"evento {i}" for i in range(4, -1, -1)]
+    assert last["next_cursor"] is None
+    
+    conn = sqlite3.connect(temp_db.db_path)
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM events WHERE event_type = ? AND (timestamp, id) < (?, ?) "
+        "ORDER BY timestamp DESC, id DESC LIMIT 5", ("motion", "2024-01-01 00:00:00", 3)
+    ))
+    conn.close()
+    assert "idx_events_type_time" in plan and "TEMP B-TREE" not in plan
+
+
+def test_stats_counters_follow_writes(temp_db):
+    """Test de contadores mantenidos por triggers en cada escritura."""
+    for i in range(4):
+        temp_db.add_episode(f"ep_{i}", f"path_{i}", datetime(2024, 1, 1, 0, i), motion_detected=(i < 3))
+    temp_db.add_events([("motion", "m", "info", None, None)] * 5)
+    temp_db.add_model("detector", "1.0", "model.pt")
+    temp_db.delete_episodes(["ep_0", "ep_3"])
+    
+    conn = sqlite3.connect(temp_db.db_path)
+    conn.execute("UPDATE episodes SET motion_detected = 0 WHERE episode_id = 'ep_1'")
+    conn.execute("DELETE FROM events WHERE id <= 2")
+    conn.commit()
+    conn.close()
+    
+    assert temp_db.get_stats() == {
+        "total_episodes": 2,
+        "episodes_with_motion": 1,
+        "total_events": 3,
+        "total_models": 1
+    }
+    assert temp_db.reconcile_stats() == {}
+
+
+def test_reconcile_stats_rebuilds_counters(temp_db):
+    """Test de reconstrucción de contadores desviados o ausentes."""
+    temp_db.add_episode("ep_1", "path_1", datetime(2024, 1, 1), motion_detected=True)
+    temp_db.add_event("test_event", "Test message")
+    
+    conn = sqlite3.connect(temp_db.db_path)
+    conn.execute("UPDATE stats SET value = 40 WHERE name = 'total_events'")
+    conn.execute("DELETE FROM stats WHERE name = 'total_episodes'")
+    conn.commit()
+    conn.close()
+    
+    assert temp_db.reconcile_stats() == {"total_events": -39, "total_episodes": 1}
+    assert temp_db.get_stats()["total_events"] == 1
+    assert temp_db.get_stats()["total_episodes"] == 1
+    
+    # Una base de datos sin tabla stats se cuenta al abrirse
+    conn = sqlite3.connect(temp_db.db_path)
+    conn.execute("DROP TABLE stats")
+    conn.commit()
+    conn.close()
+    reopened = DatabaseManager(db_path=str(temp_db.db_path))
+    assert reopened.get_stats()["episodes_with_motion"] == 1
+    reopened.close()
@@ -3,6 +3,7 @@
 import pytest
 import numpy as np
 from src.detection.motion_detector import MotionDetector
+from src.detection.detection_result import DetectionResult, draw_detections
 
 
 def test_motion_detector_initialization():
@@ -29,8 +30,9 @@ def test_detect_no_motion():
     detector.set_background(frame)
     
     # Mismo frame (no debería haber movimiento)
-    motion, annotated = detector.detect(frame)
-    assert not motion
+    result = detector.detect(frame)
+    assert not result.motion_detected
+    assert result.boxes == ()
 
 
 def test_update_config():
@@ -39,3 +41,85 @@ def test_update_config():
     detector.update_config(threshold=50, min_area=1000)
     assert detector.threshold == 50
     assert detector.min_area == 1000
+
+
+def test_detect_returns_structured_result():
+    """Test de resultado estructurado con cajas, áreas y energía."""
+    detector = MotionDetector(threshold=30, min_area=500, consecutive_frames=2)
+    frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+    frame.flags.writeable = False
+    detector.set_background(frame)
+    
+    moving = frame.copy()
+    moving[50:130, 60:160] = 250
+    first = detector.detect(moving)
+    assert first.raw_motion and not first.motion_detected
+    second = detector.detect(moving)
+    assert second.motion_detected
+    assert len(second.boxes) == len(second.areas) == 1
+    assert second.areas[0] >= 500
+    assert 0.0 < second.motion_energy < 1.0
+    assert second.frame_size == (320, 240)
+    assert detector.last_result is second
+
+
+def test_draw_detections_scales_boxes():
+    """Test de anotación a resolución completa desde cajas del stream lores."""
+    result = DetectionResult(
+        motion_detected=True,
+        raw_motion=True,
+        boxes=((10, 20, 30, 40),),
+        areas=(1200,),
+        frame_size=(160, 90)
+    )
+    assert result.scaled_boxes(640, 360) == [(40, 80, 120, 160)]
+    
+    full = np.zeros((360, 640, 3), dtype=np.uint8)
+    draw_detections(full, result)
+    assert full[80, 60].tolist() == [0, 255, 0]
+    assert full[200, 300].tolist() == [0, 0, 0]
+
+
+def test_detect_accepts_luma_plane_view():
+    """Test de detección con el plano Y de un buffer YUV420 (vista sin copia)."""
+    detector = MotionDetector(threshold=30, min_area=500, calibration_frames=1)
+    yuv = np.full((360 * 3 // 2, 640), 100, dtype=np.uint8)
+    luma = yuv[:360, :640]
+    detector.set_background(luma)
+    assert detector.background.shape == (360, 640)
+    
+    yuv[100:200, 100:200] = 250
+    result = detector.detect(luma)
+    assert result.raw_motion
+    assert result.frame_size == (640, 360)
+
+
+def test_background_converges_on_slow_drift():
+    """Test de que el acumulador float32 sigue derivas lentas de iluminación."""
+    detector = MotionDetector(background_update_rate=0.05)
+    detector.set_background(np.full((120, 160), 100, dtype=np.uint8))
+    
+    brighter = np.full((120, 160), 101, dtype=np.uint8)
+    for _ in range(200):
+        detector.update_background(brighter)
+    
+    assert detector.background.dtype == np.float32
+    assert abs(float(detector.background.mean()) - 101.0) < 0.01
+
+
+def test_detection_buffers_are_reused():
+    """Test de que los buffers de trabajo se reutilizan entre frames."""
+    detector = MotionDetector(threshold=30, min_area=100, calibration_frames=1)
+    frame = np.full((120, 160), 80, dtype=np.uint8)
+    detector.set_background(frame)
+    background_id = id(detector.background)
+    buffer_ids = (id(detector._blurred), id(detector._mask), id(detector._labels))
+    
+    moving = frame.copy()
+    moving[20:60, 20:60] = 220
+    for _ in range(3):
+        result = detector.detect(moving)
+    
+    assert (id(detector._blurred), id(detector._mask), id(detector._labels)) == buffer_ids
+    assert id(detector.background) == background_id
+    assert len(result.boxes) == 1
@@ -0,0 +1,117 @@
+"""Tests para la máquina de estados de episodios."""
+
+from src.detection.episode_state_machine import EpisodeStateMachine
+
+FPS = 15
+
+
+def replay(machine, motion_sequence, start=0.0):
+    """Reproduce una secuencia de detecciones a 15 FPS con reloj simulado.
+
+    Returns:
+        Lista de decisiones.
+    """
+    return [
+        machine.update(motion, frame_index=i + 1, now=start + i / FPS)
+        for i, motion in enumerate(motion_sequence)
+    ]
+
+
+def test_episode_starts_after_required_frames():
+    """Test de que un episodio requiere 10 frames con movimiento."""
+    machine = EpisodeStateMachine()
+    decisions = replay(machine, [True] * 12)
+    starts = [i for i, d in enumerate(decisions) if d.start]
+    assert starts == [9]
+    assert machine.episode_active
+    assert decisions[9].motion_state is False
+    assert decisions[10].motion_state is True
+
+
+def test_short_motion_does_not_start_episode():
+    """Test de que movimiento breve seguido de calma no inicia episodio."""
+    machine = EpisodeStateMachine()
+    decisions = replay(machine, ([True] * 6 + [False] * 6) * 5)
+    assert not any(d.start for d in decisions)
+
+
+def test_calm_frames_close_episode_and_grace_blocks_restart():
+    """Test de cierre por frames sin movimiento y período de gracia."""
+    machine = EpisodeStateMachine(grace_period=8.0)
+    sequence = [True] * 40 + [False] * 5 + [True] * 60
+    decisions = replay(machine, sequence)
+
+    # Episodio de más de calm_timeout: bastan 3 frames sin movimiento
+    stops = [i for i, d in enumerate(decisions) if d.stop]
+    assert stops == [42]
+    assert decisions[42].episode_start_time == 9 / FPS
+    # Los 60 frames de movimiento (4 s) caen dentro del período de gracia
+    assert sum(d.start for d in decisions) == 1
+    assert not any(d.motion for d in decisions[43:])
+
+
+def test_episode_restarts_after_grace_period():
+    """Test de que tras la gracia un nuevo movimiento abre otro episodio."""
+    machine = EpisodeStateMachine(grace_period=1.0)
+    sequence = [True] * 20 + [False] * 5 + [False] * 15 + [True] * 12
+    decisions = replay(machine, sequence)
+    assert sum(d.start for d in decisions) == 2
+    assert sum(d.stop for d in decisions) == 1
+
+
+def test_max_duration_forces_close():
+    """Test de cierre forzado con movimiento continuo (detector atascado)."""
+    machine = EpisodeStateMachine(calm_timeout=2.0, max_duration_factor=3.0)
+    decisions = replay(machine, [True] * (FPS * 10))
+    stop = next(d for d in decisions if d.stop)
+    assert stop.timestamp - stop.episode_start_time > 6.0
+    assert stop.timestamp - stop.episode_start_time < 6.0 + 2 / FPS
+
+
+def test_unprocessed_frames_count_as_calm():
+    """Test de que los frames no analizados cuentan como sin movimiento."""
+    machine = EpisodeStateMachine()
+    decisions = [
+        machine.update(True, processed=(i % 2 == 0), now=i / FPS)
+        for i in range(24)
+    ]
+    assert not any(d.motion for d in decisions[1::2])
+    # El movimiento intermitente se acumula: el episodio empieza en el
+    # décimo frame analizado
+    assert [i for i, d in enumerate(decisions) if d.start] == [18]
+    assert decisions[20].motion_state and not decisions[19].motion_state
+
+
+def test_add_frame_sampling():
+    """Test de que solo se añade uno de cada N frames al episodio."""
+    machine = EpisodeStateMachine(sample_every=5)
+    decisions = replay(machine, [True] * 30)
+    added = [i + 1 for i, d in enumerate(decisions) if d.add_frame]
+    assert added == [10, 15, 20, 25, 30]
+
+
+def test_injected_clock_and_close():
+    """Test del reloj inyectado y del cierre explícito."""
+    now = [100.0]
+    machine = EpisodeStateMachine(clock=lambda: now[0])
+    for _ in range(10):
+        decision = machine.update(True)
+        now[0] += 1 / FPS
+    assert decision.start
+    assert machine.episode_start_time == decision.timestamp
+
+    close = machine.close()
+    assert close.stop and close.timestamp == now[0]
+    assert not machine.episode_active
+    assert not machine.close().stop
+
+
+def test_replay_one_hour_of_detections():
+    """Test de reproducción rápida de una hora de detecciones grabadas."""
+    machine = EpisodeStateMachine()
+    # Ráfagas de 3 s de movimiento cada minuto
+    minute = [True] * (3 * FPS) + [False] * (57 * FPS)
+    decisions = replay(machine, minute * 60)
+    assert len(decisions) == 60 * 60 * FPS
+    assert sum(d.start for d in decisions) == 60
+    assert sum(d.stop for d in decisions) == 60
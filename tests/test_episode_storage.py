@@ -0,0 +1,74 @@
+"""Tests para el almacenamiento de episodios en contenedor de video."""
+
+import json
+import pytest
+import numpy as np
+from src.camera.replay_sources import VideoFileSource, EpisodeImageSource, open_episode_source
+from src.data.lerobot_dataset import EpisodeRecorder
+
+
+def record(recorder, episode_id, frames=6):
+    """Graba un episodio corto con frames sintéticos."""
+    recorder.start_episode(episode_id)
+    for i in range(frames):
+        recorder.add_frame(np.full((48, 64, 3), i * 30, dtype=np.uint8),
+                           {"motion": True, "motion_energy": i / 10})
+    return recorder.save_episode()
+
+
+@pytest.mark.parametrize("video_codec,extension", [("mjpg", ".avi"), ("mp4v", ".mp4")])
+def test_video_episode_is_single_container(tmp_path, video_codec, extension):
+    """Test de que el episodio se escribe en un solo archivo de video con índice."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="video",
+                               video_codec=video_codec, fps=3.0)
+    path = record(recorder, "ep_video")
+
+    episode_dir = tmp_path / "ep_video"
+    assert not (episode_dir / "images").exists()
+    assert sorted(p.name for p in episode_dir.iterdir()) == sorted(
+        [f"episode{extension}", "timestamps.json", "metadata.json", "info.json", "thumbnails"]
+    )
+    with open(episode_dir / "timestamps.json") as f:
+        index = json.load(f)
+    assert [entry["frame_index"] for entry in index] == list(range(6))
+    assert index[3]["motion_energy"] == 0.3
+    with open(episode_dir / "info.json") as f:
+        info = json.load(f)
+    assert info["storage_format"] == "video"
+    assert info["video_path"] == f"episode{extension}"
+    assert info["total_frames"] == 6 and info["fps"] == 3.0
+
+    source = open_episode_source(path, realtime=False)
+    assert isinstance(source, VideoFileSource)
+    with source:
+        frames = 0
+        while source.capture_frame() is not None:
+            frames += 1
+    assert frames == 6
+    assert source.get_resolution() == (64, 48)
+
+
+def test_video_mode_does_not_retain_frames(tmp_path):
+    """Test de que en formato video el episodio no retiene bytes en memoria."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="video")
+    recorder.start_episode("ep_mem")
+    for i in range(5):
+        recorder.add_frame(np.full((48, 64, 3), i, dtype=np.uint8))
+    assert recorder.memory_bytes == 0
+    snapshot = recorder.detach_episode()
+    assert snapshot.nbytes == 0 and snapshot.video.frame_count == 5
+
+
+def test_images_layout_still_opens_as_image_source(tmp_path):
+    """Test de que los episodios en imágenes siguen reproduciéndose igual."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path))
+    path = record(recorder, "ep_images", frames=2)
+    assert isinstance(open_episode_source(path, realtime=False), EpisodeImageSource)
+
+
+def test_invalid_storage_options(tmp_path):
+    """Test de error con formato o códec de video desconocidos."""
+    with pytest.raises(ValueError):
+        EpisodeRecorder(episode_path=str(tmp_path), storage_format="tar")
+    with pytest.raises(ValueError):
+        EpisodeRecorder(episode_path=str(tmp_path), storage_format="video", video_codec="h265")
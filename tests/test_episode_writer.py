@@ -0,0 +1,144 @@
+"""Tests para el escritor de episodios en segundo plano."""
+
+import json
+import threading
+import pytest
+import numpy as np
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.data.episode_writer import EpisodeWriter
+
+
+def record(recorder, episode_id, frames=3):
+    """Graba un episodio corto con frames sintéticos."""
+    recorder.start_episode(episode_id)
+    for i in range(frames):
+        recorder.add_frame(np.full((24, 32, 3), i * 20, dtype=np.uint8), {"motion": True})
+
+
+def test_finish_episode_writes_in_background(tmp_path):
+    """Test de escritura en segundo plano con callback de finalización."""
+    writer = EpisodeWriter(max_pending=2)
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), writer=writer)
+    results = []
+    done = threading.Event()
+
+    def on_complete(result):
+        results.append(result)
+        done.set()
+
+    record(recorder, "ep_bg")
+    writer.start()
+    snapshot = recorder.finish_episode(on_complete=on_complete)
+    # El grabador queda libre de inmediato
+    assert snapshot.frame_count == 3
+    assert not recorder.is_recording
+
+    assert done.wait(5)
+    writer.stop()
+    result = results[0]
+    assert result.ok and result.frame_count == 3
+    assert len(list((tmp_path / "ep_bg" / "images").glob("*.jpg"))) == 3
+    with open(tmp_path / "ep_bg" / "info.json") as f:
+        assert json.load(f)["total_frames"] == 3
+
+    stats = writer.get_stats()
+    assert stats["written"] == 1
+    assert stats["pending_frames"] == 0
+
+
+def test_writer_backpressure_metrics(tmp_path):
+    """Test de que la cola llena bloquea la entrega y se registra como métrica."""
+    writer = EpisodeWriter(max_pending=1, submit_timeout=0.05)
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), writer=writer)
+
+    # Sin arrancar el escritor, la segunda entrega encuentra la cola llena
+    record(recorder, "ep_1")
+    recorder.finish_episode()
+    record(recorder, "ep_2")
+    recorder.finish_episode()
+
+    stats = writer.get_stats()
+    assert stats["queue_depth"] == 1
+    assert stats["pending_frames"] == 3
+    assert stats["blocked_submits"] == 1
+    assert stats["rejected"] == 1
+    assert stats["submit_wait_ms"] >= 40
+
+    writer.start()
+    writer.stop()
+    assert writer.get_stats()["written"] == 1
+
+
+def test_writer_reports_failures(tmp_path):
+    """Test de que un error de escritura llega al callback sin detener el escritor."""
+    blocker = tmp_path / "blocked"
+    blocker.write_text("no es un directorio")
+    writer = EpisodeWriter()
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), writer=writer)
+    recorder.episode_path = blocker
+    results = []
+
+    writer.start()
+    record(recorder, "ep_fail")
+    recorder.finish_episode(on_complete=results.append)
+    recorder.episode_path = tmp_path
+    record(recorder, "ep_ok")
+    recorder.finish_episode(on_complete=results.append)
+    writer.stop()
+
+    assert [r.ok for r in results] == [False, True]
+    assert writer.get_stats()["failed"] == 1
+
+
+def test_save_episode_without_writer_is_synchronous(tmp_path):
+    """Test de que sin escritor el guardado sigue siendo síncrono."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path))
+    record(recorder, "ep_sync", frames=2)
+    path = recorder.save_episode()
+    assert path == str(tmp_path / "ep_sync")
+    assert (tmp_path / "ep_sync" / "metadata.json").exists()
+
+
+def noisy_frame(seed: int) -> np.ndarray:
+    """Frame con ruido (poco compresible) de 360x640."""
+    return np.random.default_rng(seed).integers(0, 255, (360, 640, 3), dtype=np.uint8)
+
+
+def test_frames_are_encoded_when_added(tmp_path):
+    """Test de que el episodio retiene bytes comprimidos, no frames crudos."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path))
+    recorder.start_episode("ep_enc")
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    for _ in range(10):
+        recorder.add_frame(frame)
+    assert all(isinstance(f["data"], bytes) for f in recorder.current_episode)
+    assert recorder.memory_bytes < 10 * frame.nbytes / 20
+
+
+def test_memory_budget_spills_to_disk(tmp_path):
+    """Test de volcado a disco al superar el presupuesto de memoria."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), memory_budget_mb=0.5)
+    recorder.start_episode("ep_spill")
+    for i in range(12):
+        recorder.add_frame(noisy_frame(i))
+    assert recorder.memory_bytes <= recorder.memory_budget
+    assert recorder.spilled_frames > 0
+    spilled = list((tmp_path / "ep_spill" / "images").glob("*.jpg"))
+    assert len(spilled) == recorder.spilled_frames
+
+    path = recorder.save_episode()
+    images = sorted((tmp_path / "ep_spill" / "images").glob("*.jpg"))
+    assert len(images) == 12
+    with open(f"{path}/metadata.json") as f:
+        assert json.load(f)["frame_paths"][0] == "images/frame_000000.jpg"
+
+
+def test_codec_selection(tmp_path):
+    """Test de códec configurable y error con códec desconocido."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), codec="png")
+    record(recorder, "ep_png", frames=2)
+    recorder.save_episode()
+    assert len(list((tmp_path / "ep_png" / "images").glob("*.png"))) == 2
+
+    with pytest.raises(ValueError):
+        EpisodeRecorder(episode_path=str(tmp_path), codec="bmp")
@@ -0,0 +1,87 @@
+"""Tests para el escritor de eventos por lotes."""
+
+import time
+import pytest
+from src.alerts.event_writer import EventWriter
+from src.alerts.notification import NotificationManager
+from src.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Fixture con una BD temporal que cuenta las transacciones de eventos."""
+    db = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    db.commits = []
+    add_events = db.add_events
+
+    def counting_add_events(events):
+        db.commits.append(len(events))
+        return add_events(events)
+
+    db.add_events = counting_add_events
+    yield db
+    db.close()
+
+
+def test_burst_is_written_in_few_transactions(db):
+    """Test de que una ráfaga se guarda con una transacción por lote."""
+    notifier = NotificationManager(db_manager=db, batch_size=100, flush_interval=5.0)
+    for i in range(250):
+        notifier.motion_detected(area=float(i))
+
+    # Dos lotes completos sin esperar al intervalo; el resto, al cerrar
+    deadline = time.monotonic() + 2.0
+    while sum(db.commits) < 200 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert db.commits[:2] == [100, 100]
+
+    notifier.close()
+    assert sum(db.commits) == 250 and len(db.commits) == 3
+    events = db.get_events(limit=1000)
+    assert len(events) == 250
+    assert notifier.get_stats()["written"] == 250
+
+
+def test_single_event_is_written_within_interval(db):
+    """Test de que un evento suelto se guarda al cumplirse el intervalo."""
+    writer = EventWriter(db, batch_size=100, flush_interval=0.1)
+    writer.start()
+    try:
+        started = time.monotonic()
+        writer.submit("system_started", "Sistema iniciado", "info")
+        while not db.get_events() and time.monotonic() - started < 2.0:
+            time.sleep(0.01)
+        elapsed = time.monotonic() - started
+    finally:
+        writer.stop()
+
+    assert 0.05 < elapsed < 0.5
+    event = db.get_events()[0]
+    assert event["event_type"] == "system_started" and event["severity"] == "info"
+    assert event["timestamp"]
+
+
+def test_full_queue_drops_without_blocking(db):
+    """Test de que la cola llena descarta eventos sin bloquear al productor."""
+    writer = EventWriter(db, batch_size=10, flush_interval=5.0, max_pending=5)
+    writer.start()
+    db_add_events = db.add_events
+    db.add_events = lambda events: time.sleep(0.3) or db_add_events(events)
+    try:
+        started = time.monotonic()
+        accepted = [writer.submit("warning", f"evento {i}", "warning") for i in range(50)]
+        assert time.monotonic() - started < 0.2
+    finally:
+        writer.stop()
+
+    stats = writer.get_stats()
+    assert accepted.count(False) == stats["queue"]["dropped"] > 0
+    assert stats["written"] == accepted.count(True)
+
+
+def test_without_thread_writes_immediately(db):
+    """Test de escritura directa sin thread en marcha."""
+    writer = EventWriter(db)
+    assert writer.submit("error", "fallo", "error", episode_id=None)
+    assert db.commits == [1]
+    assert db.get_events(severity="error")[0]["message"] == "fallo"
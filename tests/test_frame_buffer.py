@@ -0,0 +1,128 @@
+"""Tests para el buffer circular de frames."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import numpy as np
+from src.camera.frame_buffer import FrameRingBuffer
+
+
+def make_frame(value: int) -> np.ndarray:
+    """Crea un frame pequeño relleno con un valor."""
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_write_and_acquire_latest():
+    """Test de publicación y lectura del último frame."""
+    buffer = FrameRingBuffer(capacity=3)
+    seq1 = buffer.write(make_frame(1))
+    seq2 = buffer.write(make_frame(2), {"boxes": [(0, 0, 1, 1)]})
+    assert seq2 == seq1 + 1
+    assert buffer.latest_seq == seq2
+
+    with buffer.acquire() as ref:
+        assert ref.seq == seq2
+        assert ref.frame[0, 0, 0] == 2
+        assert ref.meta["boxes"] == [(0, 0, 1, 1)]
+
+
+def test_views_are_read_only():
+    """Test de que los consumidores reciben vistas de solo lectura."""
+    buffer = FrameRingBuffer(capacity=2)
+    source = make_frame(7)
+    seq = buffer.write(source)
+    with buffer.acquire(seq) as ref:
+        with pytest.raises(ValueError):
+            ref.frame[0, 0, 0] = 0
+        assert not np.shares_memory(ref.frame, source)
+
+
+def test_slots_are_preallocated_and_reused():
+    """Test de que los slots se reutilizan sin nuevas asignaciones."""
+    buffer = FrameRingBuffer(capacity=2)
+    buffer.write(make_frame(1))
+    slots_before = [id(s) for s in buffer._slots]
+    for value in range(10):
+        buffer.write(make_frame(value))
+    assert [id(s) for s in buffer._slots] == slots_before
+
+
+def test_pinned_slot_is_not_overwritten():
+    """Test de que un slot retenido no se sobrescribe."""
+    buffer = FrameRingBuffer(capacity=2)
+    seq = buffer.write(make_frame(1))
+    ref = buffer.acquire(seq)
+    for value in range(2, 6):
+        buffer.write(make_frame(value))
+    assert ref.frame[0, 0, 0] == 1
+    assert buffer.acquire(seq) is not None
+    ref.release()
+
+
+def test_write_dropped_when_all_slots_pinned():
+    """Test de descarte cuando todos los slots están retenidos."""
+    buffer = FrameRingBuffer(capacity=2)
+    refs = [buffer.acquire(buffer.write(make_frame(i))) for i in range(2)]
+    assert buffer.write(make_frame(9)) is None
+    assert buffer.dropped_writes == 1
+    for ref in refs:
+        ref.release()
+    assert buffer.write(make_frame(9)) is not None
+
+
+def test_evicted_sequence_returns_none():
+    """Test de que una secuencia sobrescrita ya no es accesible."""
+    buffer = FrameRingBuffer(capacity=2)
+    seq = buffer.write(make_frame(1))
+    buffer.write(make_frame(2))
+    buffer.write(make_frame(3))
+    assert buffer.acquire(seq) is None
+
+
+def test_shape_mismatch_raises():
+    """Test de error con frames de shape distinto."""
+    buffer = FrameRingBuffer(capacity=2)
+    buffer.write(make_frame(1))
+    with pytest.raises(ValueError):
+        buffer.write(np.zeros((2, 2, 3), dtype=np.uint8))
+
+
+def test_wait_for_newer():
+    """Test de espera de un frame nuevo desde otro thread."""
+    buffer = FrameRingBuffer(capacity=2)
+    timer = threading.Timer(0.05, lambda: buffer.write(make_frame(1)))
+    timer.start()
+    assert buffer.wait_for_newer(0, timeout=2.0) == 1
+    assert buffer.wait_for_newer(1, timeout=0.01) == 1
+
+
+def test_wait_for_newer_async_does_not_use_executor():
+    """Test de que las esperas asíncronas no ocupan threads del executor."""
+    buffer = FrameRingBuffer(capacity=2)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        # Un único thread: si cada espera ocupara uno, se serializarían
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        waits = [asyncio.create_task(buffer.wait_for_newer_async(0, timeout=2.0)) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        await loop.run_in_executor(None, buffer.write, make_frame(1))
+        seqs = await asyncio.gather(*waits)
+        return seqs, time.monotonic() - started
+
+    seqs, elapsed = asyncio.run(scenario())
+    assert seqs == [1] * 8
+    assert elapsed < 0.5
+    assert not buffer._async_waiters
+
+
+def test_wait_for_newer_async_timeout():
+    """Test de que la espera asíncrona devuelve la misma secuencia al expirar."""
+    buffer = FrameRingBuffer(capacity=2)
+    buffer.write(make_frame(1))
+    assert asyncio.run(buffer.wait_for_newer_async(0)) == 1
+    assert asyncio.run(buffer.wait_for_newer_async(1, timeout=0.01)) == 1
+    assert not buffer._async_waiters
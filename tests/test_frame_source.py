@@ -0,0 +1,140 @@
+"""Tests para las fuentes de frames de reproducción."""
+
+import json
+import time
+import pytest
+import numpy as np
+import cv2
+from src.camera.frame_source import create_frame_source
+from src.camera.replay_sources import VideoFileSource, EpisodeImageSource, SyntheticSource
+
+
+@pytest.fixture
+def episode_dir(tmp_path):
+    """Fixture que crea un episodio grabado con 5 imágenes."""
+    images_dir = tmp_path / "ep_test" / "images"
+    images_dir.mkdir(parents=True)
+    for i in range(5):
+        frame = np.full((48, 64, 3), i * 40, dtype=np.uint8)
+        cv2.imwrite(str(images_dir / f"frame_{i:06d}.jpg"), frame)
+    with open(tmp_path / "ep_test" / "info.json", 'w') as f:
+        json.dump({"fps": 10}, f)
+    return tmp_path / "ep_test"
+
+
+def test_synthetic_source_frames():
+    """Test de frames sintéticos con shape correcto y fin de fuente."""
+    source = SyntheticSource(width=64, height=48, realtime=False, total_frames=3)
+    with source:
+        frames = [source.capture_frame() for _ in range(4)]
+    assert all(f.shape == (48, 64, 3) for f in frames[:3])
+    assert frames[3] is None
+    assert source.exhausted
+
+
+def test_synthetic_source_loop():
+    """Test de reinicio de la fuente con loop."""
+    source = SyntheticSource(width=32, height=32, realtime=False, loop=True, total_frames=2)
+    with source:
+        frames = [source.capture_frame() for _ in range(5)]
+    assert all(f is not None for f in frames)
+    assert np.array_equal(frames[0], frames[2])
+
+
+def test_realtime_pacing():
+    """Test de que el modo tiempo real respeta el framerate."""
+    source = SyntheticSource(width=32, height=32, fps=50, realtime=True, total_frames=6)
+    with source:
+        start = time.monotonic()
+        while source.capture_frame() is not None:
+            pass
+        elapsed = time.monotonic() - start
+    # 6 frames a 50 FPS -> al menos 5 intervalos de 20 ms
+    assert elapsed >= 0.09
+
+
+def test_episode_image_source(episode_dir):
+    """Test de reproducción de un episodio grabado."""
+    source = EpisodeImageSource(str(episode_dir), realtime=False)
+    assert source.get_resolution() == (64, 48)
+    assert source.get_framerate() == 10
+    with source:
+        frames = []
+        while (frame := source.capture_frame()) is not None:
+            frames.append(frame)
+    assert len(frames) == 5
+
+
+def test_episode_image_source_missing(tmp_path):
+    """Test de error con directorio sin imágenes."""
+    with pytest.raises(FileNotFoundError):
+        EpisodeImageSource(str(tmp_path))
+
+
+def test_video_file_source(tmp_path):
+    """Test de reproducción de un archivo de video."""
+    video_path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 20, (64, 48))
+    for i in range(4):
+        writer.write(np.full((48, 64, 3), i * 50, dtype=np.uint8))
+    writer.release()
+
+    source = VideoFileSource(str(video_path), realtime=False)
+    assert source.get_resolution() == (64, 48)
+    with source:
+        count = 0
+        while source.capture_frame() is not None:
+            count += 1
+    assert count == 4
+
+
+def test_create_frame_source_synthetic(tmp_path):
+    """Test de la factoría con fuente sintética."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        "camera:\n"
+        "  resolution: {width: 64, height: 48}\n"
+        "  framerate: 15\n"
+        "  source: {type: synthetic, realtime: false}\n"
+    )
+    source = create_frame_source(str(config_path))
+    assert isinstance(source, SyntheticSource)
+    assert source.get_resolution() == (64, 48)
+
+
+def test_create_frame_source_unknown(tmp_path):
+    """Test de la factoría con tipo desconocido."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("camera:\n  source: {type: foo, path: x}\n")
+    with pytest.raises(ValueError):
+        create_frame_source(str(config_path))
+
+
+def test_capture_streams_with_lores():
+    """Test de stream lores generado junto al principal."""
+    source = SyntheticSource(width=64, height=48, realtime=False,
+                             lores_size=(32, 24), total_frames=1)
+    with source:
+        main, lores = source.capture_streams()
+        assert main.shape == (48, 64, 3)
+        assert lores.shape == (24, 32)
+        assert source.capture_streams() == (None, None)
+
+
+def test_capture_streams_skips_unrequested_lores():
+    """Test de que el lores por software solo se genera si se pide."""
+    source = SyntheticSource(width=64, height=48, realtime=False,
+                             lores_size=(32, 24), total_frames=2)
+    with source:
+        main, lores = source.capture_streams(lores=False)
+        assert main is not None and lores is None
+        assert source.capture_streams(lores=True)[1].shape == (24, 32)
+
+
+def test_capture_streams_without_lores():
+    """Test de que sin lores solo se entrega el stream principal."""
+    source = SyntheticSource(width=64, height=48, realtime=False, total_frames=1)
+    with source:
+        main, lores = source.capture_streams()
+    assert main is not None
+    assert lores is None
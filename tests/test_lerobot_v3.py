@@ -0,0 +1,81 @@
+"""Tests para el dataset en formato LeRobotDataset v3."""
+
+import json
+import pytest
+import numpy as np
+import cv2
+from src.data.lerobot_dataset import EpisodeRecorder
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from src.data.lerobot_v3 import LeRobotV3Dataset
+
+
+def record(recorder, episode_id, frames):
+    """Graba un episodio con frames sintéticos y bounding box alterna."""
+    recorder.start_episode(episode_id)
+    for i in range(frames):
+        recorder.add_frame(np.full((48, 64, 3), i * 20, dtype=np.uint8), {
+            "motion": i % 2 == 0,
+            "motion_energy": i / 100,
+            "bbox": [i, 2, 10, 12] if i % 2 == 0 else None
+        })
+    return recorder.save_episode()
+
+
+def test_episodes_append_to_v3_layout(tmp_path):
+    """Test de que los episodios se añaden incrementalmente al dataset v3."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="lerobot_v3", fps=3.0)
+    first = record(recorder, "ep_a", frames=4)
+    second = record(recorder, "ep_b", frames=3)
+
+    assert first.endswith("videos/observation.images.camera/chunk-000/file-000.mp4")
+    assert second.endswith("file-001.mp4")
+    assert cv2.VideoCapture(second).get(cv2.CAP_PROP_FRAME_COUNT) == 3
+    assert not any((tmp_path / ".staging").iterdir())
+    # Miniaturas fuera del layout de LeRobot, a partir del video ya movido
+    assert json.loads((tmp_path / "thumbnails" / "ep_b" / "thumbnails.json").read_text())["frame_count"] == 3
+
+    with open(tmp_path / "meta" / "info.json") as f:
+        info = json.load(f)
+    assert info["codebase_version"] == "v3.0"
+    assert info["total_episodes"] == 2 and info["total_frames"] == 7
+    assert info["features"]["observation.images.camera"]["shape"] == [48, 64, 3]
+
+    # Lectura columnar de todo el dataset
+    table = pq.read_table(tmp_path / "data", columns=["index", "episode_index", "timestamp", "bbox"])
+    assert table.column("index").to_pylist() == list(range(7))
+    assert table.column("episode_index").to_pylist() == [0] * 4 + [1] * 3
+    assert table.column("timestamp").to_pylist()[:2] == [0.0, pytest.approx(1 / 3)]
+    boxes = table.column("bbox").to_pylist()
+    assert boxes[0] == [0.0, 2.0, 10.0, 12.0]
+    assert all(np.isnan(boxes[1]))
+
+    episodes = pq.read_table(tmp_path / "meta" / "episodes").to_pylist()
+    assert [e["episode_id"] for e in episodes] == ["ep_a", "ep_b"]
+    assert (episodes[1]["dataset_from_index"], episodes[1]["dataset_to_index"]) == (4, 7)
+
+
+def test_dataset_reopens_and_continues(tmp_path):
+    """Test de que al reabrir el dataset se continúa la numeración."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="lerobot_v3", fps=3.0)
+    record(recorder, "ep_a", frames=2)
+
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="lerobot_v3", fps=5.0)
+    assert recorder.fps == 3.0  # Prevalece el framerate del dataset existente
+    record(recorder, "ep_b", frames=2)
+
+    dataset = LeRobotV3Dataset(str(tmp_path))
+    assert dataset.total_episodes == 2
+    assert [e["episode_index"] for e in dataset.read_episodes()] == [0, 1]
+    assert dataset.read_frames().column("index").to_pylist() == [0, 1, 2, 3]
+
+
+def test_chunk_rollover(tmp_path):
+    """Test de que los archivos pasan al siguiente chunk al llenarse."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="lerobot_v3", fps=3.0)
+    recorder.dataset.chunks_size = 2
+    for i in range(3):
+        record(recorder, f"ep_{i}", frames=1)
+    assert (tmp_path / "data" / "chunk-001" / "file-000.parquet").exists()
+    assert len(recorder.dataset.read_episodes()) == 3
@@ -0,0 +1,75 @@
+"""Tests para la migración de episodios en formato de imágenes."""
+
+import json
+import pytest
+import numpy as np
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.data.migration import EpisodeMigrator, MigrationManifest
+
+
+def make_legacy_episodes(root, count=3, frames=4):
+    """Crea episodios en formato de imágenes."""
+    recorder = EpisodeRecorder(episode_path=str(root))
+    for e in range(count):
+        recorder.start_episode(f"ep_{e:03d}")
+        for i in range(frames):
+            recorder.add_frame(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+        recorder.save_episode()
+
+
+def test_migrate_to_video_and_delete_source(tmp_path):
+    """Test de migración a video con verificación y borrado del origen."""
+    source, output = tmp_path / "src", tmp_path / "out"
+    make_legacy_episodes(source)
+
+    migrator = EpisodeMigrator(str(source), str(output), workers=2, delete_source=True)
+    summary = migrator.run()
+
+    assert summary["migrated"] == 3 and summary["failed"] == 0
+    assert summary["frames"] == 12
+    assert sum(w["frames"] for w in summary["workers"].values()) == 12
+    assert not any(source.iterdir())
+    with open(output / "ep_001" / "info.json") as f:
+        info = json.load(f)
+    assert info["storage_format"] == "video" and info["total_frames"] == 4
+    assert (output / "ep_001" / "episode.avi").exists()
+
+
+def test_resume_skips_completed_and_keeps_failed_source(tmp_path):
+    """Test de reanudación y de episodios con frames que no cuadran."""
+    source, output = tmp_path / "src", tmp_path / "out"
+    make_legacy_episodes(source)
+    # Falta un frame respecto a info.json
+    (source / "ep_002" / "images" / "frame_000003.jpg").unlink()
+
+    first = EpisodeMigrator(str(source), str(output), workers=1, delete_source=True).run(limit=1)
+    assert first["migrated"] == 1
+
+    second = EpisodeMigrator(str(source), str(output), workers=2, delete_source=True).run()
+    assert second["migrated"] == 1 and second["failed"] == 1
+    assert (source / "ep_002").exists()
+
+    manifest = MigrationManifest(output / "migration_manifest.jsonl")
+    assert manifest.completed == {"ep_000", "ep_001"}
+
+
+def test_migrate_to_lerobot_v3(tmp_path):
+    """Test de migración a un dataset LeRobot v3."""
+    pytest.importorskip("pyarrow")
+    source, output = tmp_path / "src", tmp_path / "dataset"
+    make_legacy_episodes(source, count=3, frames=2)
+
+    summary = EpisodeMigrator(str(source), str(output), target="lerobot_v3", workers=2).run()
+    assert summary["migrated"] == 3
+
+    migrator = EpisodeMigrator(str(source), str(output), target="lerobot_v3")
+    episodes = migrator.dataset.read_episodes()
+    assert sorted(e["episode_id"] for e in episodes) == ["ep_000", "ep_001", "ep_002"]
+    assert migrator.dataset.total_frames == 6
+    assert migrator.pending_episodes() == []
+
+
+def test_video_target_rejects_source_as_output(tmp_path):
+    """Test de que la migración a video no escribe sobre el origen."""
+    with pytest.raises(ValueError):
+        EpisodeMigrator(str(tmp_path), str(tmp_path / "sub" / ".."), delete_source=True)
@@ -0,0 +1,215 @@
+"""Tests para el difusor MJPEG compartido."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+from src.camera.frame_buffer import FrameRingBuffer
+from src.detection.detection_result import DetectionResult
+from src.web.mjpeg_broadcaster import (
+    MJPEGBroadcaster, StreamVariantRegistry, MJPEG_PART_HEADER, _Subscriber
+)
+
+
+def make_frame(value: int) -> np.ndarray:
+    """Crea un frame RGB pequeño relleno con un valor."""
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def test_encode_draws_detection_boxes():
+    """Test de que la variante anotada dibuja las cajas y la cruda no."""
+    buffer = FrameRingBuffer(capacity=2)
+    result = DetectionResult(True, True, boxes=((8, 8, 16, 16),), areas=(256,),
+                             frame_size=(64, 48))
+    seq = buffer.write(make_frame(0), {"detection": result})
+
+    annotated = MJPEGBroadcaster(buffer, quality=95, annotate=True).encode(seq)
+    raw = MJPEGBroadcaster(buffer, quality=95, annotate=False).encode(seq)
+
+    annotated_img = cv2.imdecode(np.frombuffer(annotated, np.uint8), cv2.IMREAD_COLOR)
+    raw_img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+    assert annotated_img[8, 16, 1] > 200
+    assert raw_img[8, 16, 1] < 30
+
+
+def test_frames_encoded_once_for_all_clients():
+    """Test de que varios clientes comparten una única codificación por frame."""
+    buffer = FrameRingBuffer(capacity=4)
+    broadcaster = MJPEGBroadcaster(buffer, max_fps=0)
+
+    async def client(received):
+        async for chunk in broadcaster.subscribe():
+            received.append(chunk)
+            if len(received) == 3:
+                break
+
+    async def scenario():
+        clients = [[] for _ in range(3)]
+        tasks = [asyncio.create_task(client(r)) for r in clients]
+        await asyncio.sleep(0.05)
+        for i in range(3):
+            buffer.write(make_frame(i * 50))
+            # Esperar a que el frame se reparta antes de publicar el siguiente
+            for _ in range(100):
+                if broadcaster.frames_encoded > i and all(len(r) > i for r in clients):
+                    break
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+        return clients
+
+    clients = asyncio.run(scenario())
+    assert broadcaster.frames_encoded == 3
+    for received in clients:
+        assert len(received) == 3
+        assert received[0].startswith(MJPEG_PART_HEADER)
+    # Todos los clientes reciben exactamente los mismos bytes
+    assert clients[0] == clients[1] == clients[2]
+    assert broadcaster.subscriber_count == 0
+
+
+def test_slow_client_only_gets_latest_frame():
+    """Test de que un cliente lento descarta frames en vez de encolarlos."""
+    buffer = FrameRingBuffer(capacity=4)
+    broadcaster = MJPEGBroadcaster(buffer, max_fps=0)
+
+    async def scenario():
+        stream = broadcaster.subscribe()
+        first = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0.05)
+        buffer.write(make_frame(10))
+        await asyncio.wait_for(first, timeout=5)
+
+        # El cliente no lee mientras se publican varios frames
+        for value in (20, 30, 40):
+            buffer.write(make_frame(value))
+            for _ in range(100):
+                if broadcaster.latest_seq == buffer.latest_seq:
+                    break
+                await asyncio.sleep(0.01)
+
+        chunk = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        await stream.aclose()
+        return chunk
+
+    chunk = asyncio.run(scenario())
+    assert chunk == MJPEG_PART_HEADER + broadcaster.latest_jpeg + b'\r\n'
+    assert broadcaster.subscriber_count == 0
+
+
+def test_encode_resizes_variant_width():
+    """Test de que la variante con ancho reducido mantiene la relación de aspecto."""
+    buffer = FrameRingBuffer(capacity=2)
+    seq = buffer.write(make_frame(100))
+    jpeg = MJPEGBroadcaster(buffer, width=32).encode(seq)
+    image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (24, 32, 3)
+
+
+def test_registry_normalizes_and_shares_variants():
+    """Test de que peticiones equivalentes comparten el mismo difusor."""
+    buffer = FrameRingBuffer(capacity=2)
+    buffer.write(np.zeros((720, 1280, 3), dtype=np.uint8))
+    registry = StreamVariantRegistry(buffer, default_quality=70)
+
+    assert registry.normalize(641, None) == (640, 70, True)
+    assert registry.normalize(4000, 200) == (None, 95, True)
+    assert registry.normalize(10, 1, annotate=False) == (160, 10, False)
+    assert registry.get(640, 50) is registry.get(650, 50)
+    assert registry.get(640, 50) is not registry.get(640, 60)
+    assert len(registry) == 2
+
+
+def test_registry_max_variants_falls_back_to_default():
+    """Test de que al superar el límite se sirve la variante por defecto."""
+    buffer = FrameRingBuffer(capacity=2)
+    buffer.write(np.zeros((720, 1280, 3), dtype=np.uint8))
+    registry = StreamVariantRegistry(buffer, max_variants=1)
+    first = registry.get(320, 40)
+    fallback = registry.get(640, 40)
+    assert fallback is not first
+    assert (fallback.width, fallback.quality) == (None, registry.default_quality)
+
+
+def test_registry_releases_variant_after_last_subscriber():
+    """Test de que una variante se libera al desconectarse su último cliente."""
+    buffer = FrameRingBuffer(capacity=4)
+    registry = StreamVariantRegistry(buffer, max_fps=0)
+
+    async def scenario():
+        first = registry.stream(width=32)
+        second = registry.stream(width=32)
+        pending = [asyncio.create_task(first.__anext__()),
+                   asyncio.create_task(second.__anext__())]
+        await asyncio.sleep(0.05)
+        buffer.write(make_frame(10))
+        await asyncio.wait_for(asyncio.gather(*pending), timeout=5)
+        assert len(registry) == 1
+
+        await first.aclose()
+        assert len(registry) == 1
+        await second.aclose()
+        assert len(registry) == 0
+
+    buffer.write(make_frame(0))
+    asyncio.run(scenario())
+
+
+def test_registry_refuses_variants_after_close():
+    """Test de que tras cerrar el registro no se crean ni sirven variantes."""
+    buffer = FrameRingBuffer(capacity=4)
+    buffer.write(make_frame(0))
+    registry = StreamVariantRegistry(buffer, max_fps=0)
+    registry.close()
+
+    async def scenario():
+        return [chunk async for chunk in registry.stream(width=32)]
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=5)) == []
+    assert registry.get(quality=50)._closed
+    assert len(registry) == 0
+
+
+def test_variants_do_not_starve_shared_executor():
+    """Test de que las variantes en espera no ocupan threads del executor."""
+    buffer = FrameRingBuffer(capacity=4)
+    registry = StreamVariantRegistry(buffer, max_fps=0, max_variants=8)
+
+    async def scenario():
+        # Un único thread, compartido con otras codificaciones (snapshots)
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        streams = [registry.stream(quality=q) for q in range(20, 100, 10)]
+        pending = [asyncio.create_task(stream.__anext__()) for stream in streams]
+        await asyncio.sleep(0.05)
+        buffer.write(make_frame(10))
+        await asyncio.wait_for(asyncio.gather(*pending), timeout=5)
+
+        # Sin frames nuevos las variantes esperan; el executor sigue libre
+        pending = [asyncio.create_task(stream.__anext__()) for stream in streams]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        await asyncio.to_thread(lambda: None)
+        elapsed = time.monotonic() - started
+
+        buffer.write(make_frame(20))
+        await asyncio.wait_for(asyncio.gather(*pending), timeout=5)
+        for stream in streams:
+            await stream.aclose()
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed < 0.1
+    assert len(registry) == 0
+
+
+def test_subscriber_fps_limit():
+    """Test del límite de FPS por cliente sobre la salida compartida."""
+    subscriber = _Subscriber(max_fps=5)
+    delivered = 0
+    # Frames de la variante a 10 FPS durante 2 segundos
+    for i in range(20):
+        now = i * 0.1
+        if subscriber.is_due(now):
+            subscriber.mark_delivered(now)
+            delivered += 1
+    assert delivered == 10
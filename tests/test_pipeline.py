@@ -0,0 +1,152 @@
+"""Tests para las colas acotadas y las etapas del pipeline."""
+
+import threading
+import time
+import pytest
+import numpy as np
+from src.camera.frame_buffer import FrameRingBuffer
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.pipeline import BoundedQueue, FrameItem, PipelineStage, Pipeline
+from src.web.camera_server import CameraServer
+
+
+def test_queue_drop_oldest():
+    """Test de descarte del elemento más antiguo con la cola llena."""
+    queue = BoundedQueue(2, 'drop_oldest')
+    for i in range(4):
+        assert queue.put(i)
+    assert [queue.get(0), queue.get(0)] == [2, 3]
+    assert queue.get_stats()["dropped"] == 2
+
+
+def test_queue_on_drop_receives_discarded_items():
+    """Test de que los elementos descartados se entregan a on_drop."""
+    dropped = []
+    queue = BoundedQueue(2, 'drop_oldest', on_drop=dropped.append)
+    for i in range(4):
+        queue.put(i)
+    newest = BoundedQueue(1, 'drop_newest', on_drop=dropped.append)
+    newest.put("a")
+    newest.put("b")
+    assert dropped == [0, 1, "b"]
+
+
+def test_queue_drop_newest():
+    """Test de descarte del elemento nuevo con la cola llena."""
+    queue = BoundedQueue(2, 'drop_newest')
+    results = [queue.put(i) for i in range(3)]
+    assert results == [True, True, False]
+    assert [queue.get(0), queue.get(0)] == [0, 1]
+
+
+def test_queue_block_waits_for_consumer():
+    """Test de que la política block espera hueco y respeta el timeout."""
+    queue = BoundedQueue(1, 'block')
+    queue.put("a")
+    assert not queue.put("b", timeout=0.05)
+
+    threading.Timer(0.05, queue.get).start()
+    assert queue.put("c", timeout=2)
+    assert queue.get(0) == "c"
+
+
+def test_queue_invalid_policy():
+    """Test de error con política desconocida."""
+    with pytest.raises(ValueError):
+        BoundedQueue(1, 'foo')
+
+
+def test_stage_drains_queue_on_stop():
+    """Test de que al detener la etapa se procesan los elementos pendientes."""
+    processed = []
+    stopped = []
+    stage = PipelineStage("test", processed.append, maxsize=10,
+                          on_stop=lambda: stopped.append(len(processed)))
+    for i in range(5):
+        stage.submit(i)
+    stage.start()
+    stage.stop()
+    assert processed == [0, 1, 2, 3, 4]
+    assert stopped == [5]
+
+
+def test_stage_errors_do_not_stop_worker():
+    """Test de que una excepción en el handler no detiene la etapa."""
+    processed = []
+
+    def handler(item):
+        if item == 1:
+            raise RuntimeError("fallo")
+        processed.append(item)
+
+    stage = PipelineStage("test", handler)
+    stage.start()
+    for i in range(3):
+        stage.submit(i)
+    stage.stop()
+    assert processed == [0, 2]
+    assert stage.get_stats()["errors"] == 1
+
+
+def test_slow_stage_does_not_block_producer():
+    """Test de que una etapa lenta descarta en vez de frenar al productor."""
+    release = threading.Event()
+    slow = PipelineStage("slow", lambda item: release.wait(2), maxsize=2)
+    fast = PipelineStage("fast", slow.submit, maxsize=2)
+    pipeline = Pipeline([fast, slow])
+    pipeline.start()
+
+    start = time.monotonic()
+    for i in range(50):
+        fast.submit(i)
+        time.sleep(0.001)
+    elapsed = time.monotonic() - start
+
+    stats = pipeline.get_stats()
+    release.set()
+    pipeline.stop()
+    assert elapsed < 1.0
+    assert stats["slow"]["dropped"] > 0
+    assert stats["slow"]["depth"] <= 2
+
+
+def test_pinned_frames_survive_capture_backlog(tmp_path):
+    """Test de que los frames en cola retienen su slot del buffer circular."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.frame_buffer = FrameRingBuffer(capacity=6)
+    jobs = []
+    server.pipeline = Pipeline([PipelineStage("persistence", jobs.append, maxsize=1000)])
+    server.pipeline.start()
+    server.episode_state.sample_every = 1
+    server.recorder = EpisodeRecorder(episode_path=str(tmp_path), pre_roll_seconds=5.0)
+
+    # Tres frames en cola retenidos mientras la captura sigue publicando
+    items = []
+    for i in range(1, 4):
+        seq = server.frame_buffer.write(np.full((48, 64, 3), i, dtype=np.uint8), timestamp=float(i))
+        items.append(FrameItem(seq, i, float(i), ref=server._pin_frame(seq)))
+    for i in range(20):
+        server.frame_buffer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    assert server.frame_buffer.get_stats()["pinned_slots"] == 3
+
+    for item in items:
+        server._episode_stage(item)
+    server.pipeline.stop()
+    assert [int(data["frame"][0, 0, 0]) for _, data in jobs] == [1, 2, 3]
+    assert server.frame_buffer.get_stats()["pinned_slots"] == 0
+
+    # Sin retener, el frame se pierde y se contabiliza
+    for i in range(6):
+        server.frame_buffer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    server._episode_stage(FrameItem(items[0].seq, 5, 5.0))
+    assert server.get_pipeline_stats()["capture"]["frame_misses"] == 1
+
+
+def test_dropped_items_release_their_frame():
+    """Test de que un descarte de la cola libera el slot retenido."""
+    buffer = FrameRingBuffer(capacity=4)
+    stage = PipelineStage("episode", lambda item: None, maxsize=1, on_drop=FrameItem.release)
+    for i in range(3):
+        seq = buffer.write(np.zeros((8, 8, 3), dtype=np.uint8))
+        stage.submit(FrameItem(seq, i, 0.0, ref=buffer.acquire(seq)))
+    assert buffer.get_stats()["pinned_slots"] == 1
@@ -0,0 +1,160 @@
+"""Tests para el pre-roll y el post-roll de episodios."""
+
+import json
+import time
+from datetime import datetime
+import numpy as np
+from src.alerts.notification import NotificationManager
+from src.data.pre_roll import PreRollBuffer
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.database.db_manager import DatabaseManager
+from src.detection.detection_result import DetectionResult
+from src.pipeline import Pipeline, PipelineStage, FrameItem
+from src.web.camera_server import CameraServer
+
+
+def noisy_frame(seed: int) -> np.ndarray:
+    """Frame con ruido (poco compresible)."""
+    return np.random.default_rng(seed).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+def test_buffer_keeps_last_seconds():
+    """Test de que el buffer retiene solo la ventana de tiempo."""
+    buffer = PreRollBuffer(seconds=1.0)
+    for i in range(10):
+        buffer.add(np.zeros((48, 64, 3), dtype=np.uint8), {"i": i}, timestamp=i * 0.25)
+    frames = buffer.drain(now=2.25)
+    assert [f.metadata["i"] for f in frames] == [5, 6, 7, 8, 9]
+    assert len(buffer) == 0 and buffer.nbytes == 0
+
+
+def test_buffer_respects_byte_budget():
+    """Test de que el presupuesto de bytes descarta los frames más antiguos."""
+    buffer = PreRollBuffer(seconds=60.0, max_bytes=100_000)
+    for i in range(20):
+        buffer.add(noisy_frame(i), timestamp=float(i))
+    assert buffer.nbytes <= 100_000
+    assert 0 < len(buffer) < 20
+    assert buffer.get_stats()["evicted"] == 20 - len(buffer)
+
+
+def test_pre_roll_is_prepended_and_flagged(tmp_path):
+    """Test de que el pre-roll se antepone al episodio con su marca."""
+    for storage_format in ("images", "video"):
+        recorder = EpisodeRecorder(episode_path=str(tmp_path / storage_format), storage_format=storage_format,
+                                   pre_roll_seconds=5.0)
+        for i in range(3):
+            recorder.buffer_pre_roll(np.full((48, 64, 3), i, dtype=np.uint8), {"motion": True})
+        recorder.start_episode("ep_pre")
+        recorder.buffer_pre_roll(np.zeros((48, 64, 3), dtype=np.uint8))  # Ignorado: ya se graba
+        recorder.add_frame(np.zeros((48, 64, 3), dtype=np.uint8), {"motion": True})
+        path = recorder.save_episode()
+
+        with open(f"{path}/metadata.json") as f:
+            metadata = json.load(f)
+        assert metadata["pre_roll_frames"] == 3
+        assert metadata["resolution"] == {"width": 64, "height": 48}
+        assert len(recorder.pre_roll) == 0
+
+    with open(tmp_path / "video" / "ep_pre" / "timestamps.json") as f:
+        index = json.load(f)
+    assert [frame.get("pre_roll", False) for frame in index] == [True, True, True, False]
+    assert len(list((tmp_path / "images" / "ep_pre" / "images").iterdir())) == 4
+
+
+def test_post_roll_keeps_recording_after_calm(tmp_path):
+    """Test de que el episodio se cierra al terminar el post-roll."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.post_roll_seconds = 1.0
+    jobs = []
+    server.pipeline = Pipeline([PipelineStage("persistence", jobs.append, maxsize=1000)])
+    server.pipeline.start()
+
+    motion = DetectionResult(motion_detected=True, raw_motion=True, boxes=((10, 10, 20, 20),),
+                             frame_size=(64, 48))
+    fps = 15
+    for i in range(1, 121):
+        seq = server.frame_buffer.write(np.zeros((48, 64, 3), dtype=np.uint8), timestamp=i / fps)
+        item = FrameItem(seq, i, i / fps)
+        item.processed = True
+        if i <= 40:
+            item.detection = motion
+        server._episode_stage(item)
+    server.pipeline.stop()
+
+    kinds = [kind for kind, _ in jobs]
+    assert kinds.count("start_episode") == 1 and kinds.count("close_episode") == 1
+    close = next(data for kind, data in jobs if kind == "close_episode")
+    # Calmado en el frame 43; el post-roll dura 1 s más
+    assert abs(close["end_time"] - (43 / fps + 1.0)) < 1e-6
+    post_roll = [data for kind, data in jobs if kind == "add_frame" and data["metadata"].get("post_roll")]
+    assert len(post_roll) == 3
+    assert all(data["metadata"]["bbox"] is None for data in post_roll)
+
+
+def test_frames_keep_capture_time_through_persistence(tmp_path):
+    """Test de que el episodio usa los instantes de captura, no los de persistencia."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="video", pre_roll_seconds=30.0)
+    start = float(int(time.time())) - 10
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    for i in range(2):
+        server._persistence_stage(("pre_roll", {"frame": frame, "metadata": {}, "timestamp": start + i}))
+    server.recorder.start_episode("ep_tiempo")
+    for i in range(2, 5):
+        # La cola se vacía mucho después de la captura
+        server._persistence_stage(("add_frame", {"frame": frame, "metadata": {}, "timestamp": start + i}))
+    path = server.recorder.save_episode()
+
+    with open(f"{path}/timestamps.json") as f:
+        captured = [datetime.fromisoformat(entry["timestamp"]).timestamp() for entry in json.load(f)]
+    assert captured == [start + i for i in range(5)]
+    with open(f"{path}/metadata.json") as f:
+        metadata = json.load(f)
+    assert datetime.fromisoformat(metadata["start_time"]).timestamp() == start
+    assert metadata["duration_seconds"] == 4.0
+
+
+def test_db_episode_times_match_written_frames(tmp_path):
+    """Test de que la BD guarda el inicio y la duración de los frames escritos."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.db_manager = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    server.notifier = NotificationManager()
+    server.recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"), storage_format="video",
+                                      pre_roll_seconds=30.0)
+    start = float(int(time.time())) - 10
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    for i in range(3):
+        server._persistence_stage(("pre_roll", {"frame": frame, "metadata": {}, "timestamp": start + i}))
+    # El detector disparó en el frame 3 y se calmó antes del post-roll
+    server._persistence_stage(("start_episode", {"episode_id": "ep_bd", "start_time": start + 3}))
+    for i in range(3, 8):
+        server._persistence_stage(("add_frame", {"frame": frame, "metadata": {}, "timestamp": start + i}))
+    server._persistence_stage(("close_episode", {"episode_id": "ep_bd", "start_time": start + 3,
+                                                  "end_time": start + 5}))
+
+    episode = server.db_manager.get_episode("ep_bd")
+    with open(tmp_path / "episodes" / "ep_bd" / "info.json") as f:
+        info = json.load(f)
+    assert datetime.fromisoformat(episode["start_time"]).timestamp() == start
+    assert datetime.fromisoformat(episode["end_time"]).timestamp() == start + 7
+    assert episode["duration_seconds"] == info["duration_seconds"] == 7.0
+    server.db_manager.close()
+
+
+def test_empty_episode_close_resets_recorder(tmp_path):
+    """Test de que cerrar un episodio sin frames deja el grabador listo."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format="video", pre_roll_seconds=5.0)
+    recorder.start_episode("ep_vacio")
+    assert recorder.finish_episode() is None
+    assert not recorder.is_recording and recorder.episode_id is None and recorder._video is None
+
+    # El pre-roll vuelve a llenarse y se antepone al siguiente episodio
+    recorder.buffer_pre_roll(np.zeros((48, 64, 3), dtype=np.uint8), {"motion": True})
+    assert len(recorder.pre_roll) == 1
+    recorder.start_episode("ep_siguiente")
+    recorder.add_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+    path = recorder.save_episode()
+    with open(f"{path}/metadata.json") as f:
+        assert json.load(f)["pre_roll_frames"] == 1
+    assert not (tmp_path / "ep_vacio").exists()
@@ -0,0 +1,100 @@
+"""Tests para la retención de episodios."""
+
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.data.retention import RetentionManager
+from src.database.db_manager import DatabaseManager
+
+
+def make_episode(recorder, db, episode_id, days_ago=0.0, frames=3, duration=None, motion=True):
+    """Graba un episodio fechado hace ``days_ago`` días y lo registra en la BD."""
+    start = datetime.now() - timedelta(days=days_ago)
+    recorder.start_episode(episode_id)
+    for i in range(frames):
+        recorder.add_frame(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    path = recorder.save_episode()
+    with open(f"{path}/info.json") as f:
+        info = json.load(f)
+    info["start_time"] = start.isoformat()
+    info["motion_detected"] = motion
+    if duration is not None:
+        info["duration_seconds"] = duration
+    with open(f"{path}/info.json", "w") as f:
+        json.dump(info, f)
+    db.add_episode(episode_id=episode_id, file_path=path, start_time=start, motion_detected=motion)
+
+
+def test_age_and_count_policies_keep_db_consistent(tmp_path):
+    """Test de las políticas de antigüedad y número con borrado en la BD."""
+    db = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"))
+    for i, days_ago in enumerate([40, 35, 5, 4, 3, 2, 1]):
+        make_episode(recorder, db, f"ep_{i}", days_ago=days_ago)
+    db.add_event("episode_saved", "guardado", episode_id=1)
+
+    manager = RetentionManager(str(tmp_path / "episodes"), db_manager=db, max_age_days=30,
+                               max_episodes=3, high_watermark=0, batch_size=2)
+    report = manager.run_once()
+
+    assert report["deleted"] == 4
+    assert report["reasons"] == {"age": 2, "count": 2}
+    assert report["db_rows_deleted"] == 4
+    assert report["bytes_freed"] > 0 and report["episodes_remaining"] == 3
+    remaining = sorted(p.name for p in (tmp_path / "episodes").iterdir())
+    assert remaining == ["ep_4", "ep_5", "ep_6"]
+    assert sorted(e["episode_id"] for e in db.get_episodes()) == remaining
+    # El evento del episodio borrado se conserva desvinculado
+    assert db.get_events()[0]["episode_id"] is None
+
+
+def test_scan_is_incremental(tmp_path):
+    """Test de que solo se miden los episodios nuevos o sin terminar."""
+    db = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"))
+    for i in range(3):
+        make_episode(recorder, db, f"ep_{i}")
+    manager = RetentionManager(str(tmp_path / "episodes"), high_watermark=0)
+
+    assert len(manager.scan()) == 3 and manager.dirs_scanned == 3
+    manager.scan()
+    assert manager.dirs_scanned == 3
+
+    make_episode(recorder, db, "ep_3")
+    (tmp_path / "episodes" / "ep_incompleto").mkdir()  # En curso: sin info.json
+    assert len(manager.scan()) == 5 and manager.dirs_scanned == 5
+    manager.scan()
+    assert manager.dirs_scanned == 6  # Solo se vuelve a medir el incompleto
+
+
+def test_watermark_evicts_lowest_value_and_skips_protected(tmp_path, monkeypatch):
+    """Test de la marca alta de ocupación con orden por valor."""
+    db = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"))
+    make_episode(recorder, db, "ep_corto", days_ago=1, duration=1.0)
+    make_episode(recorder, db, "ep_sin_movimiento", days_ago=1, duration=60.0, motion=False)
+    make_episode(recorder, db, "ep_largo", days_ago=2, duration=60.0)
+    make_episode(recorder, db, "ep_activo", days_ago=3, duration=0.5)
+    (tmp_path / "episodes" / "ep_grabando").mkdir()
+
+    manager = RetentionManager(str(tmp_path / "episodes"), db_manager=db, eviction_order="lowest_value",
+                               high_watermark=0.9, low_watermark=0.85, protected=lambda: ["ep_activo"])
+    episode_bytes = {u.episode_id: u.nbytes for u in manager.scan()}
+
+    # Disco al 90%: bajar al 85% exige algo más que el primer episodio
+    Usage = namedtuple("Usage", "total used free")
+    to_free = episode_bytes["ep_sin_movimiento"] + 1
+    total = 20 * to_free
+    monkeypatch.setattr("src.data.retention.shutil.disk_usage",
+                        lambda path: Usage(total, 18 * to_free, 2 * to_free))
+    report = manager.run_once()
+
+    assert report["reasons"] == {"watermark": 2}
+    remaining = sorted(p.name for p in (tmp_path / "episodes").iterdir())
+    assert remaining == ["ep_activo", "ep_grabando", "ep_largo"]
+
+    # Por debajo de la marca alta no se borra nada
+    monkeypatch.setattr("src.data.retention.shutil.disk_usage", lambda path: Usage(100, 50, 50))
+    assert manager.run_once()["deleted"] == 0
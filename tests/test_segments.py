@@ -0,0 +1,190 @@
+"""Tests para la partición de episodios largos en segmentos."""
+
+import json
+import sqlite3
+import time
+import numpy as np
+from datetime import datetime
+from src.alerts.notification import NotificationManager
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.data.episode_writer import EpisodeWriter
+from src.database.db_manager import DatabaseManager
+from src.web.camera_server import CameraServer
+
+
+def frame(value: int = 0) -> np.ndarray:
+    """Frame sintético pequeño."""
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def test_time_based_rollover_links_segments(tmp_path):
+    """Test de partición por tiempo con segmentos enlazados al padre."""
+    writer = EpisodeWriter()
+    writer.start()
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), writer=writer, segment_seconds=10.0)
+    recorder.start_episode("ep_long")
+    results = []
+
+    start = time.time()
+    for i in range(30):
+        # Un frame por segundo simulado
+        if recorder.segment_due(now=start + i * 1.0):
+            recorder.roll_segment(on_complete=results.append, now=start + i * 1.0)
+        recorder.add_frame(frame(i))
+    assert recorder.episode_id == "ep_long_s002"
+    recorder.finish_episode(on_complete=results.append)
+    writer.stop()
+
+    assert [r.episode_id for r in results] == ["ep_long", "ep_long_s001", "ep_long_s002"]
+    assert [r.frame_count for r in results] == [10, 10, 10]
+    with open(tmp_path / "ep_long_s002" / "info.json") as f:
+        info = json.load(f)
+    assert info["parent_episode_id"] == "ep_long" and info["segment_index"] == 2
+
+
+def test_size_based_rollover(tmp_path):
+    """Test de partición por tamaño del segmento."""
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), segment_max_mb=0.001)
+    recorder.start_episode("ep_big")
+    recorder.add_frame(frame())
+    assert not recorder.segment_due()
+    noisy = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    recorder.add_frame(noisy)
+    assert recorder.segment_due()
+    assert recorder.roll_segment() == "ep_big_s001"
+    assert not recorder.segment_due()
+
+
+def test_db_tracks_segments_and_upgrades_schema(tmp_path):
+    """Test de segmentos en la BD y de actualización de esquemas anteriores."""
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE episodes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            episode_id TEXT UNIQUE NOT NULL,
+            file_path TEXT NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            duration_seconds REAL,
+            motion_detected BOOLEAN DEFAULT 0,
+            object_detected TEXT,
+            confidence_score REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            metadata_json TEXT
+        )
+    """)
+    conn.execute("INSERT INTO episodes (episode_id, file_path, start_time) VALUES ('ep_old', 'p', '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path=str(db_path))
+    db.add_episode("ep_a", "p", datetime.now(), True)
+    for index in (2, 1):
+        db.add_episode(f"ep_a_s00{index}", "p", datetime.now(), True,
+                       parent_episode_id="ep_a", segment_index=index)
+
+    segments = db.get_episode_segments("ep_a_s002")
+    assert [s["episode_id"] for s in segments] == ["ep_a", "ep_a_s001", "ep_a_s002"]
+    assert db.get_episode_segments("ep_old")[0]["segment_index"] == 0
+    assert db.get_episode_segments("nope") == []
+
+
+def test_server_rolls_segments_without_losing_frames(tmp_path):
+    """Test de partición desde la etapa de persistencia con registro en BD."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.db_manager = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    server.notifier = NotificationManager(db_manager=server.db_manager)
+    server.recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"), segment_max_mb=0.001)
+    noisy = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+
+    start = time.time()
+    server._persistence_stage(("start_episode", {"episode_id": "ep_srv", "start_time": start}))
+    for _ in range(5):
+        server._persistence_stage(("add_frame", {"frame": noisy, "metadata": {"motion": True}}))
+    server._persistence_stage(("close_episode", {"episode_id": "ep_srv", "start_time": start,
+                                                  "end_time": time.time()}))
+
+    segments = server.db_manager.get_episode_segments("ep_srv")
+    # Cada frame supera el tamaño máximo: un segmento por frame, ninguno vacío
+    assert len(segments) == 5
+    assert [s["segment_index"] for s in segments] == list(range(5))
+    assert all(s["end_time"] is not None for s in segments)
+    frames = sum(
+        json.load(open(tmp_path / "episodes" / s["episode_id"] / "info.json"))["total_frames"]
+        for s in segments
+    )
+    assert frames == 5
+
+
+def test_continuous_motion_is_recorded_as_linked_segments(tmp_path):
+    """Test de un evento largo: segmentos enlazados, sin calmado forzado."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.db_manager = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    server.notifier = NotificationManager()
+    server.recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"), segment_seconds=10.0)
+    state = CameraServer._build_episode_state({}, {"segment_seconds": 10.0})
+    fps = 15
+
+    # 45 s de movimiento continuo: con la duración máxima por defecto (6 s)
+    # y el período de gracia serían ~4 episodios sueltos con huecos
+    start = time.time()
+    starts = 0
+    frames_added = 0
+    for i in range(45 * fps):
+        now = start + i / fps
+        decision = state.update(True, frame_index=i, now=now)
+        assert not decision.stop
+        if decision.start:
+            starts += 1
+            server._persistence_stage(("start_episode", {"episode_id": "ep_largo", "start_time": now}))
+        if decision.add_frame:
+            frames_added += 1
+            server._persistence_stage(("add_frame", {
+                "frame": frame(i % 255), "metadata": {"motion": True}, "timestamp": now
+            }))
+    decision = state.close(now=start + 45)
+    server._persistence_stage(("close_episode", {"episode_id": "ep_largo",
+                                                  "start_time": decision.episode_start_time,
+                                                  "end_time": decision.timestamp}))
+
+    assert starts == 1
+    segments = server.db_manager.get_episode_segments("ep_largo")
+    assert [s["segment_index"] for s in segments] == [0, 1, 2, 3, 4]
+    assert all(s["parent_episode_id"] == "ep_largo" for s in segments[1:])
+    frames = sum(
+        json.load(open(tmp_path / "episodes" / s["episode_id"] / "info.json"))["total_frames"]
+        for s in segments
+    )
+    assert frames == frames_added
+
+
+def test_segment_duration_uses_capture_clock(tmp_path):
+    """Test de que la duración del segmento se mide con los instantes de captura."""
+    server = CameraServer(config_path=str(tmp_path / "sin_config.yaml"))
+    server.db_manager = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    server.notifier = NotificationManager()
+    server.recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"), segment_seconds=10.0)
+    # Reloj de captura distinto del de la etapa de persistencia
+    start = 1000.0
+    server._persistence_stage(("start_episode", {"episode_id": "ep_reloj", "start_time": start}))
+    for i in range(25):
+        server._persistence_stage(("add_frame", {
+            "frame": frame(i), "metadata": {"motion": True}, "timestamp": start + i
+        }))
+    server._persistence_stage(("close_episode", {"episode_id": "ep_reloj", "start_time": start,
+                                                  "end_time": start + 25}))
+
+    segments = server.db_manager.get_episode_segments("ep_reloj")
+    assert [s["segment_index"] for s in segments] == [0, 1, 2]
+    frames = [
+        json.load(open(tmp_path / "episodes" / s["episode_id"] / "info.json"))["total_frames"]
+        for s in segments
+    ]
+    assert frames == [10, 10, 5]
+
+
+def test_duration_cap_applies_without_segments():
+    """Test de que sin segmentos se mantiene la duración máxima del episodio."""
+    assert CameraServer._build_episode_state({}, {}).max_episode_duration == 6.0
+    assert CameraServer._build_episode_state({}, {"segment_max_mb": 32}).max_episode_duration == 0.0
@@ -0,0 +1,77 @@
+"""Tests para el endpoint de snapshot y su caché."""
+
+import pytest
+import numpy as np
+import cv2
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.camera.frame_buffer import FrameRingBuffer
+from src.web.mjpeg_broadcaster import StreamVariantRegistry
+from src.web.snapshot_cache import SnapshotCache
+from src.web.routes import router
+
+
+@pytest.fixture
+def snapshot_env():
+    """Fixture con buffer, caché y cliente HTTP del router de la API."""
+    buffer = FrameRingBuffer(capacity=4)
+    cache = SnapshotCache(buffer, StreamVariantRegistry(buffer), max_entries=2)
+    router.snapshot_cache = cache  # type: ignore
+    app = FastAPI()
+    app.include_router(router)
+    yield buffer, cache, TestClient(app)
+    router.snapshot_cache = None  # type: ignore
+
+
+def test_snapshot_without_frames(snapshot_env):
+    """Test de 503 antes del primer frame."""
+    _, _, client = snapshot_env
+    assert client.get("/api/snapshot.jpg").status_code == 503
+
+
+def test_snapshot_etag_and_not_modified(snapshot_env):
+    """Test de ETag por secuencia y 304 para un frame sin cambios."""
+    buffer, cache, client = snapshot_env
+    buffer.write(np.full((48, 64, 3), 80, dtype=np.uint8))
+
+    response = client.get("/api/snapshot.jpg")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    etag = response.headers["etag"]
+    image = cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (48, 64, 3)
+
+    cached = client.get("/api/snapshot.jpg", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    # Un frame nuevo invalida el ETag
+    buffer.write(np.full((48, 64, 3), 160, dtype=np.uint8))
+    fresh = client.get("/api/snapshot.jpg", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert cache.encodes == 2
+    assert cache.not_modified == 1
+
+
+def test_snapshot_encodes_once_per_frame(snapshot_env):
+    """Test de que sondeos repetidos del mismo frame no recodifican."""
+    buffer, cache, client = snapshot_env
+    buffer.write(np.full((48, 64, 3), 80, dtype=np.uint8))
+    bodies = {client.get("/api/snapshot.jpg").content for _ in range(5)}
+    assert len(bodies) == 1
+    assert cache.encodes == 1
+    assert cache.hits == 4
+
+
+def test_snapshot_variants_cached_separately(snapshot_env):
+    """Test de variantes de ancho y calidad con su propia entrada en caché."""
+    buffer, cache, client = snapshot_env
+    buffer.write(np.zeros((360, 640, 3), dtype=np.uint8))
+
+    small = client.get("/api/snapshot.jpg", params={"w": 320, "q": 40})
+    full = client.get("/api/snapshot.jpg")
+    image = cv2.imdecode(np.frombuffer(small.content, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (180, 320, 3)
+    assert small.headers["etag"] != full.headers["etag"]
+    assert cache.get_stats()["entries"] == 2
@@ -0,0 +1,99 @@
+"""Tests para las miniaturas de episodios."""
+
+import json
+from datetime import datetime
+import pytest
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.data.lerobot_dataset import EpisodeRecorder
+from src.data.thumbnails import select_keyframes, write_thumbnails
+from src.database.async_db import AsyncDatabase
+from src.database.db_manager import DatabaseManager
+from src.web.routes import router
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def record(recorder, episode_id, frames=12):
+    """Graba un episodio con el pico de movimiento en el frame 7."""
+    recorder.start_episode(episode_id)
+    for i in range(frames):
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+        frame[:, : (i + 1) * 50] = 200
+        recorder.add_frame(frame, {"motion": True, "motion_energy": 5.0 if i == 7 else float(i % 3)})
+    return recorder.finish_episode()
+
+
+def test_select_keyframes():
+    """Test de la elección del primer frame, el pico y la tira."""
+    frames = [{"motion_energy": e} for e in [0.1, 0.4, 2.0, 0.3, 0.0]]
+    assert select_keyframes(frames, strip_tiles=3) == {"first": 0, "peak": 2, "strip": [0, 2, 4]}
+    assert select_keyframes([{}] * 2, strip_tiles=8) == {"first": 0, "peak": 1, "strip": [0, 1]}
+
+
+def test_index_written_when_strip_frames_unreadable(tmp_path):
+    """Test de miniaturas sin tira cuando solo se lee el frame del pico."""
+    frames = [{"motion_energy": e} for e in [0.0, 5.0, 0.0, 0.0, 0.0]]
+
+    def peak_only_reader(indices):
+        # Frames a resolución completa: se reducen al decodificarse
+        for index in indices:
+            if index == 1:
+                yield index, np.full((1080, 1920, 3), 120, dtype=np.uint8)
+
+    index = write_thumbnails(tmp_path, frames, peak_only_reader, strip_tiles=2)
+    assert index["peak"]["frame_index"] == 1
+    assert "strip" not in index and "first" not in index
+    assert json.loads((tmp_path / "thumbnails.json").read_text()) == index
+    assert not (tmp_path / "strip.jpg").exists()
+
+
+@pytest.mark.parametrize("storage_format", ["images", "video"])
+def test_thumbnails_written_with_episode(tmp_path, storage_format):
+    """Test de miniaturas pequeñas e índice al guardar el episodio."""
+    # Presupuesto mínimo: los frames en formato imágenes se vuelcan a disco
+    recorder = EpisodeRecorder(episode_path=str(tmp_path), storage_format=storage_format,
+                               memory_budget_mb=0.01, fps=3.0)
+    result = record(recorder, "ep_thumb").write_result()
+
+    thumbnail_dir = tmp_path / "ep_thumb" / "thumbnails"
+    assert result.thumbnail_dir == str(thumbnail_dir)
+    with open(thumbnail_dir / "thumbnails.json") as f:
+        index = json.load(f)
+    assert index["first"]["frame_index"] == 0 and index["peak"]["frame_index"] == 7
+    assert index["strip"]["frame_indices"] == [0, 2, 3, 5, 6, 8, 9, 11]
+    for name in ("first.jpg", "peak.jpg", "strip.jpg"):
+        assert (thumbnail_dir / name).stat().st_size < 16 * 1024
+    with open(tmp_path / "ep_thumb" / "metadata.json") as f:
+        assert json.load(f)["thumbnails"] == index
+
+
+def test_thumbnail_endpoint_serves_cached_file(tmp_path):
+    """Test del endpoint de miniaturas con caché de larga duración."""
+    db = DatabaseManager(db_path=str(tmp_path / "db.db"))
+    recorder = EpisodeRecorder(episode_path=str(tmp_path / "episodes"))
+    result = record(recorder, "ep_api").write_result()
+    db.add_episode(episode_id="ep_api", file_path=result.path, start_time=START)
+    db.update_episode("ep_api", START, 1.0, thumbnail_dir=result.thumbnail_dir)
+    db.add_episode(episode_id="ep_sin", file_path="x", start_time=START)
+
+    router.db = AsyncDatabase(db)  # type: ignore
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    try:
+        episodes = {e["episode_id"]: e for e in client.get("/api/episodes").json()["items"]}
+        assert episodes["ep_api"]["thumbnail_url"] == "/api/episodes/ep_api/thumbnail"
+        assert episodes["ep_sin"]["thumbnail_url"] is None
+
+        response = client.get("/api/episodes/ep_api/thumbnail?kind=strip")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert "immutable" in response.headers["cache-control"]
+        assert client.get("/api/episodes/ep_sin/thumbnail").status_code == 404
+        assert client.get("/api/episodes/ep_api/thumbnail?kind=otra").status_code == 400
+    finally:
+        router.db.close()  # type: ignore
+        router.db = None  # type: ignore
+